@@ -0,0 +1,257 @@
+"""単一のTODOリスト・TODO項目を読み込むためのキャッシュ.
+
+CRUDの単一行取得の前段に置くリードスルーキャッシュで、書き込み時はCRUD側で該当キーを無効化する。
+バックエンドはプロセス内LRU(TTL・件数上限付き)か、redis-py互換クライアントを使う共有キャッシュから選ぶ。
+プロセス内LRUは他のワーカープロセスの書き込みでは無効化されないため、古いデータはTTLの間だけ残りうる。
+"""
+
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+from types import SimpleNamespace
+
+from app import const
+
+
+class CacheBackend(ABC):
+    """キャッシュバックエンドのインターフェース.
+
+    値はカラム名 -> 値 のdictで、ヒット・ミス・追い出し等の件数をcountersに記録する。
+    """
+
+    def __init__(self) -> None:
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> dict | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: dict) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """全ての値を捨てる(テストの前後などで使う)."""
+
+    def replace(self, key: str, expected: dict, value: dict | None) -> bool:
+        """キーの値がexpectedのままであればvalueにする(Noneの場合は削除する). 置き換えたかどうかを返す.
+
+        このままでは読み込みと書き込みの間に他の書き込みが入りうる。アトミックにできるバックエンドは上書きする。
+        """
+        if self.get(key) != expected:
+            return False
+        if value is None:
+            self.delete(key)
+        else:
+            self.set(key, value)
+        return True
+
+    def record(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"backend": type(self).__name__, **{name: self.counters[name] for name in ("hits", "misses", "evictions", "expirations", "invalidations")}}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+class NullCache(CacheBackend):
+    """キャッシュしないバックエンド(CACHE_BACKEND=none)."""
+
+    def get(self, key: str) -> dict | None:  # noqa: ARG002
+        return None
+
+    def set(self, key: str, value: dict) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """プロセス内のLRUキャッシュ. 件数がmax_sizeを超えると最も古く使われた値から捨てる."""
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.counters["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def replace(self, key: str, expected: dict, value: dict | None) -> bool:
+        # get・set・deleteと同じロックの中で比較と置き換えを行う
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock() or entry[1] != expected:
+                return False
+            if value is None:
+                del self._entries[key]
+            else:
+                self._entries[key] = (self._clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+            return True
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(size=len(self._entries), max_size=self.max_size, ttl=self.ttl)
+        return stats
+
+
+class SharedCache(CacheBackend):
+    """redis-py互換クライアント(get / set(ex=) / delete。clearではscan_iterも)を使う、ワーカー間で共有するキャッシュ.
+
+    テストではこの3メソッドを持つ偽のクライアントを渡せばよい。
+    """
+
+    def __init__(self, client, ttl: float, prefix: str = "python-be-syokyu:") -> None:  # noqa: ANN001
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> dict | None:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw, object_hook=_decode_datetimes)
+
+    def set(self, key: str, value: dict) -> None:
+        self.client.set(self.prefix + key, json.dumps(value, default=datetime.isoformat), ex=max(int(self.ttl), 1))
+
+    def delete(self, key: str) -> None:
+        if self.client.delete(self.prefix + key):
+            self.record("invalidations")
+
+    def clear(self) -> None:
+        # このアプリのプレフィックスのキーだけを消す(redis-pyのscan_iterを使う)
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def _decode_datetimes(value: dict) -> dict:
+    for name, v in value.items():
+        if name.endswith("_at") and isinstance(v, str):
+            value[name] = datetime.fromisoformat(v)
+    return value
+
+
+def build_cache() -> CacheBackend:
+    """環境変数の設定からキャッシュバックエンドを作る."""
+    if const.CACHE_BACKEND == "none":
+        return NullCache()
+    if const.CACHE_BACKEND == "redis":
+        import redis  # 共有キャッシュを使う場合のみ必要な依存
+
+        return SharedCache(redis.Redis.from_url(const.CACHE_REDIS_URL), const.CACHE_TTL)
+    return LRUCache(const.CACHE_MAX_SIZE, const.CACHE_TTL)
+
+
+todo_cache: CacheBackend = build_cache()
+
+
+# read_throughがDBから読み込んでいる間、キーに置いておく値(リース)のキー
+_LEASE = "_lease"
+
+
+def todo_list_key(todo_list_id: int) -> str:
+    return f"todo_list:{todo_list_id}"
+
+
+def _todo_items_generation_key(todo_list_id: int) -> str:
+    return f"todo_items_gen:{todo_list_id}"
+
+
+def todo_item_key(todo_list_id: int, todo_item_id: int) -> str:
+    """TODO項目のキャッシュキー.
+
+    TODOリスト毎の世代を含めておき、条件指定の一括更新・削除では世代を変えるだけで
+    そのリストの項目をまとめて無効化できるようにする。
+    """
+    generation = todo_cache.get(_todo_items_generation_key(todo_list_id))
+    if generation is None:
+        # 世代が失われた場合は新しい世代にする(古い世代のキーが再び使われることはない)
+        generation = {"gen": uuid.uuid4().hex}
+        todo_cache.set(_todo_items_generation_key(todo_list_id), generation)
+    return f"todo_item:{todo_list_id}:{generation['gen']}:{todo_item_id}"
+
+
+def invalidate_todo_items(todo_list_id: int) -> None:
+    """TODOリストに属する全てのTODO項目のキャッシュを無効化する."""
+    todo_cache.delete(_todo_items_generation_key(todo_list_id))
+
+
+def _is_lease(value: dict | None) -> bool:
+    return value is not None and _LEASE in value
+
+
+def read_through(key: str, loader: Callable[[], object], *, store: bool = True) -> SimpleNamespace | None:
+    """キャッシュにあればそれを返し、なければloaderでDBから読み込んでキャッシュする.
+
+    loaderはSQLAlchemyのRow(存在しない場合はNone)を返す関数。存在しない行はキャッシュしない。
+    storeがFalseの場合(レプリカからの読み込み)は、遅延した値を残さないよう読み込んだ値をキャッシュしない。
+
+    書き込みのキャッシュの無効化はコミットの後に行われるため、無効化の前に読み込んだ古い値を
+    無効化の後にキャッシュしてしまわないよう、読み込む前にキーへリース(予約の値)を置き、
+    読み込んだ後もリースが残っている(その間に無効化されていない)場合だけ値に置き換える。
+    プロセス内LRUでは比較と置き換えをアトミックに行う。共有キャッシュでは比較と置き換えの間の
+    無効化はまだ取りこぼしうる(古い値が残りうる時間はTTLのままだが、起きうる間隔はDBの読み込み全体からこの間だけに狭まる)。
+    """
+    value = todo_cache.get(key)
+    if _is_lease(value):
+        value = None
+    todo_cache.record("hits" if value is not None else "misses")
+    if value is None:
+        lease = {_LEASE: uuid.uuid4().hex}
+        if store:
+            todo_cache.set(key, lease)
+        row = loader()
+        value = row._asdict() if row is not None else None
+        if store:
+            todo_cache.replace(key, lease, value)
+        if value is None:
+            return None
+    return SimpleNamespace(**value)
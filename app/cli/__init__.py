@@ -0,0 +1 @@
+# このファイルはパッケージを示すために存在します
@@ -0,0 +1,67 @@
+"""NDJSONファイルからTODOリスト・TODO項目を一括登録するコマンド.
+
+    python -m app.cli.import_ndjson FILE [--chunk-size N] [--progress PATH]
+
+チャンクをコミットする毎に進捗をPATH(省略時は FILE.progress.json)に書き出し、
+同じコマンドを再実行すると進捗ファイルの続きから再開する。
+登録できなかった行は1行1件のJSONで標準出力に出力する。
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from app.crud.import_crud import IMPORT_CHUNK_SIZE, TodoImporter
+from app.database import SessionLocal
+from app.schemas.import_schema import ResponseImportProgress
+
+
+def _save(path: Path, progress: ResponseImportProgress) -> None:
+    # 書き込み途中で中断しても壊れないよう、一時ファイルに書いてから置き換える
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(progress.model_dump_json(exclude={"errors"}))
+    tmp.replace(path)
+
+
+def _report_errors(progress: ResponseImportProgress, reported: int) -> int:
+    for error in progress.errors[reported:]:
+        sys.stdout.write(json.dumps(error, ensure_ascii=False, default=str) + "\n")
+    return len(progress.errors)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", type=Path, help="NDJSONファイル")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="1回のコミットで登録する行数")
+    parser.add_argument("--progress", type=Path, help="進捗ファイル(省略時は FILE.progress.json)")
+    args = parser.parse_args(argv)
+    progress_path = args.progress or args.file.with_name(args.file.name + ".progress.json")
+
+    progress = ResponseImportProgress()
+    if progress_path.exists():
+        progress = ResponseImportProgress.model_validate_json(progress_path.read_text())
+
+    db = SessionLocal()
+    try:
+        importer = TodoImporter(db, progress, chunk_size=args.chunk_size)
+        reported = 0
+        with args.file.open("rb") as f:
+            for line in f:
+                if not importer.add(line):
+                    continue
+                progress = importer.flush()
+                _save(progress_path, progress)
+                reported = _report_errors(progress, reported)
+        progress = importer.flush()
+        _save(progress_path, progress)
+        _report_errors(progress, reported)
+    finally:
+        db.close()
+
+    sys.stderr.write(f"lines={progress.line} lists={progress.lists} items={progress.items} errors={progress.error_count}\n")
+    return 1 if progress.error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""全文検索インデックスを作り直すコマンド.
+
+    python -m app.cli.rebuild_search_index
+
+MySQLではFULLTEXTインデックスを作り直し(ngram_token_size等の変更を反映する)、
+SQLiteではFTS5テーブルとトリガーがなければ作成してから、元のテーブルの内容で作り直す。
+"""
+
+import argparse
+import sys
+
+from app.crud.search_crud import search_backend
+from app.database import SessionLocal
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        search_backend(db).rebuild(db)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""TODOリストの項目数・完了数のカウンタをtodo_itemsの実際の件数と突き合わせるコマンド.
+
+    python -m app.cli.reconcile_counters [--fix] [--batch-size N]
+
+食い違っていたTODOリストを1行1件のJSONで出力する。
+--fixを指定しない場合、食い違いがあれば終了コード1で終了する。
+"""
+
+import argparse
+import json
+import sys
+
+from app.crud.list_crud import reconcile_item_counters
+from app.database import SessionLocal
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="食い違っているカウンタを実際の件数で上書きする")
+    parser.add_argument("--batch-size", type=int, default=1000, help="1回に突き合わせるTODOリストの件数")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_item_counters(db, fix=args.fix, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    for x in mismatches:
+        sys.stdout.write(json.dumps(x) + "\n")
+    return 1 if mismatches and not args.fix else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,56 @@ DB_HOST = os.getenv("DB_HOST")
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASS = os.getenv("DB_PASS")
+# 指定された場合はDB_HOST等より優先する接続URL (例: ローカル検証用の sqlite:///./local.db)
+DB_URL = os.getenv("DB_URL")
+# trueの場合はasyncioネイティブのドライバ(aiomysql / aiosqlite)でDBに接続する
+DB_ASYNC = os.getenv("DB_ASYNC", "") == "true"
+
+# コネクションプール設定(ワーカープロセス毎に適用される)
+# プールクラスは sqlalchemy.pool のクラス名 (QueuePool / NullPool / StaticPool など)
+DB_POOL_CLASS = os.getenv("DB_POOL_CLASS", "QueuePool")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# MySQLのwait_timeoutで切断される前に接続を作り直す秒数(-1で無効)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true") == "true"
+# 読み込み専用のレプリカ(DB_REPLICA_URL か DB_REPLICA_HOST を指定した場合のみ使用する。ユーザー等はプライマリと同じ)
+DB_REPLICA_URL = os.getenv("DB_REPLICA_URL")
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+# 書き込んだクライアントの読み込みを、レプリカではなくプライマリに向ける秒数(read-your-writes)
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+# レプリカの遅延がこの秒数を超えた(または遅延を取得できない)場合はプライマリから読み込む
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+# レプリカの遅延を確認する間隔(秒)
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "1"))
+# trueの場合、同時に届いたTODO項目の単体登録(POST /lists/{id}/items)をまとめて1回のINSERT・コミットで書き込む(DB_ASYNC=true の場合は無視する)
+ITEM_GROUP_COMMIT = os.getenv("ITEM_GROUP_COMMIT", "") == "true"
+# まとめる登録を待つ時間(ミリ秒)。1件目の登録はこの時間だけ応答が遅れる
+ITEM_GROUP_COMMIT_WINDOW_MS = float(os.getenv("ITEM_GROUP_COMMIT_WINDOW_MS", "2"))
+# 1回にまとめる最大件数(達したら待ち時間の途中でも書き込む)
+ITEM_GROUP_COMMIT_MAX_BATCH = int(os.getenv("ITEM_GROUP_COMMIT_MAX_BATCH", "200"))
+# TODOリストのバックグラウンド削除(DELETE /lists/{id}?background=true)で1回に削除・コミットするTODO項目の件数
+LIST_DELETE_BATCH_SIZE = int(os.getenv("LIST_DELETE_BATCH_SIZE", "1000"))
+# バックグラウンド削除のバッチの間に待つ秒数(ロックの競合とレプリカの遅延を抑えるため)
+LIST_DELETE_BATCH_PAUSE = float(os.getenv("LIST_DELETE_BATCH_PAUSE", "0.05"))
+# 1リクエストあたりのSQL実行回数の上限(超えるとエラーにする。テスト用で、0は無制限)
+DB_QUERY_BUDGET = int(os.getenv("DB_QUERY_BUDGET", "0"))
+
+# 複数ワーカープロセスの/metricsを集計するためのディレクトリ(各ワーカーが値を書き出す。未指定ならプロセス内の値のみ)
+# デプロイ毎に空のディレクトリを指定する(前回起動時のワーカーの値が残らないように)
+METRICS_DIR = os.getenv("METRICS_DIR")
+# 各ワーカーが値を書き出す間隔(秒)
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))
+
+# 単一のTODOリスト・TODO項目取得のキャッシュ設定
+# バックエンドは memory(プロセス内LRU) / redis(ワーカー間で共有) / none(キャッシュしない)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+# TODOリストのキャッシュに含める期限切れ件数(overdue_count)の有効秒数(時間の経過による変化はこの秒数だけ遅れて反映される)
+CACHE_OVERDUE_TTL = float(os.getenv("CACHE_OVERDUE_TTL", "5"))
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", "10000"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
 
 
 class TodoItemStatusCode(Enum):
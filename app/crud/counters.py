@@ -0,0 +1,20 @@
+"""TODOリストの非正規化カウンタ(item_count / completed_count)の更新用."""
+
+from sqlalchemy import Update, update
+
+from app.models.list_model import ListModel
+
+
+def adjust_item_counters(todo_list_id: int, items: int = 0, completed: int = 0) -> Update:
+    """TODOリストの項目数・完了数を増減するUPDATE文を作る.
+
+    TODO項目の書き込みと同じトランザクションで実行し、カウンタと実データの整合を保つ。
+    カウンタはTODOリストのレスポンスに含まれるため、TODOリストのupdated_atも更新する
+    (onupdate / ON UPDATE CURRENT_TIMESTAMP。TODOリストのETagがカウンタの変化で変わるように)。
+    マイグレーションでの既存データの初期化だけは、追加したカラムを埋めるだけのためupdated_atを変えない。
+    """
+    table = ListModel.__table__
+    return update(table).where(table.c.id == todo_list_id).values(
+        item_count=table.c.item_count + items,
+        completed_count=table.c.completed_count + completed,
+    )
@@ -0,0 +1,39 @@
+"""TODOリスト・TODO項目の全件エクスポート用の読み込み.
+
+全件を一度にメモリに載せないよう、サーバーサイドカーソル(stream_results)でyield_per件ずつ読み込む。
+StreamingResponseのイテレータはリクエストのスレッドとは別のスレッドで進むため、
+リクエストのセッションは使わず、エンジンから専用の接続を取得する。
+エンジンはリクエスト毎に選べる(app.dependencies.get_read_engine でレプリカに振り分ける)。省略時はプライマリ。
+"""
+
+from collections.abc import Iterator
+
+from sqlalchemy import Engine, Row, Select, select
+
+from app import database
+from app.models.item_model import ItemModel
+from app.models.list_model import ListModel
+
+# サーバーサイドカーソルから1回に読み込む行数
+EXPORT_BATCH_SIZE = 1000
+
+
+def _stream(stmt: Select, engine: Engine | None) -> Iterator[list[Row]]:
+    with (engine or database.engine).connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(stmt)
+        yield from result.partitions()
+
+
+def stream_todo_lists(engine: Engine | None = None) -> Iterator[list[Row]]:
+    """全てのTODOリストをID順にEXPORT_BATCH_SIZE件ずつ返す."""
+    table = ListModel.__table__
+    return _stream(select(table).order_by(table.c.id), engine)
+
+
+def stream_todo_items(todo_list_id: int | None = None, engine: Engine | None = None) -> Iterator[list[Row]]:
+    """TODO項目(todo_list_id指定時はそのTODOリストの項目のみ)をID順にEXPORT_BATCH_SIZE件ずつ返す."""
+    table = ItemModel.__table__
+    stmt = select(table).order_by(table.c.id)
+    if todo_list_id is not None:
+        stmt = stmt.where(table.c.todo_list_id == todo_list_id)
+    return _stream(stmt, engine)
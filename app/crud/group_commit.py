@@ -0,0 +1,117 @@
+"""同時に届いた単体の書き込みを1回のトランザクションにまとめるグループコミット.
+
+最初に届いた書き込み(リーダー)が window 秒だけ後続を待ち、その間に届いた書き込みとまとめて
+write 関数で1回で書き込み・コミットする。後続の書き込みはリーダーの完了を待って自分の結果を受け取る。
+コミット(とfsync)の回数が減るためピーク時のスループットは上がるが、各書き込みの応答は最大 window 秒遅れる。
+
+同期のエンドポイントからスレッドプール上で呼ばれる前提で、待っている間はスレッドを占有する
+(1回にまとめられる件数はスレッドプールのスレッド数が上限になる)。
+まとめた書き込みが失敗した場合は、1件ずつ書き込み直して失敗したものだけにエラーを返す。
+"""
+
+import threading
+from collections.abc import Callable
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import database
+
+
+class _Pending:
+    """まとめて書き込むのを待っている1件の書き込み."""
+
+    __slots__ = ("done", "error", "result", "values")
+
+    def __init__(self, values: dict) -> None:
+        self.values = values
+        self.result = None
+        self.error: BaseException | None = None
+        self.done = threading.Event()
+
+
+class GroupCommitter:
+    """window 秒の間に submit された値をまとめて write(db, values_list) で書き込み、1回コミットする.
+
+    writeは値のリストと同じ順序で結果のリストを返す関数で、コミットはこのクラスが行う。
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Session, list[dict]], list],
+        window: float,
+        max_batch: int,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> None:
+        self.write = write
+        self.window = window
+        self.max_batch = max_batch
+        # 未指定の場合は書き込みの度にdatabase.SessionLocalを参照する(テストで差し替えられるように)
+        self._session_factory = session_factory or (lambda: database.SessionLocal())
+        self._full = threading.Condition()
+        self._batch: list[_Pending] | None = None
+        self.batches = 0
+        self.writes = 0
+
+    def submit(self, values: dict):  # noqa: ANN201
+        """valuesを次のまとめた書き込みに加え、コミット後にその結果を返す(失敗した場合は例外を送出する)."""
+        pending = _Pending(values)
+        with self._full:
+            batch = self._batch
+            is_leader = batch is None
+            if is_leader:
+                batch = self._batch = [pending]
+                # 最大件数に達するか、window秒が経つまで後続の書き込みを待つ
+                self._full.wait_for(lambda: len(batch) >= self.max_batch, timeout=self.window)
+                if self._batch is batch:
+                    self._batch = None
+            else:
+                batch.append(pending)
+                if len(batch) >= self.max_batch:
+                    # 以降の書き込みは次のまとまりにする
+                    self._batch = None
+                    self._full.notify_all()
+
+        if is_leader:
+            self._write_batch(batch)
+        else:
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _write_batch(self, batch: list[_Pending]) -> None:
+        try:
+            try:
+                self._write(batch)
+            except SQLAlchemyError:
+                if len(batch) == 1:
+                    raise
+                # どの書き込みが原因か分からないため、1件ずつ書き込み直す
+                for pending in batch:
+                    try:
+                        self._write([pending])
+                    except SQLAlchemyError as e:
+                        pending.error = e
+        except BaseException as e:
+            for pending in batch:
+                if pending.result is None and pending.error is None:
+                    pending.error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def _write(self, batch: list[_Pending]) -> None:
+        db = self._session_factory()
+        try:
+            results = self.write(db, [x.values for x in batch])
+            db.commit()
+        finally:
+            db.close()
+        with self._full:
+            self.batches += 1
+            self.writes += len(batch)
+        for pending, result in zip(batch, results, strict=True):
+            pending.result = result
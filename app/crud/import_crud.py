@@ -0,0 +1,167 @@
+"""NDJSONからのTODOリスト・TODO項目の一括インポート.
+
+1行1件(TODOリストまたはTODO項目)のNDJSONを、行を溜めてチャンク毎に登録し、チャンク毎に1回コミットする。
+不正な行はエラーとして記録して読み飛ばし、残りの行の登録は続ける。
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.cache import todo_cache, todo_list_key
+from app.const import TodoItemStatusCode
+from app.crud.counters import adjust_item_counters
+from app.models.item_model import ItemModel
+from app.models.list_model import ListModel
+from app.schemas.import_schema import ImportLine, ImportTodoItem, ImportTodoList, ResponseImportProgress
+
+# 1回のコミットで登録する行数
+IMPORT_CHUNK_SIZE = 1000
+# 進捗に含めるエラーの最大件数(件数はerror_countで全て数える)
+MAX_REPORTED_ERRORS = 1000
+
+
+class TodoImporter:
+    """NDJSONの行を受け取り、チャンク毎にTODOリスト・TODO項目を登録する.
+
+    addで1行ずつ渡し、Trueが返ったら(チャンクが一杯になったら)flushを呼ぶ。最後にもflushを呼ぶ。
+    progressに前回の進捗を渡すと、処理済みの行を読み飛ばして続きから登録する。
+    """
+
+    def __init__(self, db: Session, progress: ResponseImportProgress | None = None, chunk_size: int = IMPORT_CHUNK_SIZE) -> None:
+        self.db = db
+        self.progress = progress or ResponseImportProgress()
+        self.chunk_size = chunk_size
+        self._skip = self.progress.line
+        self._line = 0
+        self._pending: list[tuple[int, str | bytes]] = []
+
+    def add(self, line: str | bytes) -> bool:
+        self._line += 1
+        if self._line > self._skip:
+            self._pending.append((self._line, line))
+        return len(self._pending) >= self.chunk_size
+
+    def add_all(self, lines: Iterable[str | bytes]) -> ResponseImportProgress:
+        """全ての行をチャンク毎に登録する(同期的に読める入力用)."""
+        for line in lines:
+            if self.add(line):
+                self.flush()
+        return self.flush()
+
+    def flush(self) -> ResponseImportProgress:
+        """溜まっている行を登録してコミットし、進捗を返す."""
+        if not self._pending:
+            return self.progress
+        pending, self._pending = self._pending, []
+        rows = self._parse(pending)
+        before = self.progress.model_copy(deep=True)
+        try:
+            touched = self._insert(rows, bulk=True)
+        except SQLAlchemyError:
+            # DBに拒否された行があればチャンクを巻き戻し、1行ずつ登録して該当行だけをエラーにする
+            self.db.rollback()
+            self.progress = before
+            touched = self._insert(rows, bulk=False)
+        self.db.commit()
+
+        for todo_list_id in touched:
+            todo_cache.delete(todo_list_key(todo_list_id))
+        self.progress.line = pending[-1][0]
+        return self.progress
+
+    def _error(self, line_no: int, error: object) -> None:
+        self.progress.error_count += 1
+        if len(self.progress.errors) < MAX_REPORTED_ERRORS:
+            self.progress.errors.append({"line": line_no, "error": error})
+
+    def _parse(self, pending: list[tuple[int, str | bytes]]) -> list:
+        rows = []
+        for line_no, line in pending:
+            if not line.strip():
+                continue
+            try:
+                rows.append((line_no, ImportLine.validate_json(line)))
+            except ValidationError as e:
+                self._error(line_no, e.errors(include_url=False, include_context=False))
+                if any(x["loc"][:1] == ("list",) for x in e.errors()):
+                    # 後続のTODO項目の行を前のTODOリストに登録しないよう、拒否したTODOリストの行も残しておく
+                    rows.append((line_no, None))
+
+        # 既存のTODOリストを指定した行は、チャンク内でまとめて存在確認する
+        todo_list_ids = {x.todo_list_id for _, x in rows if _is_item(x) and x.todo_list_id is not None}
+        if todo_list_ids:
+            table = ListModel.__table__
+            existing = set(self.db.scalars(select(table.c.id).where(table.c.id.in_(todo_list_ids))))
+            for line_no, x in list(rows):
+                if _is_item(x) and x.todo_list_id is not None and x.todo_list_id not in existing:
+                    self._error(line_no, "Todo list not found")
+                    rows.remove((line_no, x))
+        return rows
+
+    def _insert(self, rows: list, *, bulk: bool) -> set[int]:
+        """行を順に登録する. bulk=Falseの場合は1行毎のセーブポイントで登録し、失敗した行をエラーにする.
+
+        TODOリストの行が拒否された場合、次のTODOリストの行までのtodo_list_idの指定がないTODO項目の行はエラーにする。
+
+        Returns: TODO項目を登録したTODOリストのID.
+        """
+        lists, items = ListModel.__table__, ItemModel.__table__
+        item_values = []
+        for line_no, x in rows:
+            if x is None:
+                self.progress.todo_list_id = None
+                continue
+            if isinstance(x, ImportTodoList):
+                # 後続のTODO項目の行がIDを参照するため、TODOリストは1件ずつ登録する
+                stmt = insert(lists).values(title=x.title, description=x.description)
+                todo_list_id = self._execute(line_no, stmt, bulk=bulk)
+                self.progress.todo_list_id = todo_list_id
+                if todo_list_id is not None:
+                    self.progress.lists += 1
+                continue
+
+            todo_list_id = x.todo_list_id or self.progress.todo_list_id
+            if todo_list_id is None:
+                self._error(line_no, "No todo list to import the item into")
+                continue
+            values = {
+                "todo_list_id": todo_list_id,
+                "title": x.title,
+                "description": x.description,
+                "status_code": x.status.value,
+                "due_at": x.due_at,
+            }
+            if bulk:
+                item_values.append(values)
+            elif self._execute(line_no, insert(items).values(values), bulk=bulk) is not None:
+                item_values.append(values)
+
+        if bulk and item_values:
+            # 複数行INSERT(insertmanyvalues)でまとめて登録する
+            self.db.execute(insert(items), item_values)
+        self.progress.items += len(item_values)
+
+        item_counts = Counter(x["todo_list_id"] for x in item_values)
+        completed_counts = Counter(x["todo_list_id"] for x in item_values if x["status_code"] == TodoItemStatusCode.COMPLETED.value)
+        for todo_list_id, count in item_counts.items():
+            self.db.execute(adjust_item_counters(todo_list_id, items=count, completed=completed_counts[todo_list_id]))
+        return set(item_counts)
+
+    def _execute(self, line_no: int, stmt, *, bulk: bool) -> int | None:  # noqa: ANN001
+        if bulk:
+            return self.db.execute(stmt).inserted_primary_key[0]
+        try:
+            with self.db.begin_nested():
+                return self.db.execute(stmt).inserted_primary_key[0]
+        except SQLAlchemyError as e:
+            self._error(line_no, str(getattr(e, "orig", e)))
+            return None
+
+
+def _is_item(row: ImportTodoList | ImportTodoItem | None) -> bool:
+    return row is not None and not isinstance(row, ImportTodoList)
@@ -1,71 +1,169 @@
 
+from collections import Counter
+from functools import partial
+
+from sqlalchemy import Select, delete, func, insert, select, union_all, update
 from sqlalchemy.orm import Session
 
+from app import const
+from app.cache import invalidate_todo_items, read_through, todo_cache, todo_item_key, todo_list_key
 from app.const import TodoItemStatusCode
+from app.crud.counters import adjust_item_counters
+from app.crud.group_commit import GroupCommitter
+from app.crud.item_filters import ORDER_COLUMNS, filter_conditions, order_by, seek_condition, sort_key
+from app.crud.returning import update_one
+from app.database import is_replica
 from app.models.item_model import ItemModel
-from app.schemas.item_schema import NewTodoItem, UpdateTodoItem
+from app.schemas.item_schema import BulkUpdateTodoItem, NewTodoItem, ResponseTodoItem, TodoItemFilter, TodoItemSelector, UpdateTodoItem
+from app.unit_of_work import on_commit
+
+# 一覧で読み込むカラム(レスポンスのスキーマにあるものだけ)
+_RESPONSE_COLUMNS = tuple(column for column in ItemModel.__table__.c if column.name in ResponseTodoItem.model_fields)
 
 
 def get_todo_item(db: Session, todo_list_id: int, todo_item_id: int):
+    # キャッシュ(app.cache)を経由して取得し、キャッシュにない場合のみDBを読む
+    table = ItemModel.__table__
+    return read_through(
+        todo_item_key(todo_list_id, todo_item_id),
+        lambda: db.execute(select(table).where(table.c.id == todo_item_id, table.c.todo_list_id == todo_list_id)).first(),
+        store=not is_replica(db),
+    )
 
-    return db.query(ItemModel).filter(
-        ItemModel.id == todo_item_id,
-        ItemModel.todo_list_id == todo_list_id,
-    ).first()
 
 
+def _new_todo_item_values(todo_list_id: int, new_todo_item: NewTodoItem) -> dict:
+    return {
+        "todo_list_id": todo_list_id,
+        "title": new_todo_item.title,
+        "description": new_todo_item.description,
+        "status_code": new_todo_item.status.value,
+        "due_at": new_todo_item.due_at,
+    }
+
 
 def post_todo_item(db: Session, todo_list_id: int, new_todo_item: NewTodoItem):
-    db_todo_item = ItemModel(
-        list_id=todo_list_id,
-        title=new_todo_item.title,
-        description=new_todo_item.description,
-        status=new_todo_item.status,
-    )
+    db_todo_item = ItemModel(**_new_todo_item_values(todo_list_id, new_todo_item))
 
     db.add(db_todo_item)
-    db.commit()
+    db.execute(adjust_item_counters(todo_list_id, items=1, completed=int(db_todo_item.status_code == TodoItemStatusCode.COMPLETED.value)))
+    # コミットはリクエストの終了時に行う(app.unit_of_work). IDとDB側の既定値はflush・refreshで得る
+    db.flush()
     db.refresh(db_todo_item)
+    on_commit(db, lambda: todo_cache.delete(todo_list_key(todo_list_id)))
 
     return db_todo_item
 
 
-def put_todo_item(db: Session, todo_list_id: int, todo_item_id: int, update_todo_item: UpdateTodoItem):
-    """TODO項目を更新する
-        db: データベースセッション
-        todo_list_id: TODO項目が属するTODOリストのID
-        todo_item_id: 更新するTODO項目のID
-        update_todo_item: 更新するデータ
-    Returns: 更新後のTODO項目のデータ.
+def post_todo_items(db: Session, todo_list_id: int, new_todo_items: list[NewTodoItem]):
+    """TODO項目を一括登録する.
+
+    1つの複数行INSERT文で登録し、行毎のrefreshは行わない。
+    TODOリストの項目数・完了数も同じトランザクションで1回のUPDATE文で加算する。
+    RETURNINGが使えるDBでは挿入結果をそのまま返し、使えないDB(MySQL)では
+    登録した行を1回のSELECTでまとめて取得する。
+    Returns: 登録したTODO項目の行(登録順).
+    """
+    return insert_todo_items(db, [_new_todo_item_values(todo_list_id, x) for x in new_todo_items])
+
+
+def insert_todo_items(db: Session, values: list[dict]) -> list:
+    """TODO項目の値のリストを1つの複数行INSERT文で登録し、TODOリスト毎の項目数・完了数を加算する.
+
+    複数のTODOリストの項目が混ざっていてもよい(グループコミットで使う)。
+    Returns: 登録したTODO項目の行(valuesと同じ順序).
+    """
+    table = ItemModel.__table__
+    if db.get_bind().dialect.insert_returning:
+        rows = sorted(db.execute(insert(table).values(values).returning(*table.c)), key=lambda row: row.id)
+    else:
+        # MySQLの複数行INSERTではlastrowidが先頭行のIDになり、IDは連続して採番される
+        # (同一トランザクション内のSELECTなので、他のセッションが後から登録した行は見えない)
+        first_id = db.execute(insert(table).values(values)).lastrowid
+        rows = db.execute(
+            select(table)
+            .where(table.c.id >= first_id)
+            .order_by(table.c.id)
+            .limit(len(values)),
+        ).all()
+
+    items, completed = Counter(), Counter()
+    for x in values:
+        items[x["todo_list_id"]] += 1
+        completed[x["todo_list_id"]] += x["status_code"] == TodoItemStatusCode.COMPLETED.value
+    # 同時に実行される他のトランザクションとデッドロックしないよう、TODOリストはID順に更新する
+    for todo_list_id in sorted(items):
+        db.execute(adjust_item_counters(todo_list_id, items=items[todo_list_id], completed=completed[todo_list_id]))
+        on_commit(db, partial(todo_cache.delete, todo_list_key(todo_list_id)))
+    return rows
+
+
+# 同時に届いたTODO項目の単体登録をまとめて書き込む(ITEM_GROUP_COMMIT指定時のみ使う)
+_item_group_commit = GroupCommitter(
+    insert_todo_items,
+    window=const.ITEM_GROUP_COMMIT_WINDOW_MS / 1000,
+    max_batch=const.ITEM_GROUP_COMMIT_MAX_BATCH,
+)
+
+
+def post_todo_item_grouped(db: Session, todo_list_id: int, new_todo_item: NewTodoItem):
+    """post_todo_itemのグループコミット版.
+
+    リクエストのセッションでは書き込まず、同時に届いた他の登録とまとめて1回のINSERT文・コミットで書き込む(app.crud.group_commit)。
+    待っている間にリクエストのセッションがプールの接続を占有しないよう(まとめて書き込む側が接続を得られなくなる)、先に閉じる。
+    Returns: 登録したTODO項目の行(コミット済み).
     """
-    db_todo_item = db.query(ItemModel).filter(
-        ItemModel.id == todo_item_id,
-        ItemModel.todo_list_id == todo_list_id,
-    ).first()
+    db.close()
+    return _item_group_commit.submit(_new_todo_item_values(todo_list_id, new_todo_item))
+
 
+def _update_todo_item_values(update_todo_item: UpdateTodoItem) -> dict:
+    values = {}
     # 更新するフィールドが指定されている場合のみ更新
     if update_todo_item.title is not None:
-        db_todo_item.title = update_todo_item.title
+        values["title"] = update_todo_item.title
 
     if update_todo_item.description is not None:
-        db_todo_item.description = update_todo_item.description
+        values["description"] = update_todo_item.description
 
     if update_todo_item.due_at is not None:
-        db_todo_item.due_at = update_todo_item.due_at
+        values["due_at"] = update_todo_item.due_at
 
     # complete フラグが指定されている場合、status_code を更新
     if update_todo_item.complete is not None:
         if update_todo_item.complete:
-            db_todo_item.status_code = TodoItemStatusCode.COMPLETED.value
+            values["status_code"] = TodoItemStatusCode.COMPLETED.value
         else:
-            db_todo_item.status_code = TodoItemStatusCode.NOT_COMPLETED.value
+            values["status_code"] = TodoItemStatusCode.NOT_COMPLETED.value
+    return values
 
-    # 変更をコミットしてデータベースを更新
-    db.commit()
 
-    # 更新後のデータを再取得
-    db.refresh(db_todo_item)
-    return db_todo_item
+def put_todo_item(db: Session, todo_list_id: int, todo_item_id: int, update_todo_item: UpdateTodoItem):
+    """TODO項目を更新する
+        db: データベースセッション
+        todo_list_id: TODO項目が属するTODOリストのID
+        todo_item_id: 更新するTODO項目のID
+        update_todo_item: 更新するデータ
+    Returns: 更新後のTODO項目のデータ。対象が存在しない場合はNone.
+    """
+    values = _update_todo_item_values(update_todo_item)
+    if not values:
+        return get_todo_item(db, todo_list_id, todo_item_id)
+
+    table = ItemModel.__table__
+    conditions = [table.c.id == todo_item_id, table.c.todo_list_id == todo_list_id]
+    on_commit(db, lambda: _invalidate_todo_item(todo_list_id, todo_item_id))
+    status_code = values.pop("status_code", None)
+    if status_code is not None:
+        # ステータスが実際に変わる場合は、他のカラムも同じUPDATE文で更新して完了数を増減する
+        # (変わったかどうかはUPDATEで行が返ったかどうかで判定する)
+        row = update_one(db, table, conditions, {**values, "status_code": status_code}, only_if=(table.c.status_code != status_code,))
+        if row is not None:
+            completed = 1 if status_code == TodoItemStatusCode.COMPLETED.value else -1
+            db.execute(adjust_item_counters(todo_list_id, completed=completed))
+            return row
+    # ステータスが変わらない(または対象が存在しない)場合は、残りのカラムだけを更新する
+    return update_one(db, table, conditions, values) if values else get_todo_item(db, todo_list_id, todo_item_id)
 
 
 def delete_todo_item(db: Session, todo_list_id: int, todo_item_id: int):
@@ -76,19 +174,202 @@ def delete_todo_item(db: Session, todo_list_id: int, todo_item_id: int):
     todo_item_id: 削除するTODO項目のID
      Returns:正常に削除できた場合はTrue
     """
-    db_todo_item = db.query(ItemModel).filter(
-        ItemModel.id == todo_item_id,
-        ItemModel.todo_list_id == todo_list_id,
-    ).first()
+    # 存在確認のSELECTはせず、DELETE文の影響行数で判定する
+    deleted = _delete_counting(db, todo_list_id, [ItemModel.id == todo_item_id, ItemModel.todo_list_id == todo_list_id])
+    on_commit(db, lambda: _invalidate_todo_item(todo_list_id, todo_item_id))
+    return deleted > 0
+
+
+def _invalidate_todo_item(todo_list_id: int, todo_item_id: int) -> None:
+    todo_cache.delete(todo_item_key(todo_list_id, todo_item_id))
+    todo_cache.delete(todo_list_key(todo_list_id))
+
+
+def _invalidate_todo_items(todo_list_id: int) -> None:
+    todo_cache.delete(todo_list_key(todo_list_id))
+    invalidate_todo_items(todo_list_id)
+
+
+def _update_status_counting(db: Session, todo_list_id: int, conditions: list, status_code: int) -> int:
+    """条件に合うTODO項目のうちステータスが異なるものだけを更新し、TODOリストの完了数を増減する.
+
+    TODOリストのキャッシュの無効化は呼び出し側で行う。
+    Returns: ステータスを変更した件数.
+    """
+    table = ItemModel.__table__
+    flipped = db.execute(
+        update(table).where(*conditions, table.c.status_code != status_code).values(status_code=status_code),
+    ).rowcount
+    if flipped:
+        sign = 1 if status_code == TodoItemStatusCode.COMPLETED.value else -1
+        db.execute(adjust_item_counters(todo_list_id, completed=sign * flipped))
+    return flipped
+
+
+def _delete_counting(db: Session, todo_list_id: int, conditions: list) -> int:
+    """条件に合うTODO項目を削除し、TODOリストの項目数・完了数を減らす.
+
+    RETURNINGが使えるDBでは削除した行のステータスを受け取り、使えないDB(MySQL)では
+    完了済みの項目を先に削除して、それぞれの件数をDELETE文の影響行数から得る。
+    TODOリストのキャッシュの無効化は呼び出し側で行う。
+    Returns: 削除した件数.
+    """
+    table = ItemModel.__table__
+    completed_code = TodoItemStatusCode.COMPLETED.value
+    if db.get_bind().dialect.delete_returning:
+        status_codes = db.execute(delete(table).where(*conditions).returning(table.c.status_code)).scalars().all()
+        deleted, completed = len(status_codes), status_codes.count(completed_code)
+    else:
+        completed = db.execute(delete(table).where(*conditions, table.c.status_code == completed_code)).rowcount
+        deleted = completed + db.execute(delete(table).where(*conditions)).rowcount
+    if deleted:
+        db.execute(adjust_item_counters(todo_list_id, items=-deleted, completed=-completed))
+    return deleted
+
+
+def _selected_todo_items(todo_list_id: int, selector: TodoItemSelector) -> list:
+    conditions = [ItemModel.todo_list_id == todo_list_id]
+    if selector.ids is not None:
+        conditions.append(ItemModel.id.in_(selector.ids))
+    if selector.status is not None:
+        conditions.append(ItemModel.status_code == selector.status.value)
+    return conditions
+
+
+def put_todo_items_status(db: Session, todo_list_id: int, bulk_update: BulkUpdateTodoItem) -> int:
+    """条件に合うTODO項目のステータスを1回のUPDATE文で更新する.
+
+    既に指定のステータスになっている項目は更新しない。
+    Returns: ステータスを変更した件数.
+    """
+    status_code = TodoItemStatusCode.COMPLETED if bulk_update.complete else TodoItemStatusCode.NOT_COMPLETED
+    flipped = _update_status_counting(db, todo_list_id, _selected_todo_items(todo_list_id, bulk_update), status_code.value)
+    on_commit(db, lambda: _invalidate_todo_items(todo_list_id))
+    return flipped
+
+
+def delete_todo_items(db: Session, todo_list_id: int, selector: TodoItemSelector) -> int:
+    """条件に合うTODO項目を1回のDELETE文(RETURNING非対応DBでは2回)で削除する.
+
+    Returns: 削除した件数.
+    """
+    deleted = _delete_counting(db, todo_list_id, _selected_todo_items(todo_list_id, selector))
+    on_commit(db, lambda: _invalidate_todo_items(todo_list_id))
+    return deleted
+
+
+def delete_todo_items_batch(db: Session, todo_list_id: int, batch_size: int) -> int:
+    """TODOリストのTODO項目をID順に最大batch_size件削除する(TODOリストの分割削除用).
+
+    削除する範囲を先にIDで確定させ、1回のDELETE文が触れる行数とロックをbatch_size件に抑える。
+    Returns: 削除した件数.
+    """
+    table = ItemModel.__table__
+    ids = db.execute(
+        select(table.c.id).where(table.c.todo_list_id == todo_list_id).order_by(table.c.id).limit(batch_size),
+    ).scalars().all()
+    if not ids:
+        return 0
+    deleted = _delete_counting(db, todo_list_id, [table.c.todo_list_id == todo_list_id, table.c.id.in_(ids)])
+    on_commit(db, lambda: _invalidate_todo_items(todo_list_id))
+    return deleted
+
+
+def _todo_items_stmt(
+    todo_list_id: int,
+    page: int,
+    per_page: int,
+    after: dict | None,
+    columns: tuple = _RESPONSE_COLUMNS,
+    filters: TodoItemFilter | None = None,
+) -> Select:
+    # 一覧は読み取り専用のため、ORMエンティティではなくCoreのselectでカラムだけを読み込む
+    stmt = (
+        select(*columns)
+        .where(ItemModel.todo_list_id == todo_list_id, *filter_conditions(filters))
+        .order_by(*order_by(filters))
+    )
+    if after is not None:
+        # カーソル指定時は並べ替えキーのシークで読み飛ばしを発生させない
+        return stmt.where(seek_condition(filters, after))
+    return stmt.offset((page - 1) * per_page)
+
+
+def get_todo_items(db: Session, todo_list_id: int, page: int = 1, per_page: int = 10, after_id: int | None = None):
 
-    # データベースからレコードを削除
-    if db_todo_item:
-        db.delete(db_todo_item)
-        db.commit()
-        return True
-    return False
+    after = {"id": after_id} if after_id is not None else None
+    return db.execute(_todo_items_stmt(todo_list_id, page, per_page, after).limit(per_page)).all()
 
 
-def get_todo_items(db: Session, todo_list_id: int):
+def get_todo_items_page(
+    db: Session,
+    todo_list_id: int,
+    page: int = 1,
+    per_page: int = 10,
+    after: dict | None = None,
+    *,
+    filters: TodoItemFilter | None = None,
+    versions_only: bool = False,
+):
+    """TODO項目を1ページ分取得し、続きがあるかどうかも返す.
+
+    filtersの絞り込み・並べ替えはSQLで行う。afterには前のページのカーソル(app.pagination.decode_cursor の結果)を渡す。
+    結果は読み取り専用のRowで、セッションには登録されない。
+    versions_onlyを指定した場合は id と updated_at (と並べ替えキー)だけを取得する(ETagの比較用)。
+    """
+    key = sort_key(filters)
+    columns = (ItemModel.id, ItemModel.updated_at) if versions_only else _RESPONSE_COLUMNS
+    if versions_only and key not in {"id", "updated_at"}:
+        columns = (*columns, ORDER_COLUMNS[key])
+    rows = db.execute(_todo_items_stmt(todo_list_id, page, per_page, after, columns, filters).limit(per_page + 1)).all()
+    return rows[:per_page], len(rows) > per_page
 
-    return db.query(ItemModel).filter(ItemModel.todo_list_id == todo_list_id).all()
+
+def get_todo_items_for_lists(db: Session, todo_list_ids: list[int], per_list: int) -> dict[int, list]:
+    """複数のTODOリストのTODO項目を、リスト毎に先頭per_list件まで1回のクエリで取得する.
+
+    リスト毎に「WHERE todo_list_id = ? ORDER BY id LIMIT per_list」を UNION ALL でまとめ、
+    各リストは (todo_list_id, id) のインデックスを先頭からper_list件だけ読む。
+    (ROW_NUMBER() のウィンドウ関数では、上限で絞る前にリストの全項目を走査してしまう。
+    MySQL 8 の LATERAL 結合でも同じ読み方になるが、SQLiteでも動くようにこの形にしている)
+    Returns: TODOリストのID -> TODO項目の行(ID順)のリスト.
+    """
+    items_by_list = {todo_list_id: [] for todo_list_id in todo_list_ids}
+    if not todo_list_ids:
+        return items_by_list
+
+    table = ItemModel.__table__
+    # 各SELECTをサブクエリにする(SQLiteは UNION の各SELECTに直接 ORDER BY / LIMIT を書けない)
+    rows = db.execute(union_all(*(
+        select(head)
+        for head in (
+            select(table).where(table.c.todo_list_id == todo_list_id).order_by(table.c.id).limit(per_list).subquery()
+            for todo_list_id in todo_list_ids
+        )
+    ))).all()
+
+    # 並べ替えはSQLで行わず(UNIONの結果のソートになるため)、リスト毎の最大per_list件をここで並べる
+    for row in sorted(rows, key=lambda row: row.id):
+        items_by_list[row.todo_list_id].append(row)
+    return items_by_list
+
+
+def get_overdue_counts(db: Session, todo_list_ids: list[int]) -> dict[int, int]:
+    """複数のTODOリストについて、期限切れの未完了TODO項目の件数を1回の集計クエリで取得する.
+
+    期限切れかどうかは時間の経過で変わるため、カウンタとしては保持せず読み込み時に集計する。
+    Returns: TODOリストのID -> 期限切れ件数(0件のリストは含まない).
+    """
+    if not todo_list_ids:
+        return {}
+    table = ItemModel.__table__
+    rows = db.execute(
+        select(table.c.todo_list_id, func.count())
+        .where(
+            table.c.todo_list_id.in_(todo_list_ids),
+            table.c.status_code == TodoItemStatusCode.NOT_COMPLETED.value,
+            table.c.due_at < func.now(),
+        )
+        .group_by(table.c.todo_list_id),
+    ).all()
+    return dict(rows)
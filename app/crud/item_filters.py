@@ -0,0 +1,64 @@
+"""TODO項目一覧の絞り込み・並べ替え条件をSQLの式にする(同期・async両方のCRUDで使う)."""
+
+from sqlalchemy import and_, or_
+
+from app.models.item_model import ItemModel
+from app.schemas.item_schema import TodoItemFilter
+
+# 並べ替えに使えるカラム(いずれもtodo_list_idを先頭にしたインデックスがある)
+ORDER_COLUMNS = {
+    "id": ItemModel.id,
+    "due_at": ItemModel.due_at,
+    "created_at": ItemModel.created_at,
+}
+
+
+def sort_key(filters: TodoItemFilter | None) -> str:
+    """並べ替えに使うカラム名(カーソルに含めるキー)."""
+    return filters.order.removeprefix("-") if filters is not None else "id"
+
+
+def filter_conditions(filters: TodoItemFilter | None) -> list:
+    conditions = []
+    if filters is None:
+        return conditions
+    if filters.status is not None:
+        conditions.append(ItemModel.status_code == filters.status.value)
+    if filters.due_after is not None:
+        conditions.append(ItemModel.due_at >= filters.due_after)
+    if filters.due_before is not None:
+        conditions.append(ItemModel.due_at < filters.due_before)
+    if filters.updated_since is not None:
+        conditions.append(ItemModel.updated_at >= filters.updated_since)
+    return conditions
+
+
+def order_by(filters: TodoItemFilter | None) -> list:
+    """ORDER BY句. 同じ値の行の順序を一意にするため、最後にidで並べる."""
+    descending = filters is not None and filters.order.startswith("-")
+    columns = [ORDER_COLUMNS[sort_key(filters)]]
+    if columns[0] is not ItemModel.id:
+        columns.append(ItemModel.id)
+    return [x.desc() if descending else x.asc() for x in columns]
+
+
+def seek_condition(filters: TodoItemFilter | None, after: dict):
+    """カーソル(前のページの最後の行のキー)より後ろの行を選ぶ条件.
+
+    MySQL・SQLiteでは昇順でNULLが先頭、降順で末尾に並ぶため、NULLになりうるカラム(due_at)ではそれも考慮する。
+    """
+    key = sort_key(filters)
+    descending = filters is not None and filters.order.startswith("-")
+    after_id = after["id"]
+    id_after = ItemModel.id < after_id if descending else ItemModel.id > after_id
+    if key == "id":
+        return id_after
+
+    column = ORDER_COLUMNS[key]
+    value = after[key]
+    if value is None:
+        # NULLの行の途中から: 昇順なら続きのNULLの行と非NULLの全行、降順なら続きのNULLの行のみ
+        return and_(column.is_(None), id_after) if descending else or_(and_(column.is_(None), id_after), column.is_not(None))
+    if descending:
+        return or_(column < value, and_(column == value, id_after), column.is_(None))
+    return or_(column > value, and_(column == value, id_after))
@@ -1,19 +1,81 @@
 
+import time
+
+from sqlalchemy import Select, case, delete, func, select, update
 from sqlalchemy.orm import Session
 
+from app.cache import invalidate_todo_items, read_through, todo_cache, todo_list_key
+from app.const import TodoItemStatusCode
+from app import const
+from app.crud.item_crud import delete_todo_items_batch, get_overdue_counts
+from app.crud.returning import update_one
+from app.database import is_replica
+from app.models.item_model import ItemModel
 from app.models.list_model import ListModel
-from app.schemas.list_schema import NewTodoList, UpdateTodoList
+from app.schemas.list_schema import NewTodoList, ResponseTodoList, UpdateTodoList
+from app.unit_of_work import on_commit
+
+# 一覧で読み込むカラム(レスポンスのスキーマにあるものだけ)
+_RESPONSE_COLUMNS = tuple(column for column in ListModel.__table__.c if column.name in ResponseTodoList.model_fields)
+
+
+def _todo_lists_stmt(page: int, per_page: int, after_id: int | None, columns: tuple = _RESPONSE_COLUMNS) -> Select:
+    # 一覧は読み取り専用のため、ORMエンティティではなくCoreのselectでカラムだけを読み込む
+    # (identity mapへの登録や属性の計装を行わず、結果は軽量なRowになる)
+    table = ListModel.__table__
+    stmt = select(*columns).order_by(table.c.id)
+    if after_id is not None:
+        # カーソル指定時は主キーのシークで読み飛ばしを発生させない
+        return stmt.where(table.c.id > after_id)
+    return stmt.offset((page - 1) * per_page)
+
 
   #TODOリスト一覧取得 API(15)
-def get_todo_lists(db: Session, page: int = 1, per_page: int = 10):
-    
-    offset = (page - 1) * per_page
-    return db.query(ListModel).order_by(ListModel.id).offset(offset).limit(per_page).all()
+def get_todo_lists(db: Session, page: int = 1, per_page: int = 10, after_id: int | None = None):
+
+    return db.execute(_todo_lists_stmt(page, per_page, after_id).limit(per_page)).all()
+
+
+def get_todo_lists_page(db: Session, page: int = 1, per_page: int = 10, after_id: int | None = None, *, versions_only: bool = False):
+    """TODOリストを1ページ分取得し、続きがあるかどうかも返す.
+
+    per_page + 1 件を取得して、次のページの有無を追加クエリなしで判定する。
+    結果は読み取り専用のRow(属性でカラムの値を参照できる)で、セッションには登録されない。
+    versions_onlyを指定した場合は id と updated_at だけを取得する(ETagの比較用)。
+    """
+    table = ListModel.__table__
+    columns = (table.c.id, table.c.updated_at) if versions_only else _RESPONSE_COLUMNS
+    rows = db.execute(_todo_lists_stmt(page, per_page, after_id, columns).limit(per_page + 1)).all()
+    return rows[:per_page], len(rows) > per_page
 
 
 def get_todo_list(db: Session, todo_list_id: int):
-    # - 取得した DB データをそのまま返却する関数としてください。
-    return db.query(ListModel).filter(ListModel.id == todo_list_id).first()
+    # キャッシュ(app.cache)を経由して取得し、キャッシュにない場合のみDBを読む
+    # 返却値はORMオブジェクトではなく、カラム名を属性に持つ読み取り専用の値
+    table = ListModel.__table__
+    return read_through(
+        todo_list_key(todo_list_id),
+        lambda: db.execute(select(table).where(table.c.id == todo_list_id)).first(),
+        store=not is_replica(db),
+    )
+
+
+def get_todo_list_with_overdue(db: Session, todo_list_id: int):
+    """get_todo_listの値に期限切れの未完了TODO項目の件数(overdue_count)を加えて返す.
+
+    期限切れ件数もTODOリストのキャッシュの値に含め、CACHE_OVERDUE_TTL秒の間は集計クエリを実行しない。
+    TODO項目の書き込みではTODOリストのキャッシュごと無効化されるため、遅れて反映されるのは時間の経過による変化だけになる。
+    """
+    todo_list = get_todo_list(db, todo_list_id)
+    if todo_list is None or getattr(todo_list, "overdue_expires_at", 0) > time.time():
+        return todo_list
+    cached = dict(vars(todo_list))
+    todo_list.overdue_count = get_overdue_counts(db, [todo_list_id]).get(todo_list_id, 0)
+    todo_list.overdue_expires_at = time.time() + const.CACHE_OVERDUE_TTL
+    if not is_replica(db):
+        # 集計の間に無効化された場合は、古い値を戻さないよう置き換えない
+        todo_cache.replace(todo_list_key(todo_list_id), cached, vars(todo_list))
+    return todo_list
 
 
 def post_todo_list(db: Session, new_todo_list: NewTodoList):
@@ -23,7 +85,8 @@ def post_todo_list(db: Session, new_todo_list: NewTodoList):
     )
 
     db.add(db_todo_list)
-    db.commit()
+    # コミットはリクエストの終了時に行う(app.unit_of_work). IDとDB側の既定値はflush・refreshで得る
+    db.flush()
     db.refresh(db_todo_list)
     # 登録した DB データをそのまま返却する関数としてください。
     return db_todo_list
@@ -31,31 +94,124 @@ def post_todo_list(db: Session, new_todo_list: NewTodoList):
 
 
 def put_todo_list(db: Session, todo_list_id: int, todo_list: UpdateTodoList):
-    db_todo_list = db.query(ListModel).filter(ListModel.id == todo_list_id).first()
-
+    values = {}
     # 更新するフィールドが指定されている場合のみ更新(重要)
     if todo_list.title is not None:
-        db_todo_list.title = todo_list.title
+        values["title"] = todo_list.title
 
     if todo_list.description is not None:
-        db_todo_list.description = todo_list.description
-     # 変更をコミットしてデータベースを更新
-    db.commit()
+        values["description"] = todo_list.description
 
-    # 更新後のデータを再取得
-    db.refresh(db_todo_list)
+    if not values:
+        return get_todo_list(db, todo_list_id)
 
-    return db_todo_list
+    # 存在確認・更新・再取得を1回のUPDATE文(RETURNING非対応DBではUPDATE+SELECT)で行う
+    # 対象が存在しない場合はNoneを返す
+    table = ListModel.__table__
+    row = update_one(db, table, [table.c.id == todo_list_id], values)
+    on_commit(db, lambda: todo_cache.delete(todo_list_key(todo_list_id)))
+    return row
 
     # 　-TODOリスト削除処理です。
 
 
 def delete_todo_list(db: Session, todo_list_id: int):
-    db_todo_list = db.query(ListModel).filter(ListModel.id == todo_list_id).first()
+    # 存在確認のSELECTはせず、DELETE文の影響行数で判定する
+    # (TODO項目はDBのON DELETE CASCADEで削除され、アプリには読み込まない)
+    result = db.execute(
+        delete(ListModel).where(ListModel.id == todo_list_id),
+        execution_options={"synchronize_session": False},
+    )
+    on_commit(db, lambda: _invalidate_todo_list(todo_list_id))
+    # 削除処理の場合、 DB のデータを返却するのではなく、正常に削除できたか否かを返却するようにしましょう。
+    return result.rowcount > 0
+
 
-    if db_todo_list:
-        db.delete(db_todo_list)
+def purge_todo_list(db: Session, todo_list_id: int, *, batch_size: int = 1000, pause: float = 0.0) -> bool:
+    """TODO項目の多いTODOリストを、TODO項目からbatch_size件ずつ分割して削除する.
+
+    1回の削除(ON DELETE CASCADE)で全項目を消すと、ロックの保持とレプリカへの反映が長引くため、
+    batch_size件毎にコミットし、バッチの間にpause秒待つ。TODO項目を消し終えてからTODOリストを削除する。
+    途中で中断した場合も、削除済みの項目の分だけカウンタは減っており、再実行すれば続きから削除できる。
+    APIのCRUDと違いバッチ毎に自分でコミットする(バックグラウンドで実行するため)。
+    Returns: TODOリストを削除できた場合はTrue.
+    """
+    while delete_todo_items_batch(db, todo_list_id, batch_size):
         db.commit()
-        return True
-    # 削除処理の場合、 DB のデータを返却するのではなく、正常に削除できたか否かを返却するようにしましょう。
-    return False
+        if pause:
+            time.sleep(pause)
+    deleted = delete_todo_list(db, todo_list_id)
+    db.commit()
+    return deleted
+
+
+def _invalidate_todo_list(todo_list_id: int) -> None:
+    todo_cache.delete(todo_list_key(todo_list_id))
+    invalidate_todo_items(todo_list_id)
+
+
+def reconcile_item_counters(db: Session, *, fix: bool = False, batch_size: int = 1000) -> list[dict]:
+    """TODOリストの項目数・完了数のカウンタを、todo_itemsの実際の件数と突き合わせる.
+
+    TODOリストをID順にbatch_size件ずつ読み、バッチ毎に1回の集計クエリで実際の件数を求める。
+    fixを指定した場合は食い違っているTODOリストのカウンタを、バッチ毎に1回のUPDATE文の中で数え直した件数で上書きする
+    (集計クエリで読んだ件数で上書きすると、その後に他のトランザクションが加算・減算した分が失われるため)。
+    コマンド(app.cli.reconcile_counters)用のため、APIのCRUDと違いバッチ毎に自分でコミットする。
+    Returns: 食い違っていたTODOリスト毎の {id, item_count, completed_count, actual_item_count, actual_completed_count}.
+    """
+    lists = ListModel.__table__
+    items = ItemModel.__table__
+    # 更新するTODOリストの行と相関させたサブクエリで、UPDATEの実行時点の実際の件数を数える
+    actual_counts = {
+        "item_count": select(func.count()).where(items.c.todo_list_id == lists.c.id).scalar_subquery(),
+        "completed_count": select(func.count()).where(
+            items.c.todo_list_id == lists.c.id,
+            items.c.status_code == TodoItemStatusCode.COMPLETED.value,
+        ).scalar_subquery(),
+    }
+    mismatches = []
+    fixed = 0
+    last_id = 0
+    while True:
+        counters = db.execute(
+            select(lists.c.id, lists.c.item_count, lists.c.completed_count)
+            .where(lists.c.id > last_id)
+            .order_by(lists.c.id)
+            .limit(batch_size),
+        ).all()
+        if not counters:
+            return mismatches
+        last_id = counters[-1].id
+
+        actual = {
+            row.todo_list_id: row
+            for row in db.execute(
+                select(
+                    items.c.todo_list_id,
+                    func.count().label("item_count"),
+                    func.sum(case((items.c.status_code == TodoItemStatusCode.COMPLETED.value, 1), else_=0)).label("completed_count"),
+                )
+                .where(items.c.todo_list_id.in_([x.id for x in counters]))
+                .group_by(items.c.todo_list_id),
+            )
+        }
+        for x in counters:
+            actual_item_count = actual[x.id].item_count if x.id in actual else 0
+            actual_completed_count = int(actual[x.id].completed_count) if x.id in actual else 0
+            if (x.item_count, x.completed_count) == (actual_item_count, actual_completed_count):
+                continue
+            mismatches.append({
+                "id": x.id,
+                "item_count": x.item_count,
+                "completed_count": x.completed_count,
+                "actual_item_count": actual_item_count,
+                "actual_completed_count": actual_completed_count,
+            })
+        if fix:
+            fixing = [x["id"] for x in mismatches[fixed:]]
+            if fixing:
+                db.execute(update(lists).where(lists.c.id.in_(fixing)).values(**actual_counts))
+            db.commit()
+            for todo_list_id in fixing:
+                todo_cache.delete(todo_list_key(todo_list_id))
+            fixed = len(mismatches)
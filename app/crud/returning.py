@@ -0,0 +1,24 @@
+"""1行を対象とするUPDATE文を、再SELECTを極力せずに実行するためのヘルパー."""
+
+from sqlalchemy import Row, Table, select, update
+from sqlalchemy.orm import Session
+
+
+def update_one(db: Session, table: Table, conditions: list, values: dict, only_if: tuple = ()) -> Row | None:
+    """conditionsに合う1行をvaluesで更新し、更新後の行を返す.
+
+    RETURNINGが使えるDBでは UPDATE ... RETURNING の1文で済ませ、
+    使えないDB(MySQL)では UPDATE の影響行数で存在を判定してから1回だけSELECTする。
+    only_ifにはUPDATE文にだけ加える条件(更新で成り立たなくなるもの。例: 変更前のステータス)を渡す。
+    コミットは呼び出し側(リクエストの終了時)で行う。
+    Returns: 更新後の行。対象が存在しない(only_ifに合わない)場合はNone.
+    """
+    stmt = update(table).where(*conditions, *only_if).values(**values)
+
+    if db.get_bind().dialect.update_returning:
+        row = db.execute(stmt.returning(*table.c)).first()
+    elif db.execute(stmt).rowcount == 0:
+        row = None
+    else:
+        row = db.execute(select(table).where(*conditions)).first()
+    return row
@@ -0,0 +1,143 @@
+"""TODOリスト・TODO項目のタイトル・説明の全文検索.
+
+MySQLではngramパーサのFULLTEXTインデックス(マイグレーションで作成)を、
+SQLite(ローカルでのテスト用)ではFTS5の仮想テーブルを使い、同じインターフェースで検索する。
+"""
+
+from abc import ABC, abstractmethod
+
+from sqlalchemy import Select, literal, select, text, union_all
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.models.item_model import ItemModel
+from app.models.list_model import ListModel
+
+# 検索対象のテーブル -> FULLTEXTインデックス名(MySQL) / FTS5仮想テーブル名(SQLite)
+FULLTEXT_INDEXES = {
+    "todo_lists": "ft_todo_lists_title_description",
+    "todo_items": "ft_todo_items_title_description",
+}
+FTS5_TABLES = {
+    "todo_lists": "todo_lists_fts",
+    "todo_items": "todo_items_fts",
+}
+
+
+class SearchBackend(ABC):
+    """全文検索の実装のインターフェース."""
+
+    @abstractmethod
+    def search(self, db: Session, query: str, limit: int, offset: int) -> list:
+        """スコアの高い順にヒットした行(kind, id, todo_list_id, title, description, score)を返す."""
+
+    @abstractmethod
+    def rebuild(self, db: Session) -> None:
+        """全文検索インデックスを作り直す."""
+
+
+class MySQLFullTextSearch(SearchBackend):
+    """MySQLのFULLTEXTインデックス(ngramパーサ)による検索."""
+
+    def _hits(self, table, kind: str, todo_list_id, query: str) -> Select:  # noqa: ANN001
+        relevance = match(table.c.title, table.c.description, against=query).in_natural_language_mode()
+        return select(
+            literal(kind).label("kind"),
+            table.c.id,
+            todo_list_id.label("todo_list_id"),
+            table.c.title,
+            table.c.description,
+            relevance.label("score"),
+        ).where(relevance > 0)
+
+    def search(self, db: Session, query: str, limit: int, offset: int) -> list:
+        lists, items = ListModel.__table__, ItemModel.__table__
+        hits = union_all(
+            self._hits(lists, "list", lists.c.id, query),
+            self._hits(items, "item", items.c.todo_list_id, query),
+        ).subquery()
+        return db.execute(
+            select(hits).order_by(hits.c.score.desc(), hits.c.kind, hits.c.id).limit(limit).offset(offset),
+        ).all()
+
+    def rebuild(self, db: Session) -> None:
+        # ngram_token_size やストップワードを変更した場合は、インデックスを作り直さないと反映されない
+        for table, index in FULLTEXT_INDEXES.items():
+            db.execute(text(f"ALTER TABLE {table} DROP INDEX {index}"))
+            db.execute(text(f"ALTER TABLE {table} ADD FULLTEXT INDEX {index} (title, description) WITH PARSER ngram"))
+        db.commit()
+
+
+class SQLiteFTS5Search(SearchBackend):
+    """SQLiteのFTS5による検索(ローカル・テスト用).
+
+    元のテーブルを参照する外部コンテンツのFTS5テーブルを使い、トリガーで同期する。
+    日本語の検索のためtrigramトークナイザを使う。3文字未満の語はインデックスでは検索できないため、
+    LIKEによる全件走査(スコアは0)になる。
+    """
+
+    # trigramトークナイザでインデックスを使って検索できる最短の語の長さ
+    MIN_QUERY_LENGTH = 3
+
+    def _hits(self, table: str, kind: str, todo_list_id: str, *, use_index: bool) -> str:
+        fts = FTS5_TABLES[table]
+        if use_index:
+            score, where = f"-bm25({fts})", f"{fts} MATCH :query"
+        else:
+            score, where = "0.0", f"({fts}.title LIKE :query ESCAPE '\\' OR {fts}.description LIKE :query ESCAPE '\\')"
+        return (
+            f"SELECT '{kind}' AS kind, t.id AS id, t.{todo_list_id} AS todo_list_id, t.title AS title,"  # noqa: S608
+            f" t.description AS description, {score} AS score"
+            f" FROM {fts} JOIN {table} AS t ON t.id = {fts}.rowid WHERE {where}"
+        )
+
+    def search(self, db: Session, query: str, limit: int, offset: int) -> list:
+        use_index = len(query) >= self.MIN_QUERY_LENGTH
+        if use_index:
+            # 検索語は1つのフレーズとして扱う(FTS5の演算子として解釈させない)
+            query = '"' + query.replace('"', '""') + '"'
+        else:
+            # %・_ は文字そのものとして検索する
+            query = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return db.execute(
+            text(
+                f"{self._hits('todo_lists', 'list', 'id', use_index=use_index)}"
+                f" UNION ALL {self._hits('todo_items', 'item', 'todo_list_id', use_index=use_index)}"
+                " ORDER BY score DESC, kind, id LIMIT :limit OFFSET :offset",
+            ),
+            {"query": query, "limit": limit, "offset": offset},
+        ).all()
+
+    def rebuild(self, db: Session) -> None:
+        for table, fts in FTS5_TABLES.items():
+            db.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(title, description, content='{table}', content_rowid='id', tokenize='trigram')",
+            ))
+            db.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN"
+                f" INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+            ))
+            db.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN"
+                f" INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+            ))
+            db.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF title, description ON {table} BEGIN"
+                f" INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+                f" INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+            ))
+            db.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        db.commit()
+
+
+def search_backend(db: Session) -> SearchBackend:
+    """接続先のDBに応じた全文検索の実装を返す."""
+    if db.get_bind().dialect.name == "sqlite":
+        return SQLiteFTS5Search()
+    return MySQLFullTextSearch()
+
+
+def search_todos(db: Session, query: str, page: int = 1, per_page: int = 10):
+    """TODOリスト・TODO項目をまとめて全文検索し、スコア順の1ページ分と続きがあるかどうかを返す."""
+    rows = search_backend(db).search(db, query, limit=per_page + 1, offset=(page - 1) * per_page)
+    return rows[:per_page], len(rows) > per_page
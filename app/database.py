@@ -1,31 +1,203 @@
-"""SQLAlchemy用."""
+"""SQLAlchemy用.
 
-from debug_toolbar.panels.sqlalchemy import SQLAlchemyPanel as BasePanel
-from fastapi import Request
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+エンジン(engine・replica_engine・async_engine・async_replica_engine)とセッションファクトリ(SessionLocal等)は、
+読み込み時ではなく最初に参照された時に作る(起動を速くし、DBの環境変数がなくても読み込めるようにするため)。
+`from app.database import engine` や `database.engine` のように属性として参照する。
+"""
 
-from app import const
+import threading
 
-DATABASE_URL = f"mysql+pymysql://{const.DB_USER}:{const.DB_PASS}@{const.DB_HOST}/{const.DB_NAME}?charset=utf8"
+from sqlalchemy import DateTime, Engine, create_engine, event, make_url, pool
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
+from app import const, pool_stats
+
+DATABASE_URL = const.DB_URL or f"mysql+pymysql://{const.DB_USER}:{const.DB_PASS}@{const.DB_HOST}/{const.DB_NAME}?charset=utf8"
+# 読み込み専用のレプリカ(未設定の場合はNone)
+REPLICA_DATABASE_URL = const.DB_REPLICA_URL or (
+    f"mysql+pymysql://{const.DB_USER}:{const.DB_PASS}@{const.DB_REPLICA_HOST}/{const.DB_NAME}?charset=utf8" if const.DB_REPLICA_HOST else None
 )
 
-SessionLocal = scoped_session(
-    sessionmaker(
+# 同期ドライバ名から対応するasyncioドライバ名への対応表
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def pool_options(name: str, *, is_async: bool = False) -> dict:
+    """環境変数のプール設定からcreate_engine用の引数を作る.
+
+    nameはプール統計(app.pool_stats)に登録する名前。
+    """
+    pool_class = getattr(pool, const.DB_POOL_CLASS)
+    if is_async and pool_class is pool.QueuePool:
+        pool_class = pool.AsyncAdaptedQueuePool
+
+    options = {
+        "poolclass": pool_stats.instrumented_pool_class(name, pool_class),
+        "pool_pre_ping": const.DB_POOL_PRE_PING,
+        "pool_recycle": const.DB_POOL_RECYCLE,
+    }
+    # サイズ指定はQueuePool系のみが受け付ける
+    if issubclass(pool_class, pool.QueuePool):
+        options.update(
+            pool_size=const.DB_POOL_SIZE,
+            max_overflow=const.DB_MAX_OVERFLOW,
+            pool_timeout=const.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """SQLiteの場合は接続毎に外部キー制約を有効にする.
+
+    SQLiteは既定では外部キー制約(ON DELETE CASCADE)を無視するため、ローカル検証でもMySQLと同じく
+    TODOリストの削除でTODO項目が削除されるようにする。
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, _) -> None:  # noqa: ANN001
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+def _create_engine():
+    engine = create_engine(
+        DATABASE_URL,
+        echo=False,
+        **pool_options("primary"),
+    )
+    enable_sqlite_foreign_keys(engine)
+    pool_stats.bind_engine("primary", engine)
+    return engine
+
+
+def _create_session_local():
+    # スレッド毎のセッション(scoped_session)は使わず、呼び出し毎に新しいセッションを作る
+    # (同期のエンドポイントはスレッドプールの任意のスレッドで実行され、並行するリクエスト間で共有されてしまうため。
+    # APIではapp.dependencies.get_dbがリクエスト毎に作る)
+    return sessionmaker(
         autocommit=False,
         autoflush=False,
-        bind=engine,
-    ),
-)
+        bind=_get("engine"),
+    )
+
+
+def _create_replica_engine():
+    # 読み込み専用のレプリカ(未設定の場合はNoneで、読み込みもプライマリで行う)
+    if not REPLICA_DATABASE_URL:
+        return None
+    replica_engine = create_engine(REPLICA_DATABASE_URL, echo=False, **pool_options("replica"))
+    enable_sqlite_foreign_keys(replica_engine)
+    pool_stats.bind_engine("replica", replica_engine)
+    return replica_engine
+
+
+def _create_replica_session_local():
+    # レプリカのセッションはinfo["replica"]で区別する(キャッシュに遅延した値を書き込まないため等)
+    replica_engine = _get("replica_engine")
+    if replica_engine is None:
+        return None
+    return sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, info={"replica": True})
+
+
+def is_replica(db: Session) -> bool:
+    """セッションがレプリカに接続するものかどうか."""
+    return db.info.get("replica", False)
+
+
+def to_async_url(url: str) -> str:
+    """同期ドライバのURLをasyncioドライバのURLに変換する."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
 
-Base = declarative_base()
 
+# asyncモードの場合のみドライバを読み込む(aiomysql等が未導入でも同期モードは動くように)
+def _create_async_engine():
+    if not const.DB_ASYNC:
+        return None
+    from sqlalchemy.ext.asyncio import create_async_engine  # noqa: PLC0415
 
-class SQLAlchemyPanel(BasePanel):
-    """FastAPI Debug BarにSQLAlchemyクエリ実行結果表示パネルを追加するための記述."""
-    async def add_engines(self, _: Request) -> None:  # noqa: D102
-        self.engines.add(engine)
+    async_engine = create_async_engine(to_async_url(DATABASE_URL), echo=False, **pool_options("async", is_async=True))
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+    pool_stats.bind_engine("async", async_engine.sync_engine)
+    return async_engine
+
+
+def async_session_local(async_engine, *, replica: bool = False):  # noqa: ANN001, ANN201
+    """asyncエンジンのセッションファクトリを作る.
+
+    エンドポイントは同期版と共通で AsyncSession.run_sync の中で実行するため(app.routers.async_router)、
+    コミット後に属性を読み直さない(レスポンスの変換時にイベントループの外でSQLを実行しない)ようにする。
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: PLC0415
+
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, info={"replica": replica})
+
+
+def _create_async_session_local():
+    if not const.DB_ASYNC:
+        return None
+    return async_session_local(_get("async_engine"))
+
+
+def _create_async_replica_engine():
+    if not const.DB_ASYNC or not REPLICA_DATABASE_URL:
+        return None
+    from sqlalchemy.ext.asyncio import create_async_engine  # noqa: PLC0415
+
+    async_replica_engine = create_async_engine(to_async_url(REPLICA_DATABASE_URL), echo=False, **pool_options("async_replica", is_async=True))
+    enable_sqlite_foreign_keys(async_replica_engine.sync_engine)
+    pool_stats.bind_engine("async_replica", async_replica_engine.sync_engine)
+    return async_replica_engine
+
+
+def _create_async_replica_session_local():
+    async_replica_engine = _get("async_replica_engine")
+    if async_replica_engine is None:
+        return None
+    return async_session_local(async_replica_engine, replica=True)
+
+
+# 最初に参照された時に作る属性 -> 作成する関数
+_LAZY_ATTRIBUTES = {
+    "engine": _create_engine,
+    "SessionLocal": _create_session_local,
+    "replica_engine": _create_replica_engine,
+    "ReplicaSessionLocal": _create_replica_session_local,
+    "async_engine": _create_async_engine,
+    "AsyncSessionLocal": _create_async_session_local,
+    "async_replica_engine": _create_async_replica_engine,
+    "AsyncReplicaSessionLocal": _create_async_replica_session_local,
+}
+_lazy_lock = threading.RLock()
+
+
+def _get(name: str):  # noqa: ANN202
+    # 作成後(またはテストで差し替えた後)はモジュール属性になり、__getattr__は呼ばれなくなる
+    with _lazy_lock:
+        if name not in globals():
+            globals()[name] = _LAZY_ATTRIBUTES[name]()
+        return globals()[name]
+
+
+def __getattr__(name: str):  # noqa: ANN202
+    if name in _LAZY_ATTRIBUTES:
+        return _get(name)
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+Base = declarative_base()
+
+# DB側の現在日時(server_default / onupdate の func.now())を入れるカラムの型
+# SQLiteのCURRENT_TIMESTAMPは秒までの文字列のため、アプリから渡す日時(カーソルや絞り込みの値)も同じ形式にする
+# (SQLAlchemyの既定のマイクロ秒付きの形式では、文字列として比較され同じ日時でも一致しない。MySQLのDATETIMEも秒まで)
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
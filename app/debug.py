@@ -0,0 +1,12 @@
+"""DEBUG時のみ使うデバッグツールバー用(DEBUG=true の場合のみ読み込まれる)."""
+
+from debug_toolbar.panels.sqlalchemy import SQLAlchemyPanel as BasePanel
+from fastapi import Request
+
+from app import database
+
+
+class SQLAlchemyPanel(BasePanel):
+    """FastAPI Debug BarにSQLAlchemyクエリ実行結果表示パネルを追加するための記述."""
+    async def add_engines(self, _: Request) -> None:  # noqa: D102
+        self.engines.add(database.engine)
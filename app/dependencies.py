@@ -1,9 +1,62 @@
-from .database import SessionLocal
+from fastapi import Request, Response
+from sqlalchemy import Engine
 
+from . import database, replica
 
-def get_db():
-    db = SessionLocal()
+# データを変更しないHTTPメソッド
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def get_db(request: Request, response: Response):
+    """書き込み用(プライマリ)のセッション.
+
+    リクエスト毎に1つのセッション・1つのトランザクションとし(app.unit_of_work)、
+    エンドポイントが正常に終了したら1回だけコミットし、例外(HTTPExceptionを含む)の場合はロールバックする。
+    コミットはレスポンスの送信前に行われるため、コミットに失敗した場合はクライアントにもエラーが返る。
+    更新系のリクエストでは、同じクライアントの直後の読み込みもプライマリに向ける(app.replica)。
+    """
+    if request.method not in SAFE_METHODS and database.replica_engine is not None:
+        replica.mark_written(response)
+    db = database.SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """読み込み専用のエンドポイント用のセッション. 使える場合はレプリカに接続する(app.replica)."""
+    db = database.ReplicaSessionLocal() if replica.use_replica(request) else database.SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_engine(request: Request) -> Engine:
+    """セッションを使わずに接続する読み込み(エクスポート等)用のエンジン. 振り分けはget_read_dbと同じ."""
+    return database.replica_engine if replica.use_replica(request) else database.engine
+
+
+async def get_async_db(request: Request, response: Response):
+    """get_dbのasync版(DB_ASYNC=true の場合に使用. コミット・ロールバックとレプリカへの振り分けは同期版と同じ)."""
+    if request.method not in SAFE_METHODS and database.replica_engine is not None:
+        replica.mark_written(response)
+    async with database.AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def get_async_read_db(request: Request):
+    """get_read_dbのasync版."""
+    session_local = database.AsyncReplicaSessionLocal if await replica.use_replica_async(request) else database.AsyncSessionLocal
+    async with session_local() as db:
+        yield db
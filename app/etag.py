@@ -0,0 +1,58 @@
+"""ETagと条件付きGET(If-None-Match / 304 Not Modified)用のヘルパー.
+
+ETagは各行のidとupdated_atから作る。updated_atは秒単位のため(SQLiteのCURRENT_TIMESTAMP・MySQLのDATETIME)、
+同じ秒の中で2回更新されるとETagが変わらないことがある。バイト単位の同一性は保証できないので、
+弱いETag(W/"...")として返す。クライアントは最大1秒分の更新を見逃して304を受け取る可能性がある。
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+ETAG_HEADER = "ETag"
+
+
+def _etag(parts: list[str]) -> str:
+    digest = hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _version(row) -> str:  # noqa: ANN001
+    return f"{row.id}:{row.updated_at.isoformat() if row.updated_at else ''}"
+
+
+def row_etag(row, *extra: str) -> str:  # noqa: ANN001
+    """1行(TODOリスト・TODO項目)のETagをidとupdated_atから作る.
+
+    extraにはupdated_atに反映されない、レスポンスに含まれる他の値を渡す。
+    """
+    return _etag([_version(row), *extra])
+
+
+def page_etag(rows: list, *extra: str) -> str:
+    """一覧1ページ分のETagを、各行のidとupdated_atのダイジェストから作る.
+
+    extraにはページの内容に影響する他の値(続きの有無など)を渡す。
+    """
+    return _etag([_version(row) for row in rows] + list(extra))
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Matchは弱い比較で判定する(W/ を無視して比較)
+    candidates = [x.strip().removeprefix("W/") for x in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def conditional_get(request: Request, response: Response, etag: str) -> Response | None:
+    """If-None-MatchがETagと一致すれば304レスポンスを返す.
+
+    一致しない場合はresponseにETagを設定してNoneを返すので、呼び出し側は通常のレスポンスを返せばよい。
+    それまでにresponseへ設定したヘッダー(ページネーション等)は304レスポンスにも引き継ぐ。
+    """
+    response.headers[ETAG_HEADER] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
@@ -0,0 +1,55 @@
+"""エクスポートのレスポンス(NDJSON / CSV)を行のまとまり毎に書き出すヘルパー."""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Literal
+
+from fastapi.responses import StreamingResponse
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(type(value).__name__)
+
+
+def _ndjson(batches: Iterable[list]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(json.dumps(row._asdict(), default=_json_default, ensure_ascii=False) + "\n" for row in rows).encode()
+
+
+def _csv(batches: Iterable[list], columns: list[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows((x.isoformat() if isinstance(x, datetime) else x for x in row) for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # 1行もない場合はヘッダーのみ
+        yield buffer.getvalue().encode()
+
+
+def export_response(batches: Iterable[list], columns: list[str], export_format: ExportFormat, filename: str) -> StreamingResponse:
+    """行のまとまりのイテレータを、まとまり毎に書き出すStreamingResponseにする.
+
+    メモリに保持するのは1まとまり分の行とその変換結果だけになる。
+    """
+    content = _ndjson(batches) if export_format == "ndjson" else _csv(batches, columns)
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
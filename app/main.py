@@ -1,9 +1,19 @@
 import os
 
 # 2. サードパーティライブラリのインポート
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
-from app.routers import item_router, list_router
+from app import const, metrics, pool_stats
+from app.cache import todo_cache
+from app.query_stats import QueryStatsMiddleware
+from app.routers import export_router, import_router, search_router
+
+# DB_ASYNC=true の場合はasyncioネイティブのDBアクセスを行うルーターを使用する(使わない方は読み込まない)
+if const.DB_ASYNC:
+    from app.routers import async_item_router as item_router
+    from app.routers import async_list_router as list_router
+else:
+    from app.routers import item_router, list_router
 
 # 3. ローカルアプリケーション/ライブラリのインポート
 
@@ -12,8 +22,13 @@ DEBUG = os.environ.get("DEBUG", "") == "true"
 app = FastAPI(
     title="Python Backend Stations",
     debug=DEBUG,
+    lifespan=metrics.lifespan,
 )
 
+# リクエスト毎のSQL実行回数・時間(Server-Timing / X-DB-Queries ヘッダー)
+app.add_middleware(QueryStatsMiddleware)
+# /metrics 用のレイテンシ・処理中のリクエスト数(最後に追加したものが最も外側で実行される)
+app.add_middleware(metrics.MetricsMiddleware)
 
 if DEBUG:
     from debug_toolbar.middleware import DebugToolbarMiddleware
@@ -21,7 +36,7 @@ if DEBUG:
     # panelsに追加で表示するパネルを指定できる
     app.add_middleware(
         DebugToolbarMiddleware,
-        panels=["app.database.SQLAlchemyPanel"],
+        panels=["app.debug.SQLAlchemyPanel"],
     )
 
 
@@ -36,7 +51,30 @@ def get_health():
     return {"status": "ok"}
 
 
+@app.get("/health/db-pool", tags=["System"])
+def get_db_pool_stats():
+    """コネクションプールの現在の利用状況とチェックアウト待ち時間の分布を返す."""
+    return pool_stats.snapshot_all()
+
+
+@app.get("/health/cache", tags=["System"])
+def get_cache_stats():
+    """単一のTODOリスト・TODO項目取得キャッシュのヒット・ミス・追い出し件数を返す."""
+    return todo_cache.stats()
+
+
+@app.get("/metrics", tags=["System"])
+async def get_metrics():
+    """Prometheus形式のメトリクス(レイテンシ・処理中のリクエスト数・スレッドプール・SQL・コネクションプール)を返す."""
+    return Response(content=metrics.exposition(), media_type=metrics.CONTENT_TYPE)
+
+
 # TODOリスト関連のエンドポイント
 app.include_router(list_router.router)
 # TODO項目関連のエンドポイント
 app.include_router(item_router.router)
+# 全文検索
+app.include_router(search_router.router)
+# エクスポート・インポート
+app.include_router(export_router.router)
+app.include_router(import_router.router)
@@ -0,0 +1,239 @@
+"""Prometheus形式のメトリクス(/metrics).
+
+リクエストのレイテンシ(ルートのテンプレート毎)・処理中のリクエスト数・スレッドプールの待ち行列・
+SQLの実行時間・コネクションプール(app.pool_stats)の値を、Prometheusのテキスト形式で出力する。
+
+計測はプロセス内のメモリ上で行い(1リクエストあたりperf_counter 2回とヒストグラム1件の更新)、
+METRICS_DIR を指定した場合は各ワーカープロセスが定期的に自分の値をファイルに書き出し、
+/metrics ではどのワーカーが応答しても全ワーカーの合計を返す。
+終了したワーカーのカウンター・ヒストグラムは合計に残し、ゲージは除く。
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import anyio.to_thread
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import const, pool_stats
+from app.pool_stats import Histogram
+
+# リクエストのレイテンシのバケット上限(秒)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# SQL実行時間のバケット上限(秒)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# ルートに一致しなかったリクエストのラベル(存在しないパス毎に系列が増えないようにまとめる)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class LabeledHistogram:
+    """ラベルの値の組毎のヒストグラム."""
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...], buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._children: dict[tuple[str, ...], Histogram] = {}
+
+    def observe(self, label_values: tuple[str, ...], value: float) -> None:
+        child = self._children.get(label_values)
+        if child is None:
+            child = self._children.setdefault(label_values, Histogram(self.buckets))
+        child.observe(value)
+
+    def samples(self) -> list[dict]:
+        return [
+            {"labels": dict(zip(self.label_names, values, strict=True)), **child.snapshot()}
+            for values, child in list(self._children.items())
+        ]
+
+
+REQUEST_DURATION = LabeledHistogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"), REQUEST_BUCKETS,
+)
+QUERY_DURATION = LabeledHistogram("db_query_duration_seconds", "SQL statement execution time", (), QUERY_BUCKETS)
+# 処理中のリクエスト数(イベントループのスレッドでのみ更新するためロックは不要)
+_in_flight = 0
+
+
+class MetricsMiddleware:
+    """リクエストのレイテンシと処理中のリクエスト数を計測するASGIミドルウェア."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _in_flight  # noqa: PLW0603
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        _in_flight += 1
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _in_flight -= 1
+            # ルーティング後はscopeに一致したルートが入る(パスパラメータを含まないテンプレートをラベルにする)
+            route = scope.get("route")
+            REQUEST_DURATION.observe((scope["method"], getattr(route, "path", UNMATCHED_ROUTE)), time.perf_counter() - started_at)
+
+
+def _threadpool_gauges() -> list[tuple[str, str, dict, float]]:
+    # 同期のエンドポイント・依存関係を実行するスレッドプール(イベントループ内でのみ取得できる)
+    try:
+        stats = anyio.to_thread.current_default_thread_limiter().statistics()
+    except RuntimeError:
+        return []
+    return [
+        ("threadpool_threads_busy", "Worker threads running sync endpoints", {}, stats.borrowed_tokens),
+        ("threadpool_threads_limit", "Maximum worker threads", {}, stats.total_tokens),
+        ("threadpool_queue_depth", "Tasks waiting for a worker thread", {}, stats.tasks_waiting),
+    ]
+
+
+def collect() -> dict:
+    """このプロセスの全メトリクスの現在値を返す(ファイルへの書き出しと/metricsの出力に使う)."""
+    histograms = {x.name: (x.description, x.samples()) for x in (REQUEST_DURATION, QUERY_DURATION)}
+    checkout_samples = []
+    counters: dict[str, tuple[str, list]] = {
+        "db_pool_checkouts_total": ("Connections checked out from the pool", []),
+        "db_pool_timeouts_total": ("Pool checkout timeouts", []),
+    }
+    gauges = [("http_requests_in_flight", "HTTP requests being processed", {}, _in_flight), *_threadpool_gauges()]
+    for engine, stats in pool_stats.snapshot_all().items():
+        labels = {"engine": engine}
+        checkout_samples.append({"labels": labels, **stats["checkout_latency_seconds"]})
+        counters["db_pool_checkouts_total"][1].append({"labels": labels, "value": stats["checkouts_total"]})
+        counters["db_pool_timeouts_total"][1].append({"labels": labels, "value": stats["timeouts_total"]})
+        gauges.append(("db_pool_checked_out", "Connections currently checked out", labels, stats["checked_out"]))
+        if "size" in stats:
+            gauges.append(("db_pool_size", "Configured pool size", labels, stats["size"]))
+            gauges.append(("db_pool_overflow", "Connections opened beyond the pool size", labels, stats["overflow"]))
+    histograms["db_pool_checkout_duration_seconds"] = ("Time to check out a pooled connection", checkout_samples)
+
+    gauge_families: dict[str, tuple[str, list]] = {}
+    for name, description, labels, value in gauges:
+        gauge_families.setdefault(name, (description, []))[1].append({"labels": labels, "value": value})
+    return {"pid": os.getpid(), "histogram": histograms, "counter": counters, "gauge": gauge_families}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def merge(snapshots: list[dict]) -> dict:
+    """複数プロセスのcollect()の結果を、同じ名前・ラベルの値を合計して1つにまとめる."""
+    merged: dict[str, dict[str, tuple[str, dict]]] = {"histogram": {}, "counter": {}, "gauge": {}}
+    for snapshot in snapshots:
+        for kind, families in merged.items():
+            for name, (description, samples) in snapshot[kind].items():
+                series = families.setdefault(name, (description, {}))[1]
+                for sample in samples:
+                    key = _label_key(sample["labels"])
+                    current = series.get(key)
+                    if current is None:
+                        series[key] = json.loads(json.dumps(sample))
+                    elif kind == "histogram":
+                        current["sum"] += sample["sum"]
+                        current["count"] += sample["count"]
+                        for le, count in sample["buckets"].items():
+                            current["buckets"][le] = current["buckets"].get(le, 0) + count
+                    else:
+                        current["value"] += sample["value"]
+    return merged
+
+
+def _format_labels(labels: dict, **extra: str) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in pairs.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(pairs, escaped, strict=True)) + "}"
+
+
+def render(merged: dict) -> str:
+    """merge()の結果をPrometheusのテキスト形式にする."""
+    lines = []
+    for kind, families in merged.items():
+        for name, (description, series) in sorted(families.items()):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in series.values():
+                labels = sample["labels"]
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {sample['value']}")
+                    continue
+                lines.extend(f"{name}_bucket{_format_labels(labels, le=le)} {count}" for le, count in sample["buckets"].items())
+                lines.append(f"{name}_sum{_format_labels(labels)} {sample['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(directory: Path) -> None:
+    """このプロセスの値を directory/<pid>.json に書き出す(書きかけのファイルを読まれないよう置き換えで書く)."""
+    path = directory / f"{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(collect()))
+    tmp.replace(path)
+
+
+def read_snapshots(directory: Path) -> list[dict]:
+    """このプロセス以外のワーカーが書き出した値を読み込む. 終了したワーカーのゲージは除く."""
+    snapshots = []
+    for path in directory.glob("*.json"):
+        with contextlib.suppress(OSError, ValueError):
+            snapshot = json.loads(path.read_text())
+            if snapshot["pid"] == os.getpid():
+                continue
+            if not _is_alive(snapshot["pid"]):
+                snapshot["gauge"] = {}
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def exposition() -> str:
+    """/metricsのレスポンス本文(METRICS_DIR指定時は全ワーカーの合計)."""
+    snapshots = [collect()]
+    if const.METRICS_DIR:
+        snapshots += read_snapshots(Path(const.METRICS_DIR))
+    return render(merge(snapshots))
+
+
+async def _write_periodically(directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    while True:
+        write_snapshot(directory)
+        await asyncio.sleep(const.METRICS_FLUSH_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """METRICS_DIR指定時は、ワーカーの起動中に定期的に値をファイルへ書き出す."""
+    task = asyncio.create_task(_write_periodically(Path(const.METRICS_DIR))) if const.METRICS_DIR else None
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            # 終了するワーカーのカウンター・ヒストグラムも合計に残るよう、最後の値を書き出す
+            write_snapshot(Path(const.METRICS_DIR))
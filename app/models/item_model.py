@@ -1,22 +1,29 @@
 from typing import ClassVar
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func, text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 
-from app.database import Base
+from app.database import Base, Timestamp
 
 
 class ItemModel(Base):
     """アイテムモデル."""
     __tablename__ = "todo_items"
-    __table_args__: ClassVar[dict[str]] = {
-        "comment": "アイテムテーブル",
-    }
+    # インデックスはTODO項目の実際の検索条件に合わせる(作成はマイグレーションで行う)
+    __table_args__: ClassVar[tuple] = (
+        Index("ix_todo_items_list_id_id", "todo_list_id", "id"),
+        Index("ix_todo_items_list_id_status_due_at", "todo_list_id", "status_code", "due_at"),
+        Index("ix_todo_items_list_id_updated_at", "todo_list_id", "updated_at"),
+        Index("ix_todo_items_list_id_due_at", "todo_list_id", "due_at"),
+        Index("ix_todo_items_list_id_created_at", "todo_list_id", "created_at"),
+        {"comment": "アイテムテーブル"},
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
-    todo_list_id = Column("todo_list_id", Integer, ForeignKey("todo_lists.id"), nullable=False)
+    todo_list_id = Column("todo_list_id", Integer, ForeignKey("todo_lists.id", ondelete="CASCADE"), nullable=False)
     title = Column("title", String(50), nullable=False)
     description = Column("description", String(200))
     status_code = Column("status_code", Integer)
     due_at = Column("due_at", DateTime)
-    created_at = Column("created_at", DateTime, server_default=func.now())
-    updated_at = Column("updated_at", DateTime, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
+    created_at = Column("created_at", Timestamp, server_default=func.now())
+    # ON UPDATE CURRENT_TIMESTAMP はマイグレーションで定義し、モデルはSQLiteでもcreate_allできる形にしておく
+    updated_at = Column("updated_at", Timestamp, server_default=func.now(), onupdate=func.now())
@@ -1,9 +1,9 @@
 from typing import ClassVar
 
-from sqlalchemy import Column, DateTime, Integer, String, func, text
+from sqlalchemy import Column, Integer, String, func
 from sqlalchemy.orm import relationship
 
-from app.database import Base
+from app.database import Base, Timestamp
 
 
 class ListModel(Base):
@@ -17,6 +17,11 @@ class ListModel(Base):
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     title = Column("title", String(50), nullable=False)
     description = Column("description", String(200))
-    created_at = Column("created_at", DateTime, server_default=func.now())
-    updated_at = Column("updated_at", DateTime, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
-    items = relationship("ItemModel", backref="todo_lists")
+    # TODO項目の件数・完了件数(item_crudの書き込みと同じトランザクションで更新する)
+    item_count = Column("item_count", Integer, nullable=False, default=0, server_default="0")
+    completed_count = Column("completed_count", Integer, nullable=False, default=0, server_default="0")
+    created_at = Column("created_at", Timestamp, server_default=func.now())
+    # ON UPDATE CURRENT_TIMESTAMP はマイグレーションで定義し、モデルはSQLiteでもcreate_allできる形にしておく
+    updated_at = Column("updated_at", Timestamp, server_default=func.now(), onupdate=func.now())
+    # TODO項目はDBのON DELETE CASCADEで削除する(TODOリストの削除時に項目を読み込んで1行ずつ処理しない)
+    items = relationship("ItemModel", backref="todo_lists", cascade="all, delete", passive_deletes=True)
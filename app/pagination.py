@@ -0,0 +1,46 @@
+"""カーソル(キーセット)ページネーション用のヘルパー."""
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+HAS_MORE_HEADER = "X-Has-More"
+
+
+def encode_cursor(**keys) -> str:
+    """最後に返した行のキーから不透明なカーソル文字列を作る."""
+    raw = json.dumps(keys, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str = "id") -> dict:
+    """カーソル文字列を復元する.
+
+    id以外で並べ替えた一覧のカーソルには並べ替えキーの値(日時またはnull)も含まれ、datetimeに戻して返す。
+    不正なカーソル(並べ替えキーが含まれないものを含む)が渡された場合は400を返す。
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        keys = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(keys, dict) or not isinstance(keys.get("id"), int):
+            raise TypeError
+        if sort_key != "id" and keys[sort_key] is not None:
+            keys[sort_key] = datetime.fromisoformat(keys[sort_key])
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+    return keys
+
+
+def set_page_headers(response: Response, rows: list, has_more: bool, sort_key: str = "id") -> None:  # noqa: FBT001
+    """次ページ取得用のカーソルと続きの有無をレスポンスヘッダーに設定する.
+
+    sort_keyにはid以外で並べ替えた場合の並べ替えキーのカラム名を渡す。
+    """
+    response.headers[HAS_MORE_HEADER] = "true" if has_more else "false"
+    if has_more and rows:
+        last = rows[-1]
+        keys = {sort_key: getattr(last, sort_key)} if sort_key != "id" else {}
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(id=last.id, **keys)
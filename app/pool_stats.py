@@ -0,0 +1,136 @@
+"""コネクションプールの統計情報.
+
+SQLAlchemyのプールイベントからチェックアウト中の接続数やチェックアウト待ち時間を集計し、
+ワーカーあたりのプールサイズをデータに基づいて決められるようにする。
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+# チェックアウト待ち時間ヒストグラムのバケット上限(秒)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """固定バケットのヒストグラム.
+
+    バケットはPrometheusと同じく「上限値以下」の累積件数として取り出す。
+    """
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = 0
+        buckets = {}
+        for le, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+            cumulative += count
+            buckets[str(le)] = cumulative
+        return {"buckets": buckets, "sum": total, "count": cumulative}
+
+
+class PoolStats:
+    """1つのエンジンのコネクションプールの統計."""
+
+    def __init__(self, pool_class_name: str) -> None:
+        self.pool_class_name = pool_class_name
+        self.engine: Engine | None = None
+        self.checkout_latency = Histogram(CHECKOUT_BUCKETS)
+        self.checked_out = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def _on_connect(self, *_) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *_) -> None:
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def _on_checkin(self, *_) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        latency = self.checkout_latency.snapshot()
+        stats = {
+            "pool_class": self.pool_class_name,
+            "checked_out": self.checked_out,
+            "checkouts_total": self.checkouts,
+            "connects_total": self.connects,
+            "timeouts_total": self.timeouts,
+            "checkout_wait_seconds_total": latency["sum"],
+            "checkout_latency_seconds": latency,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return stats
+
+
+# エンジン名 -> 統計
+POOL_STATS: dict[str, PoolStats] = {}
+
+
+class _TimedCheckoutMixin:
+    """プールからの接続取得(空き待ち・新規接続を含む)にかかった時間を計測する."""
+
+    pool_stats: PoolStats
+
+    def connect(self):  # noqa: ANN202
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self.pool_stats._lock:  # noqa: SLF001
+                self.pool_stats.timeouts += 1
+            raise
+        finally:
+            self.pool_stats.checkout_latency.observe(time.perf_counter() - start)
+
+
+def instrumented_pool_class(name: str, pool_class: type[Pool]) -> type[Pool]:
+    """統計を収集するプールクラスを作り、POOL_STATS[name]に登録する.
+
+    サブクラスにしておくことで、dispose()等でプールが作り直されても計測が引き継がれる。
+    """
+    stats = PoolStats(pool_class.__name__)
+    timed_class = type(f"Timed{pool_class.__name__}", (_TimedCheckoutMixin, pool_class), {"pool_stats": stats})
+    event.listen(timed_class, "connect", stats._on_connect)  # noqa: SLF001
+    event.listen(timed_class, "checkout", stats._on_checkout)  # noqa: SLF001
+    event.listen(timed_class, "checkin", stats._on_checkin)  # noqa: SLF001
+    POOL_STATS[name] = stats
+    return timed_class
+
+
+def bind_engine(name: str, engine: Engine) -> None:
+    """作成済みエンジンを統計に紐づける(プールはスナップショット時にengine.poolから参照する)."""
+    POOL_STATS[name].engine = engine
+
+
+def snapshot_all() -> dict:
+    return {name: stats.snapshot() for name, stats in POOL_STATS.items()}
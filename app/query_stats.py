@@ -0,0 +1,137 @@
+"""リクエスト毎のSQL実行回数・実行時間の計測.
+
+全エンジンの before/after_cursor_execute イベントで、実行中のリクエストのSQL実行回数と合計時間を数え、
+レスポンスの Server-Timing / X-DB-Queries ヘッダーとログ(extraのフィールド)に出力する。
+各SQLの実行時間は /metrics のヒストグラム(app.metrics)にも記録する。
+DEBUG時のみ有効なデバッグツールバー(SQLAlchemyPanel)と違い、常に有効で、1クエリあたりの負荷は
+perf_counter の呼び出し2回程度に抑えている。
+
+テストでは query_budget で、1リクエストあたりのSQL実行回数の上限を超えたら失敗させられる。
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import const, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):  # noqa: N818
+    """1リクエストで実行したSQLの回数が上限を超えた(query_budget・DB_QUERY_BUDGET指定時のみ)."""
+
+
+class QueryStats:
+    """1リクエストで実行したSQLの回数と合計時間(秒)."""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+
+# 実行中のリクエストの統計(同期のエンドポイントを実行するスレッドにもコンテキストごと引き継がれる)
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+# 1リクエストあたりのSQL実行回数の上限(Noneは無制限)
+_budget: int | None = const.DB_QUERY_BUDGET or None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001, ARG001, PLR0913, PLR0917
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001, ARG001, PLR0913, PLR0917
+    started_at = conn.info.get("query_started_at")
+    if not started_at:
+        return
+    elapsed = time.perf_counter() - started_at.pop()
+    metrics.QUERY_DURATION.observe((), elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+
+
+def current() -> QueryStats | None:
+    """実行中のリクエストの統計を返す(リクエスト外ではNone)."""
+    return _current.get()
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[None]:
+    """ブロック内で処理したリクエストがmax_queries回を超えてSQLを実行したら、QueryBudgetExceededを送出させる(テスト用).
+
+    TestClientはアプリを別スレッドで実行するため、コンテキスト変数ではなくモジュール全体の設定として切り替える。
+    """
+    global _budget  # noqa: PLW0603
+    previous, _budget = _budget, max_queries
+    try:
+        yield
+    finally:
+        _budget = previous
+
+
+def server_timing(stats: QueryStats) -> str:
+    return f'db;dur={stats.duration * 1000:.3f};desc="{stats.count} queries"'
+
+
+class QueryStatsMiddleware:
+    """リクエスト毎にSQLの実行回数・時間を計測し、レスポンスヘッダーとログに出力するASGIミドルウェア.
+
+    ヘッダーにはレスポンスの送信開始までの値を出力する(ストリーミングレスポンスの送信中のSQLはログにのみ含まれる)。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"server-timing", server_timing(stats).encode()),
+                    (b"x-db-queries", str(stats.count).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            # ログを出力しない設定の場合はフィールドの組み立ても省く(1リクエストあたりの負荷を抑えるため)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "%s %s %d: %d queries in %.1f ms",
+                    scope["method"], scope["path"], status_code, stats.count, stats.duration * 1000,
+                    extra={
+                        "http_method": scope["method"],
+                        "http_path": scope["path"],
+                        "http_status": status_code,
+                        "duration_ms": round((time.perf_counter() - started_at) * 1000, 3),
+                        "db_queries": stats.count,
+                        "db_time_ms": round(stats.duration * 1000, 3),
+                    },
+                )
+        if _budget is not None and stats.count > _budget:
+            msg = f"{scope['method']} {scope['path']} executed {stats.count} queries (budget: {_budget})"
+            raise QueryBudgetExceeded(msg)
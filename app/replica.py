@@ -0,0 +1,97 @@
+"""読み込みのレプリカへの振り分け.
+
+読み込み用の依存関係(app.dependencies.get_read_db)は、次のいずれかに当てはまる場合はプライマリから読み込む。
+
+- レプリカが設定されていない
+- クライアントが直前(DB_REPLICA_STICKY_SECONDS 秒以内)に書き込んだ(自分の書き込みが読めるように)
+- レプリカの遅延が DB_REPLICA_MAX_LAG_SECONDS 秒を超えている、または遅延を取得できない
+
+書き込んだかどうかはワーカー間で共有できるよう、プロセス内ではなくクッキーで判定する。
+"""
+
+import math
+import time
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import const, database
+
+# プライマリから読み込む期限(UNIX時刻)を持つクッキー
+STICKY_COOKIE = "db_primary_until"
+
+
+class ReplicaLagMonitor:
+    """レプリカの遅延(秒)を一定間隔で確認し、読み込みに使えるかを判定する."""
+
+    def __init__(self, max_lag: float, interval: float) -> None:
+        self.max_lag = max_lag
+        self.interval = interval
+        self._checked_at = -math.inf
+        self._lag: float | None = None
+
+    def due(self) -> bool:
+        """遅延を確認し直す時期かどうか(lagの呼び出しでDBに接続するかどうか)."""
+        return time.monotonic() - self._checked_at >= self.interval
+
+    def lag(self, engine: Engine) -> float | None:
+        """直近に確認したレプリカの遅延. 取得できない場合(レプリケーション停止・接続エラー)はNone."""
+        if self.due():
+            self._checked_at = time.monotonic()
+            self._lag = self.measure(engine)
+        return self._lag
+
+    def is_fresh(self, engine: Engine) -> bool:
+        lag = self.lag(engine)
+        return lag is not None and lag <= self.max_lag
+
+    @staticmethod
+    def measure(engine: Engine) -> float | None:
+        try:
+            with engine.connect() as conn:
+                if conn.dialect.name == "mysql":
+                    row = conn.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+                    if row is None or row["Seconds_Behind_Source"] is None:
+                        return None
+                    return float(row["Seconds_Behind_Source"])
+                # SQLite等(2つのファイルでのローカル検証用)はレプリケーションがないため遅延なしとみなす
+                return 0.0
+        except SQLAlchemyError:
+            return None
+
+
+lag_monitor = ReplicaLagMonitor(const.DB_REPLICA_MAX_LAG_SECONDS, const.DB_REPLICA_LAG_CHECK_INTERVAL)
+
+
+def mark_written(response: Response) -> None:
+    """書き込んだクライアントの読み込みを、しばらくプライマリに向ける."""
+    until = time.time() + const.DB_REPLICA_STICKY_SECONDS
+    response.set_cookie(STICKY_COOKIE, f"{until:.3f}", max_age=math.ceil(const.DB_REPLICA_STICKY_SECONDS), httponly=True, samesite="lax")
+
+
+def _is_sticky(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+def use_replica(request: Request) -> bool:
+    """このリクエストの読み込みにレプリカを使うかどうか."""
+    if database.replica_engine is None or _is_sticky(request):
+        return False
+    return lag_monitor.is_fresh(database.replica_engine)
+
+
+async def use_replica_async(request: Request) -> bool:
+    """use_replicaのasync版(DB_ASYNC=true の場合に使用).
+
+    遅延の確認は同期のエンジンで行うため、確認し直す時だけスレッドプールで実行してイベントループを止めない。
+    """
+    if database.replica_engine is None or _is_sticky(request):
+        return False
+    if lag_monitor.due():
+        return await run_in_threadpool(lag_monitor.is_fresh, database.replica_engine)
+    return lag_monitor.is_fresh(database.replica_engine)
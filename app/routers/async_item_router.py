@@ -0,0 +1,5 @@
+from app.routers import item_router
+from app.routers.async_router import async_router
+
+# item_router と同じエンドポイントをasyncioネイティブのDBアクセスで提供する(DB_ASYNC=true の場合に使用)
+router = async_router(item_router.router)
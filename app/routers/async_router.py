@@ -0,0 +1,85 @@
+"""同期版のルーターから、asyncioネイティブのDBアクセスで実行するルーターを作る(DB_ASYNC=true の場合に使用).
+
+エンドポイントとCRUDの処理は同期版と共通にし、実行方法だけを変える。
+セッションの依存関係(get_db / get_read_db)をasync版に置き換え、エンドポイントは AsyncSession.run_sync の中で
+同期のセッションとして実行する(SQLはasyncioのドライバで実行され、結果を待つ間もイベントループは止まらない)。
+同期版にエンドポイントや処理を追加すれば、そのままasync版にも反映される。
+
+キャッシュ(app.cache)の読み書きは同期のまま行うため、redisのバックエンドでは通信の間イベントループを止める。
+"""
+
+import functools
+import inspect
+from collections.abc import Callable
+from typing import Annotated, get_origin
+
+from fastapi import APIRouter, Depends, params
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import get_async_db, get_async_read_db, get_db, get_read_db
+
+# 同期版のセッションの依存関係 -> async版
+ASYNC_DEPENDENCIES = {
+    get_db: get_async_db,
+    get_read_db: get_async_read_db,
+}
+
+
+def _session_parameter(endpoint: Callable) -> tuple[str, Callable]:
+    """エンドポイントのセッションの引数名と、置き換えるasync版の依存関係."""
+    for parameter in inspect.signature(endpoint).parameters.values():
+        if get_origin(parameter.annotation) is not Annotated:
+            continue
+        for x in parameter.annotation.__metadata__:
+            if isinstance(x, params.Depends) and x.dependency in ASYNC_DEPENDENCIES:
+                return parameter.name, ASYNC_DEPENDENCIES[x.dependency]
+    msg = f"{endpoint.__name__} has no database session parameter"
+    raise TypeError(msg)
+
+
+def async_endpoint(endpoint: Callable) -> Callable:
+    """同期版のエンドポイントを、async版のセッションを受け取って run_sync で実行するエンドポイントにする."""
+    name, dependency = _session_parameter(endpoint)
+    signature = inspect.signature(endpoint)
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):  # noqa: ANN003, ANN202
+        db: AsyncSession = kwargs.pop(name)
+        return await db.run_sync(lambda session: endpoint(**kwargs, **{name: session}))
+
+    # FastAPIはこのシグネチャから引数(クエリパラメータ・依存関係等)を解決する
+    wrapper.__signature__ = signature.replace(parameters=[
+        x.replace(annotation=Annotated[AsyncSession, Depends(dependency)]) if x.name == name else x
+        for x in signature.parameters.values()
+    ])
+    return wrapper
+
+
+def async_router(router: APIRouter) -> APIRouter:
+    """同期版のルーターの全てのエンドポイントを、同じパス・順序・レスポンスの定義でasync版にしたルーターを作る."""
+    converted = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            msg = f"{route!r} is not supported"
+            raise TypeError(msg)
+        converted.add_api_route(
+            route.path,
+            async_endpoint(route.endpoint),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            response_class=route.response_class,
+            name=route.name,
+            include_in_schema=route.include_in_schema,
+            openapi_extra=route.openapi_extra,
+        )
+    return converted
@@ -0,0 +1,42 @@
+from typing import Annotated, Optional
+from fastapi import Query
+from fastapi import APIRouter, Depends
+from sqlalchemy import Engine
+
+from app.crud.export_crud import stream_todo_items, stream_todo_lists
+from app.dependencies import get_read_engine
+from app.export import ExportFormat, export_response
+from app.models.item_model import ItemModel
+from app.models.list_model import ListModel
+
+router = APIRouter(
+    prefix="/export",
+    tags=["エクスポート"],
+)
+
+
+@router.get("/lists")
+def export_todo_lists(
+    engine: Annotated[Engine, Depends(get_read_engine)],
+    export_format: ExportFormat = Query("ndjson", alias="format", description="出力形式(ndjson または csv)"),
+):
+    """全てのTODOリストをNDJSONまたはCSVで出力する.
+
+    DBからサーバーサイドカーソルで少しずつ読み込みながら書き出すため、件数によらずメモリ使用量は一定です。
+    他の読み込みと同じく、使える場合はレプリカから読み込みます。
+    """
+    return export_response(stream_todo_lists(engine), ListModel.__table__.c.keys(), export_format, "todo_lists")
+
+
+@router.get("/items")
+def export_todo_items(
+    engine: Annotated[Engine, Depends(get_read_engine)],
+    todo_list_id: Optional[int] = Query(None, description="指定したTODOリストのTODO項目のみ出力する"),
+    export_format: ExportFormat = Query("ndjson", alias="format", description="出力形式(ndjson または csv)"),
+):
+    """TODO項目をNDJSONまたはCSVで出力する.
+
+    DBからサーバーサイドカーソルで少しずつ読み込みながら書き出すため、件数によらずメモリ使用量は一定です。
+    他の読み込みと同じく、使える場合はレプリカから読み込みます。
+    """
+    return export_response(stream_todo_items(todo_list_id, engine), ItemModel.__table__.c.keys(), export_format, "todo_items")
@@ -0,0 +1,49 @@
+from collections.abc import AsyncIterator
+from typing import Annotated, Optional
+from fastapi import Query
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.crud.import_crud import IMPORT_CHUNK_SIZE, TodoImporter
+from app.dependencies import get_db
+from app.schemas.import_schema import ResponseImportProgress
+
+router = APIRouter(
+    prefix="/import",
+    tags=["インポート"],
+)
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    # 受信したデータを行に区切る(本文全体をメモリに溜めない)
+    rest = b""
+    async for chunk in chunks:
+        *lines, rest = (rest + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if rest:
+        yield rest
+
+
+@router.post("", response_model=ResponseImportProgress)
+async def import_todos(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    chunk_size: Optional[int] = Query(IMPORT_CHUNK_SIZE, ge=1, le=10000, description="1回のコミットで登録する行数"),
+    line: Optional[int] = Query(0, ge=0, description="再開時: 前回の進捗のline(この行数分を読み飛ばす)"),
+    todo_list_id: Optional[int] = Query(None, description="再開時: 前回の進捗のtodo_list_id"),
+):
+    """NDJSON(1行1件のTODOリストまたはTODO項目)をチャンク毎にコミットしながら一括登録する.
+
+    TODOリストの行は {"type": "list", ...NewTodoList}、TODO項目の行は {"type": "item", ...NewTodoItem} で、
+    TODO項目はtodo_list_idを省略すると直前のTODOリストに登録されます。
+    不正な行は登録せずにerrorsに行番号と理由を返し、残りの行の登録は続けます。
+    """
+    progress = ResponseImportProgress(line=line, todo_list_id=todo_list_id)
+    importer = TodoImporter(db, progress, chunk_size=chunk_size)
+    async for x in _lines(request.stream()):
+        if importer.add(x):
+            # DBへの登録はスレッドプールで行い、イベントループを止めない
+            await run_in_threadpool(importer.flush)
+    return await run_in_threadpool(importer.flush)
@@ -1,11 +1,37 @@
+from datetime import datetime
 from typing import Annotated, Optional
 from fastapi import Query
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from app.crud.item_crud import delete_todo_item, get_todo_item, get_todo_items, post_todo_item, put_todo_item
-from app.dependencies import get_db
-from app.schemas.item_schema import NewTodoItem, ResponseTodoItem, UpdateTodoItem
+from app import const
+from app.const import TodoItemStatusCode
+from app.crud.item_filters import sort_key
+from app.crud.item_crud import (
+    delete_todo_item,
+    delete_todo_items,
+    get_todo_item,
+    get_todo_items_page,
+    post_todo_item,
+    post_todo_item_grouped,
+    post_todo_items,
+    put_todo_item,
+    put_todo_items_status,
+)
+from app.dependencies import get_db, get_read_db
+from app.etag import conditional_get, page_etag, row_etag
+from app.pagination import decode_cursor, set_page_headers
+from app.serialization import fast_json_response
+from app.schemas.item_schema import (
+    BulkUpdateTodoItem,
+    NewTodoItem,
+    ResponseBulkTodoItem,
+    ResponseTodoItem,
+    TodoItemFilter,
+    TodoItemOrder,
+    TodoItemSelector,
+    UpdateTodoItem,
+)
 
 # APIRouterのインスタンスを作成
 router = APIRouter(
@@ -13,26 +39,60 @@ router = APIRouter(
     tags=["Todo項目"],
 )
 
+# 一括登録で1リクエストに含められるTODO項目の最大件数
+BULK_CREATE_MAX_ITEMS = 1000
+
 @router.get("", response_model=list[ResponseTodoItem])
 def read_todo_items(
     todo_list_id: int, 
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session, Depends(get_read_db)],
+    request: Request,
+    response: Response,
     page: Optional[int] = Query(1, ge=1, description="ページ番号"),
     per_page: Optional[int] = Query(10, ge=1, le=100, description="1ページあたりの最大件数"),
+    cursor: Optional[str] = Query(None, description="前のレスポンスのX-Next-Cursorヘッダーの値(指定時はpageを無視)"),
+    # TodoItemStatusCodeは文字列のクエリパラメータから変換できないため、値の範囲で検証する
+    status: Optional[int] = Query(
+        None,
+        ge=TodoItemStatusCode.NOT_COMPLETED.value,
+        le=TodoItemStatusCode.COMPLETED.value,
+        description="指定したステータス(1: 未完了, 2: 完了)のTODO項目のみ取得する",
+    ),
+    due_before: Optional[datetime] = Query(None, description="期限がこの日時より前のTODO項目のみ取得する"),
+    due_after: Optional[datetime] = Query(None, description="期限がこの日時以降のTODO項目のみ取得する"),
+    updated_since: Optional[datetime] = Query(None, description="この日時以降に更新されたTODO項目のみ取得する"),
+    order: TodoItemOrder = Query("id", description="並び順(id, due_at, created_at。先頭に-を付けると降順)"),
 ):
     """特定のTODOリストに属する全てのTODO項目を取得する.
-    
+
     ページネーションパラメータを指定することで、結果を分割して取得できます。
+    cursorを指定した場合は並べ替えキーによるキーセットページネーションとなります。
+    絞り込み・並べ替えはDBで行い、条件に合うTODO項目だけを返します。
+    If-None-MatchがETagと一致する場合は304を返します。
     """
-    return get_todo_items(db, todo_list_id, page=page, per_page=per_page)
+    filters = TodoItemFilter(status=status, due_before=due_before, due_after=due_after, updated_since=updated_since, order=order)
+    key = sort_key(filters)
+    after = decode_cursor(cursor, key) if cursor else None
+    if request.headers.get("if-none-match"):
+        # 全カラムを読み込む前に id, updated_at だけで変更の有無を判定する
+        versions, has_more = get_todo_items_page(db, todo_list_id, page=page, per_page=per_page, after=after, filters=filters, versions_only=True)
+        set_page_headers(response, versions, has_more, key)
+        not_modified = conditional_get(request, response, page_etag(versions, str(has_more)))
+        if not_modified is not None:
+            return not_modified
+
+    rows, has_more = get_todo_items_page(db, todo_list_id, page=page, per_page=per_page, after=after, filters=filters)
+    set_page_headers(response, rows, has_more, key)
+    # 一覧はresponse_modelで再検証せずにJSONにする(app.serialization)
+    return conditional_get(request, response, page_etag(rows, str(has_more))) or fast_json_response(rows, ResponseTodoItem, response)
 
 
 @router.get("/{todo_item_id}", response_model=ResponseTodoItem)
-def get_item(todo_list_id: int, todo_item_id: int, db: Annotated[Session, Depends(get_db)]):
+def get_item(todo_list_id: int, todo_item_id: int, db: Annotated[Session, Depends(get_read_db)], request: Request, response: Response):
     db_item = get_todo_item(db, todo_list_id, todo_item_id)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Todo item not found")
-    return db_item
+    return conditional_get(request, response, row_etag(db_item)) or db_item
 
 
 @router.post("", response_model=ResponseTodoItem)
@@ -43,25 +103,61 @@ def post_item(todo_list_id: int, todo_item: NewTodoItem, db: Annotated[Session,
     if todo_list is None:
         raise HTTPException(status_code=404, detail="Todo list not found")
    
+    if const.ITEM_GROUP_COMMIT and not const.DB_ASYNC:
+        # 同時に届いた他の登録とまとめて1回のINSERT・コミットで書き込む
+        # (まとめる間スレッドを止めて待つため、イベントループ上で実行するasyncモードでは使わない)
+        return post_todo_item_grouped(db, todo_list_id, todo_item)
     # 更新: create_todo_item → post_todo_item
     return post_todo_item(db, todo_list_id, todo_item)
 
 
+@router.post("/bulk", response_model=list[ResponseTodoItem])
+def post_items(
+    todo_list_id: int,
+    todo_items: Annotated[list[NewTodoItem], Body(min_length=1, max_length=BULK_CREATE_MAX_ITEMS)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """TODO項目を一括登録する.
+
+    全件を1回のINSERT文・1トランザクションで登録するため、1件ずつPOSTするより大幅に速い。
+    1件でもバリデーションエラーがあれば何も登録しない。
+    """
+    from app.crud.list_crud import get_todo_list
+    if get_todo_list(db, todo_list_id) is None:
+        raise HTTPException(status_code=404, detail="Todo list not found")
+
+    return post_todo_items(db, todo_list_id, todo_items)
+
+
+# 一括更新・一括削除は /{todo_item_id} より先に定義しないと "bulk" がIDとして解釈される
+@router.put("/bulk", response_model=ResponseBulkTodoItem)
+def put_items(todo_list_id: int, bulk_update: BulkUpdateTodoItem, db: Annotated[Session, Depends(get_db)]):
+    """条件(ID集合・現在のステータス)に合うTODO項目のステータスを一括更新する.
+
+    1回のUPDATE文で実行し、更新件数を返す。TODOリストが存在しない場合は0件となる。
+    """
+    return {"count": put_todo_items_status(db, todo_list_id, bulk_update)}
+
+
+@router.delete("/bulk", response_model=ResponseBulkTodoItem)
+def delete_items(todo_list_id: int, selector: TodoItemSelector, db: Annotated[Session, Depends(get_db)]):
+    """条件(ID集合・現在のステータス)に合うTODO項目を一括削除する.
+
+    1回のDELETE文で実行し、削除件数を返す。
+    """
+    return {"count": delete_todo_items(db, todo_list_id, selector)}
+
+
 @router.put("/{todo_item_id}", response_model=ResponseTodoItem)
 def put_item(todo_list_id: int, todo_item_id: int, todo_item: UpdateTodoItem, db: Annotated[Session, Depends(get_db)]):
-    db_item = get_todo_item(db, todo_list_id, todo_item_id)
+    db_item = put_todo_item(db, todo_list_id, todo_item_id, todo_item)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Todo item not found")
-
-    # 更新: update_todo_item → put_todo_item
-    return put_todo_item(db, todo_list_id, todo_item_id, todo_item)
+    return db_item
 
 
 @router.delete("/{todo_item_id}")
 def delete_item(todo_list_id: int, todo_item_id: int, db: Annotated[Session, Depends(get_db)]):
-    db_item = get_todo_item(db, todo_list_id, todo_item_id)
-    if db_item is None:
+    if not delete_todo_item(db, todo_list_id, todo_item_id):
         raise HTTPException(status_code=404, detail="Todo item not found")
-
-    delete_todo_item(db, todo_list_id, todo_item_id)
     return {}
@@ -1,12 +1,26 @@
 
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 from fastapi import Query
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.crud.list_crud import delete_todo_list, get_todo_list, get_todo_lists, post_todo_list, put_todo_list
-from app.dependencies import get_db
-from app.schemas.list_schema import NewTodoList, ResponseTodoList, UpdateTodoList
+from app import const, database
+from app.crud.item_crud import get_overdue_counts, get_todo_items_for_lists
+from app.crud.list_crud import (
+    delete_todo_list,
+    get_todo_list,
+    get_todo_list_with_overdue,
+    get_todo_lists_page,
+    post_todo_list,
+    purge_todo_list,
+    put_todo_list,
+)
+from app.dependencies import get_db, get_read_db
+from app.etag import conditional_get, page_etag, row_etag
+from app.pagination import decode_cursor, set_page_headers
+from app.schemas.item_schema import ResponseTodoItem
+from app.schemas.list_schema import NewTodoList, ResponseTodoList, ResponseTodoListWithItems, UpdateTodoList
+from app.serialization import dumps, fast_json_response, json_response, trusted_dicts
 
 # APIRouterのインスタンスを作成
 router = APIRouter(
@@ -14,27 +28,106 @@ router = APIRouter(
     tags=["Todoリスト"],  # Swagger UIでのグループ化タグ
 )
 
+def _embedded_etag(todo_lists: list, items_by_list: dict, *extra: str) -> str:
+    # TODO項目の追加・削除・完了状態の変更はカウンタの更新でTODOリストのupdated_atに反映されるが、
+    # タイトル・説明・期限の変更は反映されないため、埋め込んだ項目も含めて計算する
+    items = [item for x in todo_lists for item in items_by_list[x.id]]
+    return page_etag([*todo_lists, *items], "items", *extra)
+
+
+def _embed_items(todo_lists: list, items_by_list: dict, overdue_counts: dict[int, int]) -> list[dict]:
+    """TODOリストにTODO項目を埋め込んだレスポンス(ResponseTodoListWithItems)のdictを作る(include=items指定時).
+
+    response_modelでは再検証せず、JSONへの変換までここで行う。
+    """
+    items = {todo_list_id: trusted_dicts(x, ResponseTodoItem) for todo_list_id, x in items_by_list.items()}
+    return trusted_dicts(todo_lists, ResponseTodoList, items=items, overdue_count=_overdue_by_id(todo_lists, overdue_counts))
+
 
-@router.get("", response_model=list[ResponseTodoList])
+def _overdue_etag_parts(overdue_counts: dict[int, int]) -> list[str]:
+    # 期限切れ件数は時間の経過で変わりupdated_atには反映されないため、ETagに含める
+    return [f"overdue:{todo_list_id}:{count}" for todo_list_id, count in sorted(overdue_counts.items())]
+
+
+def _overdue_by_id(todo_lists: list, overdue_counts: dict[int, int]) -> dict[int, int]:
+    # 一覧の行は読み取り専用のRowのため、期限切れ件数は属性ではなくtrusted_dictsのextraで渡す
+    return {x.id: overdue_counts.get(x.id, 0) for x in todo_lists}
+
+
+@router.get("", response_model=list[ResponseTodoListWithItems] | list[ResponseTodoList])
 def read_todo_lists(
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session, Depends(get_read_db)],
+    request: Request,
+    response: Response,
     page: Optional[int] = Query(1, ge=1, description="ページ番号"),
     per_page: Optional[int] = Query(10, ge=1, le=100, description="1ページあたりの最大件数"),
+    cursor: Optional[str] = Query(None, description="前のレスポンスのX-Next-Cursorヘッダーの値(指定時はpageを無視)"),
+    include: Optional[Literal["items"]] = Query(None, description="itemsを指定すると各TODOリストにTODO項目を埋め込んで返す"),
+    items_per_list: Optional[int] = Query(20, ge=1, le=100, description="include=items指定時にTODOリスト毎に埋め込むTODO項目の最大件数"),
 ):
     """全てのTODOリストを取得する.
-    
+
     ページネーションパラメータを指定することで、結果を分割して取得できます。
+    cursorを指定した場合は主キーによるキーセットページネーションとなり、深いページでも速度が落ちません。
+    If-None-MatchがETagと一致する場合は304を返します。
+    include=itemsを指定した場合は、各TODOリストのTODO項目を追加の1クエリでまとめて読み込み、itemsとして埋め込みます。
+    期限切れの未完了TODO項目の件数(overdue_count)はページ内のTODOリスト分を1回の集計クエリで求めます。
     """
-    return get_todo_lists(db, page=page, per_page=per_page)
+    after_id = decode_cursor(cursor)["id"] if cursor else None
+    if include == "items":
+        rows, has_more = get_todo_lists_page(db, page=page, per_page=per_page, after_id=after_id)
+        set_page_headers(response, rows, has_more)
+        items_by_list = get_todo_items_for_lists(db, [x.id for x in rows], items_per_list)
+        overdue_counts = get_overdue_counts(db, [x.id for x in rows])
+        not_modified = conditional_get(request, response, _embedded_etag(rows, items_by_list, str(has_more), *_overdue_etag_parts(overdue_counts)))
+        if not_modified is not None:
+            return not_modified
+        return json_response(dumps(_embed_items(rows, items_by_list, overdue_counts)), response)
 
+    if request.headers.get("if-none-match"):
+        # 全カラムを読み込む前に id, updated_at だけで変更の有無を判定する
+        versions, has_more = get_todo_lists_page(db, page=page, per_page=per_page, after_id=after_id, versions_only=True)
+        set_page_headers(response, versions, has_more)
+        overdue_counts = get_overdue_counts(db, [x.id for x in versions])
+        not_modified = conditional_get(request, response, page_etag(versions, str(has_more), *_overdue_etag_parts(overdue_counts)))
+        if not_modified is not None:
+            return not_modified
 
-@router.get("/{todo_list_id}", response_model=ResponseTodoList)
-def get_list(todo_list_id: int, db: Annotated[Session, Depends(get_db)]):
-    """指定されたIDのTODOリストを取得する."""
-    db_item = get_todo_list(db, todo_list_id)
+    rows, has_more = get_todo_lists_page(db, page=page, per_page=per_page, after_id=after_id)
+    set_page_headers(response, rows, has_more)
+    overdue_counts = get_overdue_counts(db, [x.id for x in rows])
+    etag = page_etag(rows, str(has_more), *_overdue_etag_parts(overdue_counts))
+    # 一覧はresponse_modelで再検証せずにJSONにする(app.serialization)
+    return conditional_get(request, response, etag) or fast_json_response(
+        rows, ResponseTodoList, response, overdue_count=_overdue_by_id(rows, overdue_counts),
+    )
+
+
+@router.get("/{todo_list_id}", response_model=ResponseTodoListWithItems | ResponseTodoList)
+def get_list(
+    todo_list_id: int,
+    db: Annotated[Session, Depends(get_read_db)],
+    request: Request,
+    response: Response,
+    include: Optional[Literal["items"]] = Query(None, description="itemsを指定するとTODO項目を埋め込んで返す"),
+    items_per_list: Optional[int] = Query(20, ge=1, le=100, description="include=items指定時に埋め込むTODO項目の最大件数"),
+):
+    """指定されたIDのTODOリストを取得する.
+
+    If-None-MatchがETagと一致する場合は304を返します。
+    期限切れの未完了TODO項目の件数(overdue_count)はTODOリストと一緒にキャッシュされ、最大CACHE_OVERDUE_TTL秒遅れて反映されます。
+    """
+    db_item = get_todo_list_with_overdue(db, todo_list_id)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Todo list not found")
-    return db_item
+    overdue_counts = {todo_list_id: db_item.overdue_count}
+    if include == "items":
+        items_by_list = get_todo_items_for_lists(db, [todo_list_id], items_per_list)
+        not_modified = conditional_get(request, response, _embedded_etag([db_item], items_by_list, *_overdue_etag_parts(overdue_counts)))
+        if not_modified is not None:
+            return not_modified
+        return json_response(dumps(_embed_items([db_item], items_by_list, overdue_counts)[0]), response)
+    return conditional_get(request, response, row_etag(db_item, *_overdue_etag_parts(overdue_counts))) or db_item
 
 
 @router.post("", response_model=ResponseTodoList)
@@ -46,20 +139,41 @@ def post_list(todo_list: NewTodoList, db: Annotated[Session, Depends(get_db)]):
 @router.put("/{todo_list_id}", response_model=ResponseTodoList)
 def put_list(todo_list_id: int, todo_list: UpdateTodoList, db: Annotated[Session, Depends(get_db)]):
     """TODOリストを更新する."""
-    db_todo_list = get_todo_list(db, todo_list_id)
+    db_todo_list = put_todo_list(db, todo_list_id, todo_list)
     if db_todo_list is None:
         raise HTTPException(status_code=404, detail="Todo list not found")
+    return db_todo_list
+
 
-    # 更新: update_todo_list → put_todo_list
-    return put_todo_list(db, todo_list_id, todo_list)
+def _purge_todo_list(todo_list_id: int) -> None:
+    # レスポンスの送信後に実行されるため、リクエストのセッションではなく専用のセッションを使う
+    db = database.SessionLocal()
+    try:
+        purge_todo_list(db, todo_list_id, batch_size=const.LIST_DELETE_BATCH_SIZE, pause=const.LIST_DELETE_BATCH_PAUSE)
+    finally:
+        db.close()
 
 
 @router.delete("/{todo_list_id}")
-def delete_list(todo_list_id: int, db: Annotated[Session, Depends(get_db)]):
-    """TODOリストを削除する."""
-    db_todo_list = get_todo_list(db, todo_list_id)
-    if db_todo_list is None:
-        raise HTTPException(status_code=404, detail="Todo list not found")
+def delete_list(
+    todo_list_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    response: Response,
+    background_tasks: BackgroundTasks,
+    background: Optional[bool] = Query(False, description="trueの場合はTODO項目を少しずつ削除するバックグラウンド処理を開始して202を返す"),
+):
+    """TODOリストを削除する.
 
-    delete_todo_list(db, todo_list_id)
+    TODO項目はDBのON DELETE CASCADEで同じDELETE文の中で削除されます。
+    TODO項目の多いTODOリストはbackground=trueを指定すると、ロックとレプリカの遅延を抑えるため
+    TODO項目を一定件数ずつ削除してからTODOリストを削除します(削除が終わるまでTODOリストは取得できます)。
+    """
+    if background:
+        if get_todo_list(db, todo_list_id) is None:
+            raise HTTPException(status_code=404, detail="Todo list not found")
+        background_tasks.add_task(_purge_todo_list, todo_list_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {}
+    if not delete_todo_list(db, todo_list_id):
+        raise HTTPException(status_code=404, detail="Todo list not found")
     return {}
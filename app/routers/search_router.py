@@ -0,0 +1,32 @@
+from typing import Annotated, Optional
+from fastapi import Query
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+
+from app.crud.search_crud import search_todos
+from app.dependencies import get_read_db
+from app.pagination import HAS_MORE_HEADER
+from app.schemas.search_schema import ResponseSearchHit
+
+router = APIRouter(
+    prefix="/search",
+    tags=["検索"],
+)
+
+
+@router.get("", response_model=list[ResponseSearchHit])
+def search(
+    db: Annotated[Session, Depends(get_read_db)],
+    response: Response,
+    q: str = Query(min_length=1, max_length=100, description="検索語"),
+    page: Optional[int] = Query(1, ge=1, description="ページ番号"),
+    per_page: Optional[int] = Query(10, ge=1, le=100, description="1ページあたりの最大件数"),
+):
+    """TODOリストとTODO項目のタイトル・説明を全文検索する.
+
+    全文検索インデックスを使い、関連度の高い順に返します。
+    続きのページがあるかどうかはX-Has-Moreヘッダーで返します。
+    """
+    rows, has_more = search_todos(db, q, page=page, per_page=per_page)
+    response.headers[HAS_MORE_HEADER] = "true" if has_more else "false"
+    return rows
@@ -0,0 +1,42 @@
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.schemas.item_schema import NewTodoItem
+from app.schemas.list_schema import NewTodoList
+
+
+class ImportTodoList(NewTodoList):
+    """インポートするNDJSONのTODOリストの行のスキーマ.
+
+    以降のTODO項目の行(todo_list_idの指定がないもの)はこのTODOリストに登録される。
+    """
+
+    type: Literal["list"]
+    # DBのカラム長(String(50))に合わせ、DBに拒否される長さのタイトルは検証の段階でエラーにする
+    title: str = Field(title="Todo List Title", min_length=1, max_length=50)
+
+
+class ImportTodoItem(NewTodoItem):
+    """インポートするNDJSONのTODO項目の行のスキーマ."""
+
+    type: Literal["item"]
+    title: str = Field(title="Todo Item Title", min_length=1, max_length=50)
+    todo_list_id: int | None = Field(default=None, title="Existing Todo List ID (defaults to the last imported list)")
+
+
+ImportLine = TypeAdapter(Annotated[ImportTodoList | ImportTodoItem, Field(discriminator="type")])
+
+
+class ResponseImportProgress(BaseModel):
+    """インポートの進捗のスキーマ.
+
+    途中で中断した場合は、lineとtodo_list_idを指定して再実行すると続きから再開できる。
+    """
+
+    line: int = Field(default=0, title="Number of lines processed and committed")
+    todo_list_id: int | None = Field(default=None, title="Last imported Todo List ID (for resuming)")
+    lists: int = Field(default=0, title="Number of imported Todo Lists")
+    items: int = Field(default=0, title="Number of imported Todo Items")
+    error_count: int = Field(default=0, title="Number of rejected lines")
+    errors: list[dict] = Field(default_factory=list, title="Rejected lines (line number and reason, up to a limit)")
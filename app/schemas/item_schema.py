@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -23,6 +24,46 @@ class UpdateTodoItem(BaseModel):
     complete: bool | None = Field(default=None, title="Set Todo Item status as completed")
 
 
+class TodoItemSelector(BaseModel):
+    """TODO項目一括操作の対象条件のスキーマ.
+
+    idsとstatusを両方指定した場合は両方に合致する項目が対象になり、
+    どちらも指定しない場合はTODOリスト内の全項目が対象になる。
+    """
+
+    ids: list[int] | None = Field(default=None, title="Target Todo Item IDs", min_length=1, max_length=1000)
+    status: TodoItemStatusCode | None = Field(default=None, title="Target Todo Status Code")
+
+
+class BulkUpdateTodoItem(TodoItemSelector):
+    """TODO項目一括ステータス更新時のスキーマ."""
+
+    complete: bool = Field(title="Set Todo Item status as completed")
+
+
+# TODO項目一覧の並び順(先頭の - は降順)
+TodoItemOrder = Literal["id", "-id", "due_at", "-due_at", "created_at", "-created_at"]
+
+
+class TodoItemFilter(BaseModel):
+    """TODO項目一覧の絞り込み・並べ替え条件のスキーマ.
+
+    期限はdue_after以上・due_before未満の範囲で絞り込む。
+    """
+
+    status: TodoItemStatusCode | None = Field(default=None, title="Todo Status Code")
+    due_before: datetime | None = Field(default=None, title="Todo Items due before this datetime")
+    due_after: datetime | None = Field(default=None, title="Todo Items due at or after this datetime")
+    updated_since: datetime | None = Field(default=None, title="Todo Items updated at or after this datetime")
+    order: TodoItemOrder = Field(default="id", title="Sort order")
+
+
+class ResponseBulkTodoItem(BaseModel):
+    """TODO項目一括操作のレスポンススキーマ."""
+
+    count: int = Field(title="Number of affected Todo Items")
+
+
 class ResponseTodoItem(BaseModel):
     id: int
     todo_list_id: int
@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from app.schemas.item_schema import ResponseTodoItem
+
 
 class NewTodoList(BaseModel):
     """TODOリスト新規作成時のスキーマ."""
@@ -23,5 +25,14 @@ class ResponseTodoList(BaseModel):
     id: int
     title: str = Field(title="Todo List Title", min_length=1, max_length=100)
     description: str | None = Field(default=None, title="Todo List Description", min_length=1, max_length=200)
+    item_count: int = Field(default=0, title="Number of Todo Items in the list")
+    completed_count: int = Field(default=0, title="Number of completed Todo Items in the list")
+    overdue_count: int | None = Field(default=None, title="Number of not completed Todo Items past due (only on GET)")
     created_at: datetime = Field(title="datetime that the item was created")
     updated_at: datetime = Field(title="datetime that the item was updated")
+
+
+class ResponseTodoListWithItems(ResponseTodoList):
+    """TODO項目を埋め込んだTODOリストのレスポンススキーマ(include=items指定時)."""
+
+    items: list[ResponseTodoItem] = Field(title="Todo Items of the list (up to items_per_list)")
@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ResponseSearchHit(BaseModel):
+    """全文検索でヒットしたTODOリスト・TODO項目のスキーマ."""
+
+    kind: Literal["list", "item"] = Field(title="Kind of the hit (list or item)")
+    id: int = Field(title="ID of the Todo List or Todo Item")
+    todo_list_id: int = Field(title="ID of the Todo List (the list itself for kind=list)")
+    title: str = Field(title="Title")
+    description: str | None = Field(default=None, title="Description")
+    score: float = Field(title="Relevance score (higher is better)")
@@ -0,0 +1,45 @@
+"""一覧エンドポイント用の高速なレスポンスの組み立て.
+
+DBから読み込んだ行は書き込み時に検証済みのため、response_modelによる再検証
+(ORMオブジェクト -> pydanticモデルへの変換と制約チェック)を行わず、
+スキーマのフィールドだけを取り出したdictを高速なJSONエンコーダで直接バイト列にする。
+"""
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjsonがない環境ではpydantic-coreのエンコーダを使う
+    orjson = None
+    from pydantic_core import to_json
+
+
+def dumps(content: object) -> bytes:
+    """dict・list・datetime・Enumを含む値をJSONのバイト列にする."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return to_json(content)
+
+
+def trusted_dicts(rows: list, model: type[BaseModel], **extra: dict) -> list[dict]:
+    """DBから読み込んだ行(ORMオブジェクト・Row・キャッシュの値)から、modelのフィールドだけのdictを検証なしで作る.
+
+    extraにはフィールド名 -> {行のid: 値} を渡し、行にない値(埋め込みの項目等)を追加する。
+    """
+    fields = [(name, None if field.is_required() else field.default) for name, field in model.model_fields.items() if name not in extra]
+    dicts = [{name: getattr(row, name, default) for name, default in fields} for row in rows]
+    for name, values in extra.items():
+        for row, x in zip(rows, dicts, strict=True):
+            x[name] = values[row.id]
+    return dicts
+
+
+def json_response(content: bytes, response: Response) -> Response:
+    """エンコード済みのJSONを、responseに設定したヘッダー(ページネーション・ETag等)を引き継いで返す."""
+    return Response(content=content, media_type="application/json", headers=dict(response.headers))
+
+
+def fast_json_response(rows: list, model: type[BaseModel], response: Response, **extra: dict) -> Response:
+    """一覧の行をresponse_modelで再検証せずにJSONレスポンスにする(extraはtrusted_dictsと同じ)."""
+    return json_response(dumps(trusted_dicts(rows, model, **extra)), response)
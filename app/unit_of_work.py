@@ -0,0 +1,31 @@
+"""リクエスト単位のトランザクション(ユニットオブワーク).
+
+APIのリクエストでは、CRUDの関数はflushまでしか行わず、依存関係(app.dependencies.get_db)が
+エンドポイントの正常終了時に1回だけコミットし、例外時はロールバックする。
+キャッシュの無効化のようにコミットされてから行うべき処理は on_commit で登録しておく
+(ロールバックされた場合は実行しない)。
+"""
+
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# コミット後に実行する処理を保持するSession.infoのキー
+_CALLBACKS_KEY = "on_commit"
+
+
+def on_commit(db: Session, callback: Callable[[], None]) -> None:
+    """セッションのトランザクションがコミットされた後にcallbackを実行する."""
+    db.info.setdefault(_CALLBACKS_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_callbacks(session: Session) -> None:
+    for callback in session.info.pop(_CALLBACKS_KEY, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_callbacks(session: Session) -> None:
+    session.info.pop(_CALLBACKS_KEY, None)
@@ -0,0 +1,369 @@
+"""TODOリスト・TODO項目の全エンドポイント(list_router・item_router)のHTTPベンチマーク.
+
+    python -m benchmarks.endpoints [--size 1k|100k|1m] [--concurrency N] [--requests N] [--runs N]
+                                   [--db-url URL] [--url URL] [--baseline PATH] [--save-baseline] [--output PATH]
+
+- 指定した件数のTODO項目(TODOリスト毎に --items-per-list 件)をDBに投入し、同じ件数で投入済みなら再利用する
+- DBは --db-url(省略時は DB_URL、それもなければ一時ディレクトリのSQLite)。件数が違うデータが入っている場合は
+  --reseed を指定しない限り投入しない(既存のデータを消さないため)
+- 各エンドポイントに --concurrency 並列で --requests 件ずつ --runs 回リクエストし、スループットとレイテンシ(p50/p95/p99)の
+  中央値をJSONで出力する
+- --url を省略した場合はアプリをプロセス内(ASGI)で呼び出す。指定した場合は起動済みのサーバー(同じDBを使うもの)に送る
+- ベースライン(既定は benchmarks/baselines/<DB>-<size>.json)と比較し、p95が悪化またはスループットが低下した
+  エンドポイントがあれば終了コード1を返す。--save-baseline で今回の結果をベースラインとして保存する
+  (計測値はマシンに依存するため、比較する場合は同じマシンで記録したベースラインを使う)
+
+書き込み系のエンドポイントは、ベンチマーク中に作成したTODOリスト・TODO項目だけを更新・削除するため、
+投入したデータは実行後も同じ件数のまま残る。
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BASELINE_DIR = Path(__file__).parent / "baselines"
+# 投入時に1回のINSERTで登録する行数
+SEED_BATCH_SIZE = 10_000
+# 一括登録のベンチマークで1リクエストに含めるTODO項目の件数
+BULK_SIZE = 10
+
+
+@dataclass
+class State:
+    """シナリオ間で共有する状態(投入したデータの範囲と、ベンチマーク中に作成した行)."""
+
+    rng: random.Random
+    item_count: int
+    items_per_list: int
+    created_lists: list[int] = field(default_factory=list)
+    created_items: deque = field(default_factory=deque)
+    bulk_groups: deque = field(default_factory=deque)
+
+    @property
+    def list_count(self) -> int:
+        return math.ceil(self.item_count / self.items_per_list)
+
+    def seeded_list(self) -> int:
+        return self.rng.randint(1, self.list_count)
+
+    def seeded_item(self) -> tuple[int, int]:
+        item_id = self.rng.randint(1, self.item_count)
+        return (item_id - 1) // self.items_per_list + 1, item_id
+
+    def created_list(self) -> int:
+        return self.rng.choice(self.created_lists)
+
+
+@dataclass
+class Scenario:
+    """1つのエンドポイントへのリクエストの作り方.
+
+    requestは (パス, JSONボディ) を返す。poolを指定した場合は、その件数までしかリクエストしない(削除系)。
+    """
+
+    name: str
+    method: str
+    request: Callable[[State], tuple[str, object]]
+    on_response: Callable[[State, object], None] | None = None
+    pool: Callable[[State], int] | None = None
+
+
+def _new_item(state: State) -> dict:
+    return {"title": f"bench {state.rng.random():.6f}", "description": "benchmark", "due_at": "2030-01-01T00:00:00"}
+
+
+def _pop_item(state: State) -> tuple[str, object]:
+    todo_list_id, item_id = state.created_items.popleft()
+    return f"/lists/{todo_list_id}/items/{item_id}", None
+
+
+def _pop_bulk_group(state: State) -> tuple[str, object]:
+    todo_list_id, ids = state.bulk_groups.popleft()
+    return f"/lists/{todo_list_id}/items/bulk", {"ids": ids}
+
+
+def _any_bulk_group(state: State) -> tuple[str, object]:
+    todo_list_id, ids = state.rng.choice(state.bulk_groups)
+    return f"/lists/{todo_list_id}/items/bulk", {"ids": ids, "complete": state.rng.random() < 0.5}
+
+
+def _item_page(state: State, per_page: int) -> int:
+    return state.rng.randint(1, max(1, state.items_per_list // per_page))
+
+
+# 実行順に並べる(作成系のレスポンスで得たIDを、後の更新・削除系で使う)
+SCENARIOS = [
+    Scenario("GET /lists", "GET", lambda s: (f"/lists?per_page=50&page={s.rng.randint(1, max(1, s.list_count // 50))}", None)),
+    Scenario(
+        "GET /lists?include=items", "GET",
+        lambda s: (f"/lists?per_page=20&include=items&items_per_list=20&page={s.rng.randint(1, max(1, s.list_count // 20))}", None),
+    ),
+    Scenario("GET /lists/{id}", "GET", lambda s: (f"/lists/{s.seeded_list()}", None)),
+    Scenario(
+        "POST /lists", "POST", lambda s: ("/lists", {"title": "bench", "description": "benchmark"}),
+        on_response=lambda s, body: s.created_lists.append(body["id"]),
+    ),
+    Scenario("PUT /lists/{id}", "PUT", lambda s: (f"/lists/{s.created_list()}", {"title": "bench updated", "description": "benchmark"})),
+    Scenario("GET /lists/{id}/items", "GET", lambda s: (f"/lists/{s.seeded_list()}/items?per_page=50&page={_item_page(s, 50)}", None)),
+    Scenario(
+        "GET /lists/{id}/items?status&order", "GET",
+        lambda s: (f"/lists/{s.seeded_list()}/items?per_page=20&status=1&order=-due_at", None),
+    ),
+    Scenario("GET /lists/{id}/items/{id}", "GET", lambda s: ("/lists/{}/items/{}".format(*s.seeded_item()), None)),
+    Scenario(
+        "POST /lists/{id}/items", "POST", lambda s: (f"/lists/{s.created_list()}/items", _new_item(s)),
+        on_response=lambda s, body: s.created_items.append((body["todo_list_id"], body["id"])),
+    ),
+    Scenario(
+        "PUT /lists/{id}/items/{id}", "PUT",
+        lambda s: ("/lists/{}/items/{}".format(*s.rng.choice(s.created_items)), {**_new_item(s), "complete": True}),
+    ),
+    Scenario(
+        "POST /lists/{id}/items/bulk", "POST", lambda s: (f"/lists/{s.created_list()}/items/bulk", [_new_item(s) for _ in range(BULK_SIZE)]),
+        on_response=lambda s, body: s.bulk_groups.append((body[0]["todo_list_id"], [x["id"] for x in body])),
+    ),
+    Scenario("PUT /lists/{id}/items/bulk", "PUT", _any_bulk_group),
+    Scenario("DELETE /lists/{id}/items/bulk", "DELETE", _pop_bulk_group, pool=lambda s: len(s.bulk_groups)),
+    Scenario("DELETE /lists/{id}/items/{id}", "DELETE", _pop_item, pool=lambda s: len(s.created_items)),
+    Scenario(
+        "DELETE /lists/{id}", "DELETE", lambda s: (f"/lists/{s.created_lists.pop()}", None),
+        pool=lambda s: len(s.created_lists),
+    ),
+]
+
+
+def seed(item_count: int, items_per_list: int, *, reseed: bool = False) -> None:
+    """TODO項目をitem_count件(TODOリストはitems_per_list件毎に1件)投入する. 同じ件数で投入済みなら何もしない."""
+    from sqlalchemy import delete, func, insert, select  # noqa: PLC0415
+
+    from app import database  # noqa: PLC0415
+    from app.models.item_model import ItemModel  # noqa: PLC0415
+    from app.models.list_model import ListModel  # noqa: PLC0415
+
+    lists, items = ListModel.__table__, ItemModel.__table__
+    database.Base.metadata.create_all(database.engine)
+    list_count = math.ceil(item_count / items_per_list)
+    with database.engine.begin() as conn:
+        existing = conn.scalar(select(func.count()).select_from(items))
+        if existing == item_count and conn.scalar(select(func.count()).select_from(lists)) == list_count:
+            return
+        if existing and not reseed:
+            sys.exit(f"{database.engine.url!r} already has {existing} todo items; pass --reseed to replace them")
+        conn.execute(delete(items))
+        conn.execute(delete(lists))
+
+    now = datetime.now()  # noqa: DTZ005
+    lists_per_batch = max(1, SEED_BATCH_SIZE // items_per_list)
+    for start in range(0, list_count, lists_per_batch):
+        list_ids = range(start + 1, min(start + lists_per_batch, list_count) + 1)
+        item_rows = []
+        for todo_list_id in list_ids:
+            first = (todo_list_id - 1) * items_per_list + 1
+            for item_id in range(first, min(first + items_per_list, item_count + 1)):
+                item_rows.append({
+                    "id": item_id,
+                    "todo_list_id": todo_list_id,
+                    "title": f"item {item_id}",
+                    "description": "seeded for benchmarks",
+                    "status_code": 2 if item_id % 3 == 0 else 1,
+                    # 約半数は期限切れになるように過去から未来へ分散させる
+                    "due_at": now + timedelta(days=item_id % 60 - 30) if item_id % 4 else None,
+                })
+        by_list = {x: [0, 0] for x in list_ids}
+        for row in item_rows:
+            by_list[row["todo_list_id"]][0] += 1
+            by_list[row["todo_list_id"]][1] += row["status_code"] == 2  # noqa: PLR2004
+        with database.engine.begin() as conn:
+            conn.execute(insert(lists), [
+                {"id": x, "title": f"list {x}", "description": "seeded for benchmarks", "item_count": n, "completed_count": c}
+                for x, (n, c) in by_list.items()
+            ])
+            if item_rows:
+                conn.execute(insert(items), item_rows)
+
+
+def _percentile(sorted_values: list[float], ratio: float) -> float:
+    # 最近傍法(件数が少なくても実測値のいずれかになる)
+    return sorted_values[min(len(sorted_values) - 1, math.ceil(ratio * len(sorted_values)) - 1)]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """レイテンシ(秒)の一覧からスループットとパーセンタイル(ミリ秒)を求める."""
+    values = sorted(latencies)
+    if not values:
+        return {"requests": 0, "errors": errors, "throughput_rps": 0.0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3),
+        **{f"p{p}_ms": round(_percentile(values, p / 100) * 1000, 3) for p in (50, 95, 99)},
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, state: State, requests: int, concurrency: int) -> dict:
+    """1つのシナリオをconcurrency並列でrequests件実行し、結果を集計する."""
+    if scenario.pool is not None:
+        requests = min(requests, scenario.pool(state))
+    remaining = requests
+    latencies, errors = [], 0
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            path, body = scenario.request(state)
+            started = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:  # noqa: PLR2004
+                errors += 1
+            elif scenario.on_response is not None:
+                scenario.on_response(state, response.json())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace, item_count: int) -> dict[str, dict]:
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from app.main import app  # noqa: PLC0415
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+
+    state = State(random.Random(args.seed), item_count, args.items_per_list)
+    results = {}
+    async with client:
+        for scenario in SCENARIOS:
+            if scenario.method == "GET" and args.warmup:
+                await run_scenario(client, scenario, state, args.warmup, args.concurrency)
+            runs = [await run_scenario(client, scenario, state, args.requests, args.concurrency) for _ in range(args.runs)]
+            results[scenario.name] = merge_runs(runs)
+            print(_format_row(scenario.name, results[scenario.name]), file=sys.stderr)  # noqa: T201
+    return results
+
+
+def merge_runs(runs: list[dict]) -> dict:
+    """同じシナリオを繰り返した結果を、件数は合計、スループット・レイテンシは中央値でまとめる(ばらつきを抑えるため)."""
+    runs = [x for x in runs if x["requests"]] or runs[:1]
+    merged = {"requests": sum(x["requests"] for x in runs), "errors": sum(x["errors"] for x in runs)}
+    for key in runs[0]:
+        if key not in merged:
+            values = [x[key] for x in runs if x[key] is not None]
+            merged[key] = statistics.median(values) if values else None
+    return merged
+
+
+def _format_row(name: str, result: dict) -> str:
+    if not result["requests"]:
+        return f"{name:40s} (no requests)"
+    return (
+        f"{name:40s} {result['throughput_rps']:9.1f} req/s  p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}"
+        f"  p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}"
+    )
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """ベースラインよりp95がtolerance以上悪化、またはスループットがtolerance以上低下したエンドポイントを返す."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not result["requests"] or not base["requests"]:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="1k", help="投入するTODO項目の件数")
+    parser.add_argument("--items-per-list", type=int, default=100, help="TODOリスト1件あたりのTODO項目の件数")
+    parser.add_argument("--requests", type=int, default=500, help="エンドポイント毎のリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=8, help="同時に送るリクエスト数")
+    parser.add_argument("--runs", type=int, default=3, help="エンドポイント毎の計測の繰り返し回数(結果は中央値)")
+    parser.add_argument("--warmup", type=int, default=20, help="取得系エンドポイントで計測前に送るリクエスト数")
+    parser.add_argument("--seed", type=int, default=0, help="リクエストの対象を選ぶ乱数のシード")
+    parser.add_argument("--db-url", help="ベンチマーク用のDB(省略時はDB_URL、それもなければ一時ディレクトリのSQLite)")
+    parser.add_argument("--reseed", action="store_true", help="件数の違うデータが入っていても削除して投入し直す")
+    parser.add_argument("--url", help="起動済みのサーバーのURL(省略時はプロセス内で呼び出す)")
+    parser.add_argument("--baseline", type=Path, help="比較するベースラインのJSON(省略時は benchmarks/baselines/<DB>-<size>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="今回の結果をベースラインとして保存する")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="回帰とみなす悪化の割合")
+    parser.add_argument("--output", type=Path, help="結果のJSONの出力先(省略時は標準出力)")
+    args = parser.parse_args(argv)
+
+    # app.database は読み込み時にDB_URLから接続先を決めるため、アプリを読み込む前に設定する
+    if args.db_url:
+        os.environ["DB_URL"] = args.db_url
+    elif not os.environ.get("DB_URL") and not os.environ.get("DB_HOST"):
+        os.environ["DB_URL"] = f"sqlite:///{Path(tempfile.gettempdir()) / f'todo-benchmark-{args.size}.db'}"
+    from app import database  # noqa: PLC0415
+
+    item_count = SIZES[args.size]
+    seed(item_count, args.items_per_list, reseed=args.reseed)
+    results = asyncio.run(run(args, item_count))
+
+    dialect = database.engine.dialect.name
+    report = {
+        "meta": {
+            "size": args.size,
+            "items": item_count,
+            "items_per_list": args.items_per_list,
+            "dialect": dialect,
+            "target": args.url or "asgi",
+            "requests": args.requests,
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)  # noqa: T201
+
+    baseline_path = args.baseline or BASELINE_DIR / f"{dialect}-{args.size}.json"
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(output + "\n")
+        print(f"saved baseline to {baseline_path}", file=sys.stderr)  # noqa: T201
+        return 0
+    if not baseline_path.exists():
+        print(f"no baseline at {baseline_path} (run with --save-baseline to create one)", file=sys.stderr)  # noqa: T201
+        return 0
+
+    regressions = compare(results, json.loads(baseline_path.read_text())["results"], args.tolerance)
+    for x in regressions:
+        print(f"REGRESSION {x}", file=sys.stderr)  # noqa: T201
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
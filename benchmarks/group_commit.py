@@ -0,0 +1,112 @@
+"""TODO項目の単体登録(POST /lists/{id}/items)のグループコミット(ITEM_GROUP_COMMIT)のベンチマーク.
+
+    python -m benchmarks.group_commit [--concurrency 1,8,32] [--windows 1,2,5] [--requests N] [--runs N] [--db-url URL]
+
+グループコミットなしと、待ち時間(--windows ミリ秒)毎のグループコミットありで、同時接続数(--concurrency)毎に
+TODO項目を登録し、スループット・レイテンシ(p50/p95/p99)と1回のコミットにまとまった平均件数をJSONで出力する。
+グループコミットは同時の登録が多いほどスループットが上がり、同時の登録が少ない場合は待ち時間の分だけレイテンシが増える。
+
+アプリはプロセス内(ASGI)で呼び出し、設定は計測毎に切り替える。DBは --db-url(省略時は DB_URL、
+それもなければ一時ディレクトリのSQLite)で、ベンチマーク用に作成したTODOリストにだけ登録する。
+コミット(fsync)のコストはDBとディスクに大きく依存するため、本番と同じ種類のDBでも計測すること。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+
+from benchmarks.endpoints import Scenario, State, _format_row, _new_item, merge_runs, run_scenario
+
+# 登録先のTODOリストの数(同時の登録は複数のTODOリストに分散する)
+LIST_COUNT = 10
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(x) for x in value.split(",")]
+
+
+def _float_list(value: str) -> list[float]:
+    return [float(x) for x in value.split(",")]
+
+
+def configure(window_ms: float | None, max_batch: int) -> object:
+    """グループコミットの有無と待ち時間を切り替える(window_msがNoneならグループコミットなし)."""
+    from app import const  # noqa: PLC0415
+    from app.crud import item_crud  # noqa: PLC0415
+    from app.crud.group_commit import GroupCommitter  # noqa: PLC0415
+
+    const.ITEM_GROUP_COMMIT = window_ms is not None
+    item_crud._item_group_commit = GroupCommitter(item_crud.insert_todo_items, window=(window_ms or 0) / 1000, max_batch=max_batch)  # noqa: SLF001
+    return item_crud._item_group_commit  # noqa: SLF001
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict]:
+    from app.main import app  # noqa: PLC0415
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+    state = State(random.Random(args.seed), item_count=0, items_per_list=1)
+    scenario = Scenario("POST /lists/{id}/items", "POST", lambda s: (f"/lists/{s.created_list()}/items", _new_item(s)))
+    results = {}
+    async with client:
+        for _ in range(LIST_COUNT):
+            response = await client.post("/lists", json={"title": "group commit bench", "description": "benchmark"})
+            state.created_lists.append(response.json()["id"])
+
+        for window_ms in [None, *args.windows]:
+            mode = "off" if window_ms is None else f"window={window_ms:g}ms"
+            for concurrency in args.concurrency:
+                committer = configure(window_ms, args.max_batch)
+                runs = [await run_scenario(client, scenario, state, args.requests, concurrency) for _ in range(args.runs)]
+                result = merge_runs(runs)
+                if window_ms is not None:
+                    result["mean_batch_size"] = round(committer.writes / committer.batches, 2) if committer.batches else None
+                results[f"{mode} concurrency={concurrency}"] = result
+                print(_format_row(f"{mode} concurrency={concurrency}", result), file=sys.stderr)  # noqa: T201
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32], help="同時に送るリクエスト数(カンマ区切り)")
+    parser.add_argument("--windows", type=_float_list, default=[1.0, 2.0, 5.0], help="グループコミットの待ち時間(ミリ秒, カンマ区切り)")
+    parser.add_argument("--max-batch", type=int, default=200, help="1回にまとめる最大件数")
+    parser.add_argument("--requests", type=int, default=500, help="計測1回あたりのリクエスト数")
+    parser.add_argument("--runs", type=int, default=3, help="計測の繰り返し回数(結果は中央値)")
+    parser.add_argument("--seed", type=int, default=0, help="登録先のTODOリストを選ぶ乱数のシード")
+    parser.add_argument("--db-url", help="ベンチマーク用のDB(省略時はDB_URL、それもなければ一時ディレクトリのSQLite)")
+    args = parser.parse_args(argv)
+
+    # app.database は最初の参照時にDB_URLから接続先を決めるため、アプリを読み込む前に設定する
+    if args.db_url:
+        os.environ["DB_URL"] = args.db_url
+    elif not os.environ.get("DB_URL") and not os.environ.get("DB_HOST"):
+        os.environ["DB_URL"] = f"sqlite:///{Path(tempfile.gettempdir()) / 'todo-group-commit-benchmark.db'}"
+    from app import database  # noqa: PLC0415
+    from app.models import item_model, list_model  # noqa: F401, PLC0415
+
+    database.Base.metadata.create_all(database.engine)
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "dialect": database.engine.dialect.name,
+            "requests": args.requests,
+            "runs": args.runs,
+            "max_batch": args.max_batch,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""計測用ミドルウェア(app.metrics・app.query_stats)の1リクエストあたりのオーバーヘッドを計測するベンチマーク.
+
+    python -m benchmarks.metrics [--requests N] [--repeat N]
+
+何もしないASGIアプリを直接呼んだ場合と、ミドルウェアを通した場合の1リクエストあたりの時間の差を出力する。
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from app.metrics import MetricsMiddleware
+from app.query_stats import QueryStatsMiddleware
+
+
+class _Route:
+    path = "/lists/{todo_list_id}/items"
+
+
+async def _noop_app(scope, receive, send) -> None:  # noqa: ANN001
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive() -> dict:
+    return {"type": "http.request"}
+
+
+async def _send(_: dict) -> None:
+    pass
+
+
+async def _measure(app, requests: int) -> float:  # noqa: ANN001
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        scope = {"type": "http", "method": "GET", "path": "/lists/1/items", "headers": []}
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started_at) / requests
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000, help="1回の計測のリクエスト数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数(最小値を使う)")
+    args = parser.parse_args(argv)
+
+    # 本番と同じくログの出力先がない状態(INFO未満は捨てられる)で計測する
+    logging.getLogger("app.query_stats").setLevel(logging.WARNING)
+    apps = {
+        "bare": _noop_app,
+        "metrics": MetricsMiddleware(_noop_app),
+        "metrics+query_stats": MetricsMiddleware(QueryStatsMiddleware(_noop_app)),
+    }
+    results = {name: min(asyncio.run(_measure(app, args.requests)) for _ in range(args.repeat)) for name, app in apps.items()}
+    for name, seconds in results.items():
+        overhead = seconds - results["bare"]
+        print(f"{name:20s} {seconds * 1e6:7.2f} us/request  (+{overhead * 1e6:.2f} us)")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""一覧レスポンスの1行あたりのシリアライズコストを比較するベンチマーク.
+
+    python -m benchmarks.serialization [--rows N] [--repeat N]
+
+- response_model: FastAPIのresponse_modelと同じ処理(ORMオブジェクトからの検証 -> JSON互換の値 -> json.dumps)
+- fast: app.serialization の検証なしのdict化 + 高速なJSONエンコーダ
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from app import serialization
+from app.models.item_model import ItemModel
+from app.schemas.item_schema import ResponseTodoItem
+
+
+def _rows(count: int) -> list[ItemModel]:
+    now = datetime(2024, 1, 1, 12, 0, 0)  # noqa: DTZ001
+    return [
+        ItemModel(
+            id=i,
+            todo_list_id=1,
+            title=f"benchmark item {i}",
+            description="A benchmark record for serialization.",
+            status_code=1 + i % 2,
+            due_at=now + timedelta(days=i),
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="1レスポンスの行数")
+    parser.add_argument("--repeat", type=int, default=200, help="計測の繰り返し回数")
+    args = parser.parse_args(argv)
+
+    rows = _rows(args.rows)
+    adapter = TypeAdapter(list[ResponseTodoItem])
+
+    def response_model() -> bytes:
+        validated = adapter.validate_python(rows, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+    def fast() -> bytes:
+        return serialization.dumps(serialization.trusted_dicts(rows, ResponseTodoItem))
+
+    assert json.loads(response_model()) == json.loads(fast())  # noqa: S101
+    encoder = "orjson" if serialization.orjson is not None else "pydantic_core"
+    results = {}
+    for name, func in (("response_model", response_model), ("fast", fast)):
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        results[name] = best / args.rows
+        print(f"{name:15s} {results[name] * 1e6:8.2f} us/row")  # noqa: T201
+    print(f"speedup         {results['response_model'] / results['fast']:8.2f}x ({encoder}, {args.rows} rows)")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
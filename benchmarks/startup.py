@@ -0,0 +1,108 @@
+"""コールドスタート(プロセス起動から最初のリクエストの応答まで)の時間を計測するベンチマーク.
+
+    python -m benchmarks.startup [--runs N] [--db-url URL]
+
+新しいPythonプロセスを起動し、次の時間を計測する(runs回の中央値をJSONで出力する)。
+
+- import_ms: app.main の読み込み
+- first_request_ms: 読み込み後、DBを使わない最初のリクエスト(/health)の応答まで
+- first_db_request_ms: その後、最初のDBを使うリクエスト(/lists)の応答まで(エンジンの作成・接続を含む)
+- time_to_first_request_ms: プロセスの起動から最初のリクエストの応答まで(インタプリタの起動を含む)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 子プロセスで実行するコード(計測値をJSONで標準出力に書く)
+_CHILD = """
+import asyncio, json, time
+
+started_at = time.perf_counter()
+import app.main
+imported_at = time.perf_counter()
+
+
+async def request(path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "", "headers": [],
+             "client": ("127.0.0.1", 0), "server": ("localhost", 80)}
+    await app.main.app(scope, receive, send)
+    assert messages[0]["status"] == 200, messages
+
+
+asyncio.run(request("/health"))
+first_request_at = time.perf_counter()
+print("first-response", flush=True)
+asyncio.run(request("/lists"))
+first_db_request_at = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported_at - started_at) * 1000,
+    "first_request_ms": (first_request_at - imported_at) * 1000,
+    "first_db_request_ms": (first_db_request_at - first_request_at) * 1000,
+}))
+"""
+
+
+def _prepare_sqlite(path: Path) -> str:
+    url = f"sqlite:///{path}"
+    if not path.exists():
+        from sqlalchemy import create_engine  # noqa: PLC0415
+
+        from app.database import Base  # noqa: PLC0415
+        from app.models import item_model, list_model  # noqa: F401, PLC0415
+
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+    return url
+
+
+def run_once(env: dict) -> dict:
+    started_at = time.perf_counter()
+    with subprocess.Popen([sys.executable, "-c", _CHILD], env=env, stdout=subprocess.PIPE, text=True) as child:
+        # 最初のリクエストに応答した時点で子プロセスが1行出力する
+        for line in child.stdout:
+            if line.strip() == "first-response":
+                break
+        time_to_first_request = time.perf_counter() - started_at
+        output = child.stdout.read()
+    if child.returncode:
+        msg = f"benchmark process exited with {child.returncode}"
+        raise RuntimeError(msg)
+    # 最後の行が計測値(アプリのログ等が標準出力に出ても読めるように)
+    result = json.loads(output.strip().splitlines()[-1])
+    result["time_to_first_request_ms"] = time_to_first_request * 1000
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="プロセスを起動して計測する回数")
+    parser.add_argument("--db-url", help="接続するDB(省略時は一時ディレクトリのSQLite)")
+    args = parser.parse_args(argv)
+
+    db_url = args.db_url or _prepare_sqlite(Path(tempfile.gettempdir()) / "todo-startup-benchmark.db")
+    env = {**os.environ, "DB_URL": db_url}
+    env.pop("DEBUG", None)
+    runs = [run_once(env) for _ in range(args.runs)]
+    report = {key: round(statistics.median(x[key] for x in runs), 2) for key in runs[0]}
+    print(json.dumps({"runs": args.runs, **report}, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
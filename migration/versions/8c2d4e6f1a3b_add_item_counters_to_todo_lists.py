@@ -0,0 +1,56 @@
+"""add item counters to todo_lists
+
+Revision ID: 8c2d4e6f1a3b
+Revises: 3f0b5fa5c5e1
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c2d4e6f1a3b"
+down_revision: str | None = "3f0b5fa5c5e1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# 既存データのカウンタを埋める際の1回のUPDATEで対象にするTODOリストのID幅
+BACKFILL_BATCH_SIZE = 1000
+
+COMPLETED = 2
+
+
+def upgrade() -> None:
+    op.add_column("todo_lists", sa.Column("item_count", sa.Integer, nullable=False, server_default="0"))
+    op.add_column("todo_lists", sa.Column("completed_count", sa.Integer, nullable=False, server_default="0"))
+
+    # 全件を1回のUPDATEでロックしないよう、IDの範囲毎に相関サブクエリで件数を埋める
+    # (env.pyはマイグレーション全体を1トランザクションで実行するため、autocommit_block内でバッチ毎にコミットさせ、
+    # 各バッチのロックをマイグレーションの終了まで持ち越さない)
+    todo_lists = sa.table("todo_lists", sa.column("id"), sa.column("item_count"), sa.column("completed_count"), sa.column("updated_at"))
+    todo_items = sa.table("todo_items", sa.column("todo_list_id"), sa.column("status_code"))
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.scalar(sa.select(sa.func.max(todo_lists.c.id))) or 0
+        for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.update(todo_lists)
+                .where(todo_lists.c.id > start, todo_lists.c.id <= start + BACKFILL_BATCH_SIZE)
+                .values(
+                    item_count=sa.select(sa.func.count())
+                    .where(todo_items.c.todo_list_id == todo_lists.c.id)
+                    .scalar_subquery(),
+                    completed_count=sa.select(sa.func.count())
+                    .where(todo_items.c.todo_list_id == todo_lists.c.id, todo_items.c.status_code == COMPLETED)
+                    .scalar_subquery(),
+                    # 件数の初期化ではupdated_at(ON UPDATE CURRENT_TIMESTAMP)を変えない
+                    updated_at=todo_lists.c.updated_at,
+                ),
+            )
+
+
+def downgrade() -> None:
+    op.drop_column("todo_lists", "completed_count")
+    op.drop_column("todo_lists", "item_count")
@@ -0,0 +1,31 @@
+"""add todo_items composite indexes
+
+Revision ID: b7e1c9d2f4a6
+Revises: 8c2d4e6f1a3b
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e1c9d2f4a6"
+down_revision: str | None = "8c2d4e6f1a3b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # リスト内の項目取得・IDによるページネーション
+    op.create_index("ix_todo_items_list_id_id", "todo_items", ["todo_list_id", "id"])
+    # ステータス・期限による絞り込み(期限切れ件数の集計はこのインデックスだけで完結する)
+    op.create_index("ix_todo_items_list_id_status_due_at", "todo_items", ["todo_list_id", "status_code", "due_at"])
+    # 更新日時による並べ替え・差分取得
+    op.create_index("ix_todo_items_list_id_updated_at", "todo_items", ["todo_list_id", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_todo_items_list_id_updated_at", table_name="todo_items")
+    op.drop_index("ix_todo_items_list_id_status_due_at", table_name="todo_items")
+    op.drop_index("ix_todo_items_list_id_id", table_name="todo_items")
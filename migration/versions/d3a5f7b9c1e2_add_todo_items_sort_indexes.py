@@ -0,0 +1,27 @@
+"""add todo_items sort indexes
+
+Revision ID: d3a5f7b9c1e2
+Revises: b7e1c9d2f4a6
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a5f7b9c1e2"
+down_revision: str | None = "b7e1c9d2f4a6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # TODO項目一覧の期限順・作成日時順の並べ替え(order=due_at, created_at)
+    op.create_index("ix_todo_items_list_id_due_at", "todo_items", ["todo_list_id", "due_at"])
+    op.create_index("ix_todo_items_list_id_created_at", "todo_items", ["todo_list_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_todo_items_list_id_created_at", table_name="todo_items")
+    op.drop_index("ix_todo_items_list_id_due_at", table_name="todo_items")
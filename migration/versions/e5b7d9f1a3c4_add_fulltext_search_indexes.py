@@ -0,0 +1,28 @@
+"""add fulltext search indexes
+
+Revision ID: e5b7d9f1a3c4
+Revises: d3a5f7b9c1e2
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b7d9f1a3c4"
+down_revision: str | None = "d3a5f7b9c1e2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # 日本語を分かち書きなしで検索できるよう、ngramパーサのFULLTEXTインデックスを作る
+    # (SQLiteのFTS5テーブルは python -m app.cli.rebuild_search_index で作成する)
+    op.execute("ALTER TABLE todo_lists ADD FULLTEXT INDEX ft_todo_lists_title_description (title, description) WITH PARSER ngram")
+    op.execute("ALTER TABLE todo_items ADD FULLTEXT INDEX ft_todo_items_title_description (title, description) WITH PARSER ngram")
+
+
+def downgrade() -> None:
+    op.drop_index("ft_todo_items_title_description", table_name="todo_items")
+    op.drop_index("ft_todo_lists_title_description", table_name="todo_lists")
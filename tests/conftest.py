@@ -1,8 +1,36 @@
 import pytest
 from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
+from app import database
+from app.cache import todo_cache
 from app.database import SessionLocal, engine
+from app.main import app
 from app.models import item_model, list_model
+from app.routers import async_item_router, async_list_router
+
+
+def pytest_generate_tests(metafunc) -> None:
+    # app.mainのappにリクエストするテストは、同期版とasync版(DB_ASYNC=true)の両方のルーターで実行する
+    # (片方のルーターだけに機能が追加されたり、動作が食い違ったりしないように)
+    if getattr(metafunc.module, "app", None) is app and metafunc.definition.get_closest_marker("sync_only") is None:
+        metafunc.parametrize("app_mode", ["sync", "async"], indirect=True)
+
+
+@pytest.fixture(autouse=True)
+def app_mode(request, monkeypatch):
+    """appのTODOリスト・TODO項目のエンドポイントを同期版・async版のどちらで実行するか(既定は同期版)."""
+    mode = getattr(request, "param", "sync")
+    if mode == "async":
+        # TestClientはリクエスト毎にイベントループが変わるためコネクションはプールしない
+        async_engine = create_async_engine(database.to_async_url(engine.url.render_as_string(hide_password=False)), poolclass=NullPool)
+        database.enable_sqlite_foreign_keys(async_engine.sync_engine)
+        monkeypatch.setattr(database, "AsyncSessionLocal", database.async_session_local(async_engine))
+        # appに登録済みの同期版のルートを、同じエンドポイントから作ったasync版のルートに差し替える
+        async_routes = {x.endpoint.__wrapped__: x for x in [*async_list_router.router.routes, *async_item_router.router.routes]}
+        monkeypatch.setattr(app.router, "routes", [async_routes.get(x.endpoint, x) for x in app.router.routes])
+    return mode
 
 
 @pytest.fixture(autouse=False)
@@ -10,9 +38,12 @@ def db_session():
     db = SessionLocal()
     try:
         _reset_records(db)
+        # 削除したレコードのIDは再利用されうるため、前のテストでキャッシュした値も捨てる
+        todo_cache.clear()
         yield db
     finally:
         _reset_records(db)
+        todo_cache.clear()
         db.close()
 
 
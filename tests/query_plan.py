@@ -0,0 +1,91 @@
+"""テスト用: 実行されたSQLの実行計画(EXPLAIN)を取得し、フルスキャン・ソートを検出するユーティリティ."""
+
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event
+
+from app.database import Base
+
+
+@dataclass
+class QueryPlan:
+    statement: str
+    parameters: object
+    plan: list[str] = field(default_factory=list)
+    problems: list[str] = field(default_factory=list)
+
+
+@contextmanager
+def capture_statements(engine: Engine) -> Iterator[list[tuple[str, object]]]:
+    """ブロック内でengineが実行したSELECT・UPDATE・DELETE文とパラメータを記録する."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001, ARG001, PLR0913, PLR0917
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+def _sqlite_problems(rows: list[str], tables: set[str]) -> list[str]:
+    problems = []
+    for detail in rows:
+        # サブクエリ(ウィンドウ関数の結果等)の走査は対象外とし、実テーブルの走査のみ検出する
+        scan = re.match(r"SCAN (\w+)", detail)
+        if scan and scan.group(1) in tables:
+            problems.append(f"full scan: {detail}")
+        if "USE TEMP B-TREE FOR" in detail:
+            problems.append(f"sort: {detail}")
+    return problems
+
+
+def _mysql_problems(rows: list[dict], tables: set[str]) -> list[str]:
+    problems = []
+    for row in rows:
+        if row["table"] in tables and row["type"] in {"ALL", "index"}:
+            problems.append(f"full scan: {row['table']} (type={row['type']})")
+        if "Using filesort" in (row.get("Extra") or ""):
+            problems.append(f"sort: {row['table']} ({row['Extra']})")
+    return problems
+
+
+def explain(engine: Engine, statement: str, parameters: object) -> QueryPlan:
+    """1つのSQLの実行計画を取得し、フルスキャンとソート(filesort)を検出する.
+
+    SQLiteでは EXPLAIN QUERY PLAN、MySQLでは EXPLAIN を使う。
+    """
+    tables = set(Base.metadata.tables)
+    result = QueryPlan(statement, parameters)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if engine.dialect.name == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            result.plan = [row[-1] for row in cursor.fetchall()]
+            result.problems = _sqlite_problems(result.plan, tables)
+        else:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            names = [x[0] for x in cursor.description]
+            rows = [dict(zip(names, row, strict=True)) for row in cursor.fetchall()]
+            result.plan = [str(row) for row in rows]
+            result.problems = _mysql_problems(rows, tables)
+        cursor.close()
+    finally:
+        # EXPLAINはDELETE・UPDATEを実行しないが、念のため変更は残さない
+        raw.rollback()
+        raw.close()
+    return result
+
+
+def assert_indexed(engine: Engine, statements: list[tuple[str, object]]) -> None:
+    """記録したSQLのいずれかがフルスキャン・ソートになっていれば、実行計画を付けて失敗させる."""
+    plans = [explain(engine, statement, parameters) for statement, parameters in statements]
+    failures = [x for x in plans if x.problems]
+    assert not failures, "\n\n".join(f"{x.statement}\n  {x.problems}\n  plan: {x.plan}" for x in failures)
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.database import Base, enable_sqlite_foreign_keys, to_async_url
+from app.models import item_model, list_model  # noqa: F401
+from app.routers import async_item_router, async_list_router
+
+
+@pytest.fixture
+def async_client(tmp_path, monkeypatch):
+    """aiosqliteをDBの代わりに使い、asyncルーターだけを載せたアプリのクライアント."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    Base.metadata.create_all(create_engine(url))
+
+    # TestClientはリクエスト毎にイベントループが変わるためコネクションはプールしない
+    async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+
+    # 依存関係(get_async_db)はそのまま使い、セッションの接続先だけを差し替える
+    monkeypatch.setattr(database, "AsyncSessionLocal", database.async_session_local(async_engine))
+
+    async_app = FastAPI()
+    async_app.include_router(async_list_router.router)
+    async_app.include_router(async_item_router.router)
+    return TestClient(async_app)
+
+
+def test_to_async_url() -> None:
+    """同期ドライバのURLがasyncioドライバのURLに変換されることを確認する."""
+    assert to_async_url("mysql+pymysql://dev:dev@db:3306/app?charset=utf8") == "mysql+aiomysql://dev:dev@db:3306/app?charset=utf8"
+    assert to_async_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+
+
+def test_async_crud_round_trip(async_client) -> None:
+    """asyncルーター経由でTODOリストとTODO項目のCRUDができることを確認する."""
+    # ******************
+    # テスト実行
+    # ******************
+    todo_list = async_client.post("/lists", json={"title": "async_test", "description": "A test record for async mode."}).json()
+    todo_item = async_client.post(f"/lists/{todo_list['id']}/items", json={"title": "async_test"}).json()
+    updated = async_client.put(f"/lists/{todo_list['id']}/items/{todo_item['id']}", json={"complete": True})
+    items = async_client.get(f"/lists/{todo_list['id']}/items")
+    deleted = async_client.delete(f"/lists/{todo_list['id']}")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert updated.status_code == status.HTTP_200_OK
+    assert updated.json()["status_code"] == 2
+    assert [x["id"] for x in items.json()] == [todo_item["id"]]
+    assert deleted.status_code == status.HTTP_200_OK
+    assert async_client.get(f"/lists/{todo_list['id']}").status_code == status.HTTP_404_NOT_FOUND
+    assert async_client.get(f"/lists/{todo_list['id']}/items/{todo_item['id']}").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_overdue_count(async_client) -> None:
+    """asyncルーターでも、期限切れの未完了TODO項目の件数(overdue_count)を返すことを確認する."""
+    todo_list = async_client.post("/lists", json={"title": "async_overdue_test"}).json()
+    async_client.post(f"/lists/{todo_list['id']}/items", json={"title": "overdue", "due_at": "2000-01-01T00:00:00"})
+    async_client.post(f"/lists/{todo_list['id']}/items", json={"title": "future", "due_at": "2999-01-01T00:00:00"})
+
+    # ******************
+    # テスト実行
+    # ******************
+    todo_lists = async_client.get("/lists")
+    detail = async_client.get(f"/lists/{todo_list['id']}")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert [x["overdue_count"] for x in todo_lists.json()] == [1]
+    assert detail.json()["overdue_count"] == 1
@@ -0,0 +1,55 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.const import TodoItemStatusCode
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+NUM_OF_RECORDS = 10
+
+
+def _prepare_items(db_session):
+    db_todo_list = list_model.ListModel(title="bulk_test", description="A test record for bulk operations.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+
+    db_todo_items = [item_model.ItemModel(
+        todo_list_id=db_todo_list.id,
+        title=f"bulk_test_{str(i).zfill(3)}",
+        status_code=TodoItemStatusCode.NOT_COMPLETED.value) for i in range(NUM_OF_RECORDS)]
+    db_session.add_all(db_todo_items)
+    db_session.commit()
+    return db_todo_list.id, [x.id for x in db_todo_items]
+
+
+def test_put_todo_items_status_by_ids(db_session) -> None:
+    """ID集合で指定したTODO項目だけが完了になることを確認する."""
+    todo_list_id, todo_item_ids = _prepare_items(db_session)
+
+    response = client.put(f"/lists/{todo_list_id}/items/bulk", json={"ids": todo_item_ids[:3], "complete": True})
+
+    db_session.reset()
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": 3}
+    completed = db_session.query(item_model.ItemModel.id).filter(
+        item_model.ItemModel.status_code == TodoItemStatusCode.COMPLETED.value,
+    ).all()
+    assert sorted(x.id for x in completed) == todo_item_ids[:3]
+
+
+def test_put_and_delete_todo_items_by_filter(db_session) -> None:
+    """リスト全体を完了にし、ステータス条件で一括削除できることを確認する."""
+    todo_list_id, _ = _prepare_items(db_session)
+
+    updated = client.put(f"/lists/{todo_list_id}/items/bulk", json={"complete": True})
+    deleted = client.request("DELETE", f"/lists/{todo_list_id}/items/bulk", json={
+        "status": TodoItemStatusCode.COMPLETED.value,
+    })
+
+    db_session.reset()
+    assert updated.json() == {"count": NUM_OF_RECORDS}
+    assert deleted.json() == {"count": NUM_OF_RECORDS}
+    assert db_session.query(item_model.ItemModel).filter(item_model.ItemModel.todo_list_id == todo_list_id).count() == 0
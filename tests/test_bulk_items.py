@@ -0,0 +1,67 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.const import TodoItemStatusCode
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+NUM_OF_RECORDS = 50
+
+
+def test_post_todo_items_bulk(db_session) -> None:
+    """TODO項目を一括登録できることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    db_todo_list = list_model.ListModel(title="bulk_test", description="A test record for bulk create.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+
+    # ******************
+    # テスト実行
+    # ******************
+    target_todo_list_id = db_todo_list.id
+    response = client.post(f"/lists/{target_todo_list_id}/items/bulk", json=[{
+        "title": f"bulk_test_{str(i).zfill(3)}",
+        "due_at": "2024-09-08T12:47:23",
+    } for i in range(NUM_OF_RECORDS)])
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    db_session.reset()
+
+    assert response.status_code == status.HTTP_200_OK
+
+    response_body = response.json()
+    assert [x["title"] for x in response_body] == [f"bulk_test_{str(i).zfill(3)}" for i in range(NUM_OF_RECORDS)]
+    assert all(x["todo_list_id"] == target_todo_list_id for x in response_body)
+    assert all(x["status_code"] == TodoItemStatusCode.NOT_COMPLETED.value for x in response_body)
+
+    db_todo_items = db_session.query(item_model.ItemModel).filter(item_model.ItemModel.todo_list_id == target_todo_list_id).all()
+    assert sorted(x.id for x in db_todo_items) == [x["id"] for x in response_body]
+
+
+def test_post_todo_items_bulk_is_atomic(db_session) -> None:
+    """1件でも不正な項目があれば何も登録されないことを確認する."""
+    db_todo_list = list_model.ListModel(title="bulk_test", description="A test record for bulk create.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+
+    target_todo_list_id = db_todo_list.id
+    response = client.post(f"/lists/{target_todo_list_id}/items/bulk", json=[{"title": "bulk_test"}, {"title": ""}])
+
+    db_session.reset()
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert db_session.query(item_model.ItemModel).filter(item_model.ItemModel.todo_list_id == target_todo_list_id).count() == 0
+
+
+def test_post_todo_items_bulk_404_list_not_found() -> None:
+    """存在しないTODOリストへの一括登録は404となることを確認する."""
+    response = client.post("/lists/-1/items/bulk", json=[{"title": "bulk_test"}])
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
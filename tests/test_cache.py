@@ -0,0 +1,143 @@
+from collections import namedtuple
+from datetime import datetime
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import cache as cache_module
+from app.cache import LRUCache, SharedCache, read_through, todo_cache
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+class FakeRedis:
+    """redis-py互換のget / set / deleteだけを持つ偽のクライアント."""
+
+    def __init__(self) -> None:
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        return 1 if self.values.pop(key, None) is not None else 0
+
+
+def test_lru_cache_evicts_and_expires() -> None:
+    """件数上限を超えると古い順に追い出され、TTLを過ぎた値は返さないことを確認する."""
+    now = [0.0]
+    cache = LRUCache(max_size=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", {"id": 1})
+    cache.set("b", {"id": 2})
+    cache.get("a")
+    cache.set("c", {"id": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": 1}
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["expirations"] == 1
+
+
+def test_shared_cache_round_trip() -> None:
+    """共有キャッシュでは日時を含む値がシリアライズされて保存・復元されることを確認する."""
+    cache = SharedCache(FakeRedis(), ttl=30)
+    value = {"id": 1, "title": "cache_test", "created_at": datetime(2024, 9, 8, 12, 47, 23)}
+
+    cache.set("todo_list:1", value)
+    assert cache.get("todo_list:1") == value
+
+    cache.delete("todo_list:1")
+    assert cache.get("todo_list:1") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+@pytest.mark.parametrize("backend", [lambda: LRUCache(max_size=10, ttl=30), lambda: SharedCache(FakeRedis(), ttl=30)], ids=["lru", "shared"])
+def test_read_through_skips_fill_invalidated_during_load(monkeypatch, backend) -> None:
+    """DBから読み込んでいる間に無効化された場合は、読み込んだ(古い可能性のある)値をキャッシュしないことを確認する."""
+    cache = backend()
+    monkeypatch.setattr(cache_module, "todo_cache", cache)
+    Row = namedtuple("Row", ["id", "title"])  # noqa: PYI024
+
+    def _load_then_invalidated() -> Row:
+        # 読み込みの後、キャッシュに入れる前に、別のリクエストの書き込みがコミットされて無効化される
+        row = Row(1, "before_write")
+        cache.delete("todo_list:1")
+        return row
+
+    # ******************
+    # テスト実行
+    # ******************
+    raced = read_through("todo_list:1", _load_then_invalidated)
+    after_race = cache.get("todo_list:1")
+    loaded = read_through("todo_list:1", lambda: Row(1, "after_write"))
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert raced.title == "before_write"
+    assert after_race is None
+    assert loaded.title == "after_write"
+    assert cache.get("todo_list:1") == {"id": 1, "title": "after_write"}
+
+
+def test_get_todo_list_cached_and_invalidated(db_session) -> None:
+    """2回目の取得はキャッシュから返り、更新後は新しい値が返ることを確認する."""
+    db_todo_list = list_model.ListModel(title="cache_test", description="A test record for cache.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+
+    # ******************
+    # テスト実行
+    # ******************
+    hits_before = todo_cache.stats()["hits"]
+    client.get(f"/lists/{db_todo_list.id}")
+    cached = client.get(f"/lists/{db_todo_list.id}")
+    client.put(f"/lists/{db_todo_list.id}", json={"title": "updated_cache_test"})
+    updated = client.get(f"/lists/{db_todo_list.id}")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert cached.status_code == status.HTTP_200_OK
+    assert cached.json()["title"] == "cache_test"
+    assert updated.json()["title"] == "updated_cache_test"
+    assert todo_cache.stats()["hits"] >= hits_before + 1
+
+
+def test_get_todo_list_overdue_count_cached(db_session) -> None:
+    """期限切れ件数もTODOリストと一緒にキャッシュされてSQLを実行せず、TODO項目の更新ではすぐに反映されることを確認する."""
+    db_todo_list = list_model.ListModel(title="cache_test", description="A test record for cache.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+    db_todo_item = item_model.ItemModel(todo_list_id=db_todo_list.id, title="overdue", status_code=1, due_at=datetime(2000, 1, 1))  # noqa: DTZ001
+    db_session.add(db_todo_item)
+    db_session.commit()
+
+    # ******************
+    # テスト実行
+    # ******************
+    first = client.get(f"/lists/{db_todo_list.id}")
+    cached = client.get(f"/lists/{db_todo_list.id}")
+    client.put(f"/lists/{db_todo_list.id}/items/{db_todo_item.id}", json={"complete": True})
+    completed = client.get(f"/lists/{db_todo_list.id}")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert first.json()["overdue_count"] == 1
+    assert cached.json()["overdue_count"] == 1
+    assert cached.headers["X-DB-Queries"] == "0"
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    assert completed.json()["overdue_count"] == 0
@@ -0,0 +1,80 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+NUM_OF_RECORDS = 15
+
+
+def test_get_todo_lists_cursor(db_session) -> None:
+    """カーソルを辿って全てのTODOリストを重複なく取得できることを確認する."""
+    db_todo_lists = [list_model.ListModel(
+        title=f"cursor_test_{str(i).zfill(3)}",
+        description="A test record for cursor pagination.") for i in range(NUM_OF_RECORDS)]
+    db_session.add_all(db_todo_lists)
+    db_session.commit()
+    for x in db_todo_lists:
+        db_session.refresh(x)
+
+    # ******************
+    # テスト実行
+    # ******************
+    first = client.get("/lists", params={"per_page": 10})
+    second = client.get("/lists", params={"per_page": 10, "cursor": first.headers["X-Next-Cursor"]})
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert first.status_code == status.HTTP_200_OK
+    assert first.headers["X-Has-More"] == "true"
+    assert second.status_code == status.HTTP_200_OK
+    assert second.headers["X-Has-More"] == "false"
+    assert "X-Next-Cursor" not in second.headers
+
+    actual_data_ids = [x["id"] for x in first.json() + second.json()]
+    expected_data_ids = sorted([x.id for x in db_todo_lists])
+    assert actual_data_ids == expected_data_ids
+
+
+def test_get_todo_items_cursor(db_session) -> None:
+    """カーソルを辿って全てのTODO項目を重複なく取得できることを確認する."""
+    db_todo_list = list_model.ListModel(title="cursor_test", description="A test record for cursor pagination.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+
+    todo_list_id = db_todo_list.id
+    db_todo_items = [item_model.ItemModel(
+        todo_list_id=todo_list_id,
+        title=f"cursor_test_{str(i).zfill(3)}",
+        description="A test record for cursor pagination.", status_code=1) for i in range(NUM_OF_RECORDS)]
+    db_session.add_all(db_todo_items)
+    db_session.commit()
+    for x in db_todo_items:
+        db_session.refresh(x)
+
+    # ******************
+    # テスト実行
+    # ******************
+    first = client.get(f"/lists/{todo_list_id}/items", params={"per_page": 10})
+    second = client.get(f"/lists/{todo_list_id}/items", params={"per_page": 10, "cursor": first.headers["X-Next-Cursor"]})
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert second.status_code == status.HTTP_200_OK
+    assert second.headers["X-Has-More"] == "false"
+
+    actual_data_ids = [x["id"] for x in first.json() + second.json()]
+    expected_data_ids = sorted([x.id for x in db_todo_items])
+    assert actual_data_ids == expected_data_ids
+
+
+def test_get_todo_lists_invalid_cursor() -> None:
+    """不正なカーソルは400となることを確認する."""
+    response = client.get("/lists", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
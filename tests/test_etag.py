@@ -0,0 +1,59 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def test_get_todo_list_not_modified(db_session) -> None:
+    """ETagが一致する場合は本文なしの304となることを確認する."""
+    db_todo_list = list_model.ListModel(title="etag_test", description="A test record for ETag.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+
+    # ******************
+    # テスト実行
+    # ******************
+    first = client.get(f"/lists/{db_todo_list.id}")
+    not_modified = client.get(f"/lists/{db_todo_list.id}", headers={"If-None-Match": first.headers["ETag"]})
+    other = client.get(f"/lists/{db_todo_list.id}", headers={"If-None-Match": '"other-etag"'})
+    # W/ を外したETagでも弱い比較で一致する
+    strong = client.get(f"/lists/{db_todo_list.id}", headers={"If-None-Match": first.headers["ETag"].removeprefix("W/")})
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    # updated_atは秒単位のため弱いETagとする
+    assert first.headers["ETag"].startswith('W/"')
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert strong.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == first.headers["ETag"]
+    assert other.status_code == status.HTTP_200_OK
+    assert other.json()["title"] == "etag_test"
+
+
+def test_get_todo_items_not_modified(db_session) -> None:
+    """一覧でもページのETagが一致する場合は304となり、項目が増えると200となることを確認する."""
+    db_todo_list = list_model.ListModel(title="etag_test", description="A test record for ETag.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+    db_session.add(item_model.ItemModel(todo_list_id=db_todo_list.id, title="etag_test", status_code=1))
+    db_session.commit()
+
+    first = client.get(f"/lists/{db_todo_list.id}/items")
+    not_modified = client.get(f"/lists/{db_todo_list.id}/items", headers={"If-None-Match": first.headers["ETag"]})
+
+    db_session.add(item_model.ItemModel(todo_list_id=db_todo_list.id, title="etag_test", status_code=1))
+    db_session.commit()
+    modified = client.get(f"/lists/{db_todo_list.id}/items", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.headers["X-Has-More"] == "false"
+    assert modified.status_code == status.HTTP_200_OK
+    assert len(modified.json()) == 2
+    assert modified.headers["ETag"] != first.headers["ETag"]
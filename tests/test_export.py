@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.crud import export_crud
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+NUM_OF_RECORDS = 5
+
+
+def _prepare_records(db_session) -> list[int]:
+    db_todo_lists = [list_model.ListModel(title=f"export_test_{i}", description="A test record for export.") for i in range(NUM_OF_RECORDS)]
+    db_session.add_all(db_todo_lists)
+    db_session.commit()
+    todo_list_ids = [x.id for x in db_todo_lists]
+    db_session.add_all([item_model.ItemModel(todo_list_id=todo_list_ids[0], title=f"export_test_{i}", status_code=1) for i in range(3)])
+    db_session.commit()
+    return todo_list_ids
+
+
+def test_export_todo_lists_ndjson(db_session, monkeypatch) -> None:
+    """TODOリストが1行1件のNDJSONで、サーバーサイドカーソルから数件ずつ書き出されることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_ids = _prepare_records(db_session)
+    monkeypatch.setattr(export_crud, "EXPORT_BATCH_SIZE", 2)
+
+    # ******************
+    # テスト実行
+    # ******************
+    batches = list(export_crud.stream_todo_lists())
+    response = client.get("/export/lists")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert [len(x) for x in batches] == [2, 2, 1]
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(x) for x in response.text.splitlines()]
+    assert [x["id"] for x in lines] == todo_list_ids
+    assert lines[0]["title"] == "export_test_0"
+    assert lines[0]["created_at"] is not None
+
+
+def test_export_todo_items_csv(db_session, monkeypatch) -> None:
+    """TODO項目がヘッダー付きのCSVで書き出されることを確認する."""
+    todo_list_ids = _prepare_records(db_session)
+    monkeypatch.setattr(export_crud, "EXPORT_BATCH_SIZE", 2)
+
+    response = client.get("/export/items", params={"format": "csv", "todo_list_id": todo_list_ids[0]})
+    empty = client.get("/export/items", params={"format": "csv", "todo_list_id": todo_list_ids[1]})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-disposition"] == 'attachment; filename="todo_items.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [x["title"] for x in rows] == [f"export_test_{i}" for i in range(3)]
+    assert empty.text.strip() == ",".join(item_model.ItemModel.__table__.c.keys())
@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app import const
+from app.crud import item_crud
+from app.crud.group_commit import GroupCommitter
+from app.main import app
+from app.models import list_model
+
+client = TestClient(app)
+
+
+class FakeSession:
+    """commit / close だけを持つ偽のセッション."""
+
+    def __init__(self, commits: list) -> None:
+        self.commits = commits
+
+    def commit(self) -> None:
+        self.commits.append(1)
+
+    def close(self) -> None:
+        pass
+
+
+def test_group_commit_batches_concurrent_writes() -> None:
+    """同時に届いた書き込みが1回の書き込み・コミットにまとめられ、それぞれが自分の結果を受け取ることを確認する."""
+    commits, batches = [], []
+
+    def write(_, values: list[dict]) -> list:
+        batches.append(len(values))
+        return [x["n"] * 10 for x in values]
+
+    # 件数が上限に達したら待ち時間の途中でも書き込む
+    committer = GroupCommitter(write, window=5, max_batch=8, session_factory=lambda: FakeSession(commits))
+
+    # ******************
+    # テスト実行
+    # ******************
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda n: committer.submit({"n": n}), range(8)))
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert results == [n * 10 for n in range(8)]
+    assert batches == [8]
+    assert len(commits) == 1
+
+
+def test_group_commit_isolates_failed_write() -> None:
+    """まとめた書き込みが失敗した場合、1件ずつ書き込み直して失敗した書き込みだけがエラーになることを確認する."""
+    commits = []
+
+    def write(_, values: list[dict]) -> list:
+        if any(x["n"] == 2 for x in values):
+            raise IntegrityError("INSERT", {}, Exception("foreign key"))
+        return [x["n"] for x in values]
+
+    committer = GroupCommitter(write, window=5, max_batch=4, session_factory=lambda: FakeSession(commits))
+
+    def submit(n: int):
+        try:
+            return committer.submit({"n": n})
+        except IntegrityError:
+            return "error"
+
+    # ******************
+    # テスト実行
+    # ******************
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(submit, range(4)))
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert results == [0, 1, "error", 3]
+    assert len(commits) == 3
+
+
+# グループコミットはasyncモードでは使わない(app.routers.item_router)
+@pytest.mark.sync_only
+def test_post_item_group_commit(db_session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """グループコミット有効時、同時のTODO項目登録が1回で書き込まれ、項目数も正しく加算されることを確認する."""
+    db_todo_list = list_model.ListModel(title="group_commit_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    # commitで失効した属性を複数のスレッドから同時に読み込まないよう、先に読んでおく
+    todo_list_id = db_todo_list.id
+    committer = GroupCommitter(item_crud.insert_todo_items, window=5, max_batch=3)
+    monkeypatch.setattr(const, "ITEM_GROUP_COMMIT", True)
+    monkeypatch.setattr(item_crud, "_item_group_commit", committer)
+
+    # ******************
+    # テスト実行
+    # ******************
+    def post(n: int):
+        return client.post(f"/lists/{todo_list_id}/items", json={"title": f"item{n}", "due_at": "2024-09-08T12:47:23"})
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        responses = list(executor.map(post, range(3)))
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert [x.status_code for x in responses] == [status.HTTP_200_OK] * 3
+    assert [x.json()["title"] for x in responses] == ["item0", "item1", "item2"]
+    assert len({x.json()["id"] for x in responses}) == 3
+    assert committer.batches == 1
+    db_session.refresh(db_todo_list)
+    assert db_todo_list.item_count == 3
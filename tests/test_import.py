@@ -0,0 +1,108 @@
+import json
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.cli import import_ndjson
+from app.const import TodoItemStatusCode
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def _ndjson(*rows) -> str:
+    return "\n".join(x if isinstance(x, str) else json.dumps(x) for x in rows) + "\n"
+
+
+def test_import_todos(db_session) -> None:
+    """NDJSONからTODOリスト・TODO項目が登録され、不正な行だけがエラーになることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    body = _ndjson(
+        {"type": "list", "title": "import_test", "description": "A test record for import."},
+        {"type": "item", "title": "import_test_1"},
+        "{broken json",
+        {"type": "item", "title": "import_test_2", "status": TodoItemStatusCode.COMPLETED.value},
+        {"type": "item", "title": "import_test_3", "todo_list_id": 999999},
+        {"type": "item", "title": ""},
+        {"type": "item", "title": "import_test_4"},
+    )
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.post("/import", params={"chunk_size": 2}, content=body.encode())
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    progress = response.json()
+    assert (progress["line"], progress["lists"], progress["items"], progress["error_count"]) == (7, 1, 3, 3)
+    assert sorted(x["line"] for x in progress["errors"]) == [3, 5, 6]
+
+    db_session.reset()
+    db_todo_list = db_session.query(list_model.ListModel).filter(list_model.ListModel.id == progress["todo_list_id"]).one()
+    titles = [x.title for x in db_session.query(item_model.ItemModel).filter(item_model.ItemModel.todo_list_id == db_todo_list.id).order_by(item_model.ItemModel.id)]
+    assert titles == ["import_test_1", "import_test_2", "import_test_4"]
+    assert (db_todo_list.item_count, db_todo_list.completed_count) == (3, 1)
+
+
+def test_import_ndjson_resume(db_session, tmp_path, capsys) -> None:
+    """進捗ファイルから再開した場合に、登録済みの行を二重に登録しないことを確認する."""
+    path = tmp_path / "todos.ndjson"
+    path.write_text(_ndjson(
+        {"type": "list", "title": "resume_test"},
+        *({"type": "item", "title": f"resume_test_{i}"} for i in range(4)),
+    ))
+    progress_path = tmp_path / "todos.ndjson.progress.json"
+    # 3行目までコミット済みの状態から再開する
+    first = client.post("/import", params={"chunk_size": 3}, content="".join(path.read_text().splitlines(keepends=True)[:3]).encode()).json()
+    progress_path.write_text(json.dumps(first))
+
+    exit_code = import_ndjson.main([str(path), "--chunk-size", "2"])
+
+    assert exit_code == 0
+    assert json.loads(progress_path.read_text())["line"] == 5
+    assert "lines=5 lists=1 items=4 errors=0" in capsys.readouterr().err
+    titles = [x.title for x in db_session.query(item_model.ItemModel).filter(item_model.ItemModel.todo_list_id == first["todo_list_id"]).order_by(item_model.ItemModel.id)]
+    assert titles == [f"resume_test_{i}" for i in range(4)]
+
+
+def test_import_items_after_rejected_list(db_session) -> None:
+    """TODOリストの行が拒否された場合、後続のTODO項目の行を前のTODOリストに登録せずエラーにすることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    body = _ndjson(
+        {"type": "list", "title": "customer_a"},
+        {"type": "item", "title": "customer_a_1"},
+        {"type": "list", "title": ""},
+        {"type": "item", "title": "orphan_1"},
+        {"type": "item", "title": "orphan_2"},
+        {"type": "list", "title": "x" * 51},
+        {"type": "item", "title": "orphan_3"},
+        {"type": "list", "title": "customer_b"},
+        {"type": "item", "title": "customer_b_1"},
+    )
+
+    # ******************
+    # テスト実行
+    # ******************
+    # チャンクをまたいでも拒否したTODOリストの後の項目がエラーになるよう、チャンクは小さくする
+    response = client.post("/import", params={"chunk_size": 3}, content=body.encode())
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    progress = response.json()
+    assert (progress["lists"], progress["items"], progress["error_count"]) == (2, 2, 5)
+    assert sorted(x["line"] for x in progress["errors"]) == [3, 4, 5, 6, 7]
+
+    db_session.reset()
+    titles = {x.title: x.todo_list_id for x in db_session.query(item_model.ItemModel)}
+    todo_lists = {x.title: x.id for x in db_session.query(list_model.ListModel)}
+    assert titles == {"customer_a_1": todo_lists["customer_a"], "customer_b_1": todo_lists["customer_b"]}
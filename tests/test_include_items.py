@@ -0,0 +1,67 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def test_get_todo_lists_include_items(db_session) -> None:
+    """include=itemsで各TODOリストにTODO項目が上限件数まで埋め込まれることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    db_todo_lists = [list_model.ListModel(title=f"include_test_{i}", description="A test record for include.") for i in range(3)]
+    db_session.add_all(db_todo_lists)
+    db_session.commit()
+    for x in db_todo_lists:
+        db_session.refresh(x)
+    db_session.add_all([
+        item_model.ItemModel(todo_list_id=x.id, title=f"include_test_{j}", status_code=1)
+        for i, x in enumerate(db_todo_lists) for j in range(i * 2)
+    ])
+    db_session.commit()
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.get("/lists", params={"include": "items", "items_per_list": 3})
+    plain = client.get("/lists")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    response_body = response.json()
+    assert [len(x["items"]) for x in response_body] == [0, 2, 3]
+    assert all(item["todo_list_id"] == x["id"] for x in response_body for item in x["items"])
+    assert "items" not in plain.json()[0]
+
+
+def test_get_todo_list_include_items(db_session) -> None:
+    """単一のTODOリストでもinclude=itemsでTODO項目が埋め込まれることを確認する."""
+    db_todo_list = list_model.ListModel(title="include_test", description="A test record for include.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+    db_session.add(item_model.ItemModel(todo_list_id=db_todo_list.id, title="include_test", status_code=1))
+    db_session.commit()
+
+    response = client.get(f"/lists/{db_todo_list.id}", params={"include": "items"})
+    not_modified = client.get(f"/lists/{db_todo_list.id}", params={"include": "items"}, headers={"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == db_todo_list.id
+    assert [x["title"] for x in response.json()["items"]] == ["include_test"]
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_include_items_documented_in_openapi() -> None:
+    """include=itemsのレスポンス(ResponseTodoListWithItems)がOpenAPIのスキーマに含まれることを確認する."""
+    paths = client.get("/openapi.json").json()["paths"]
+
+    for path in ("/lists", "/lists/{todo_list_id}"):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert "ResponseTodoListWithItems" in str(schema)
+        assert "ResponseTodoList'" in str(schema)
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.const import TodoItemStatusCode
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+BASE_DATETIME = datetime(2024, 1, 1)  # noqa: DTZ001
+
+
+def _prepare_items(db_session):
+    db_todo_list = list_model.ListModel(title="filter_test", description="A test record for filters.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+
+    # 期限は 0日後, 1日後, ..., 7日後 と なし(NULL)が2件、偶数番目は完了済み
+    db_todo_items = [item_model.ItemModel(
+        todo_list_id=db_todo_list.id,
+        title=f"filter_test_{i}",
+        status_code=TodoItemStatusCode.COMPLETED.value if i % 2 == 0 else TodoItemStatusCode.NOT_COMPLETED.value,
+        due_at=BASE_DATETIME + timedelta(days=i) if i < 8 else None) for i in range(10)]
+    db_session.add_all(db_todo_items)
+    db_session.commit()
+    return db_todo_list.id
+
+
+def test_get_todo_items_filtered(db_session) -> None:
+    """ステータスと期限の範囲で絞り込めることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_id = _prepare_items(db_session)
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.get(f"/lists/{todo_list_id}/items", params={
+        "status": TodoItemStatusCode.NOT_COMPLETED.value,
+        "due_after": (BASE_DATETIME + timedelta(days=2)).isoformat(),
+        "due_before": (BASE_DATETIME + timedelta(days=7)).isoformat(),
+        "order": "-due_at",
+    })
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    assert [x["title"] for x in response.json()] == ["filter_test_5", "filter_test_3"]
+
+
+def test_get_todo_items_sorted_with_cursor(db_session) -> None:
+    """期限の降順で、期限なしの項目をまたいでカーソルで全件を漏れなく取得できることを確認する."""
+    todo_list_id = _prepare_items(db_session)
+
+    titles = []
+    params = {"order": "-due_at", "per_page": 3}
+    while True:
+        response = client.get(f"/lists/{todo_list_id}/items", params=params)
+        titles += [x["title"] for x in response.json()]
+        if response.headers["X-Has-More"] == "false":
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    ascending = client.get(f"/lists/{todo_list_id}/items", params={"order": "due_at", "per_page": 100})
+
+    assert titles == [f"filter_test_{i}" for i in (7, 6, 5, 4, 3, 2, 1, 0, 9, 8)]
+    assert [x["title"] for x in ascending.json()] == [f"filter_test_{i}" for i in (8, 9, 0, 1, 2, 3, 4, 5, 6, 7)]
+
+
+def test_get_todo_items_cursor_without_sort_key(db_session) -> None:
+    """並べ替えキーを含まないカーソルを期限順の一覧に渡すと400になることを確認する."""
+    todo_list_id = _prepare_items(db_session)
+
+    first = client.get(f"/lists/{todo_list_id}/items", params={"per_page": 3})
+    response = client.get(f"/lists/{todo_list_id}/items", params={"order": "due_at", "cursor": first.headers["X-Next-Cursor"]})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("order", ["created_at", "-created_at"])
+def test_get_todo_items_created_at_cursor(db_session, order) -> None:
+    """作成日時の順で、同じ作成日時の項目をまたいでもカーソルで全件を1回ずつ取得できることを確認する."""
+    todo_list_id = _prepare_items(db_session)
+    # DB側の既定値(現在日時)の項目に加えて、作成日時を指定した同じ日時の項目を混ぜる
+    db_session.add_all([item_model.ItemModel(
+        todo_list_id=todo_list_id,
+        title=f"created_at_test_{i}",
+        status_code=TodoItemStatusCode.NOT_COMPLETED.value,
+        created_at=BASE_DATETIME + timedelta(seconds=i // 2)) for i in range(5)])
+    db_session.commit()
+    expected = sorted(x.id for x in db_session.query(item_model.ItemModel.id).filter(item_model.ItemModel.todo_list_id == todo_list_id))
+
+    ids = []
+    params = {"order": order, "per_page": 3}
+    # カーソルが進まない場合に無限ループにならないよう、ページ数に上限を設ける
+    for _ in range(len(expected)):
+        response = client.get(f"/lists/{todo_list_id}/items", params=params)
+        ids += [x["id"] for x in response.json()]
+        if response.headers["X-Has-More"] == "false":
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    assert sorted(ids) == expected
+    created_at = [x["created_at"] for x in client.get(f"/lists/{todo_list_id}/items", params={"order": order, "per_page": 100}).json()]
+    assert created_at == sorted(created_at, reverse=order.startswith("-"))
+
+
+def test_get_todo_items_updated_since(db_session) -> None:
+    """DB側で設定した更新日時と同じ日時を updated_since に指定した場合も、その項目が含まれることを確認する."""
+    todo_list_id = _prepare_items(db_session)
+    updated_at = max(x["updated_at"] for x in client.get(f"/lists/{todo_list_id}/items", params={"per_page": 100}).json())
+
+    response = client.get(f"/lists/{todo_list_id}/items", params={"updated_since": updated_at, "per_page": 100})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [x["updated_at"] for x in response.json()].count(updated_at) >= 1
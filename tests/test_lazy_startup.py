@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+
+def test_app_imports_without_database_settings() -> None:
+    """DBの環境変数がなくてもアプリを読み込め、読み込み時にはエンジン作成・デバッグツールバーの読み込みを行わないことを確認する."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("DB_", "DEBUG"))}
+    code = (
+        "import sys, app.main, app.database as database\n"
+        "print('engine' in vars(database), 'debug_toolbar' in sys.modules, 'sqlalchemy.ext.asyncio' in sys.modules)\n"
+    )
+
+    # ******************
+    # テスト実行
+    # ******************
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=False)
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "False", "False"]
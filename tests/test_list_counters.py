@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.cli import reconcile_counters
+from app.const import TodoItemStatusCode
+from app.database import engine
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def test_todo_list_counters_follow_item_writes(db_session) -> None:
+    """TODO項目の登録・更新・削除でTODOリストの項目数・完了数が更新されることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    db_todo_list = list_model.ListModel(title="counter_test", description="A test record for counters.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+    todo_list_id = db_todo_list.id
+
+    # ******************
+    # テスト実行
+    # ******************
+    item_id = client.post(f"/lists/{todo_list_id}/items", json={"title": "counter_test", "status": TodoItemStatusCode.COMPLETED.value}).json()["id"]
+    client.post(f"/lists/{todo_list_id}/items/bulk", json=[{"title": f"counter_test_{i}"} for i in range(3)])
+    created = client.get(f"/lists/{todo_list_id}").json()
+
+    client.put(f"/lists/{todo_list_id}/items/{item_id}", json={"complete": True})  # 変化なし
+    client.put(f"/lists/{todo_list_id}/items/bulk", json={"complete": True})
+    completed = client.get(f"/lists/{todo_list_id}").json()
+
+    client.delete(f"/lists/{todo_list_id}/items/{item_id}")
+    client.put(f"/lists/{todo_list_id}/items/bulk", json={"complete": False})
+    deleted = client.get(f"/lists/{todo_list_id}").json()
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert (created["item_count"], created["completed_count"]) == (4, 1)
+    assert (completed["item_count"], completed["completed_count"]) == (4, 4)
+    assert (deleted["item_count"], deleted["completed_count"]) == (3, 0)
+    assert reconcile_counters.main([]) == 0
+
+
+def test_overdue_count_on_get(db_session) -> None:
+    """期限切れの未完了TODO項目の件数が取得時に集計されることを確認する."""
+    db_todo_list = list_model.ListModel(title="overdue_test", description="A test record for overdue.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+    past, future = datetime.now() - timedelta(days=1), datetime.now() + timedelta(days=1)  # noqa: DTZ005
+    db_session.add_all([
+        item_model.ItemModel(todo_list_id=db_todo_list.id, title="overdue", status_code=TodoItemStatusCode.NOT_COMPLETED.value, due_at=past),
+        item_model.ItemModel(todo_list_id=db_todo_list.id, title="completed", status_code=TodoItemStatusCode.COMPLETED.value, due_at=past),
+        item_model.ItemModel(todo_list_id=db_todo_list.id, title="not_due", status_code=TodoItemStatusCode.NOT_COMPLETED.value, due_at=future),
+    ])
+    db_session.commit()
+
+    response = client.get(f"/lists/{db_todo_list.id}")
+    listed = client.get("/lists")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["overdue_count"] == 1
+    assert listed.json()[0]["overdue_count"] == 1
+
+
+def test_reconcile_counters_fix(db_session, capsys) -> None:
+    """カウンタが実データと食い違っている場合に検出・修正できることを確認する."""
+    db_todo_list = list_model.ListModel(title="reconcile_test", description="A test record for reconcile.", item_count=5)
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.refresh(db_todo_list)
+    todo_list_id = db_todo_list.id
+    db_session.add(item_model.ItemModel(todo_list_id=todo_list_id, title="reconcile_test", status_code=TodoItemStatusCode.COMPLETED.value))
+    db_session.commit()
+
+    checked = reconcile_counters.main([])
+    fixed = reconcile_counters.main(["--fix", "--batch-size", "1"])
+    rechecked = reconcile_counters.main([])
+
+    assert (checked, fixed, rechecked) == (1, 0, 0)
+    assert f'"id": {todo_list_id}, "item_count": 5, "completed_count": 0, "actual_item_count": 1, "actual_completed_count": 1' in capsys.readouterr().out
+    assert client.get(f"/lists/{todo_list_id}").json()["item_count"] == 1
+
+
+def test_reconcile_counters_fix_keeps_concurrent_write(db_session) -> None:
+    """食い違いの検出から修正までの間に他のリクエストがTODO項目を登録しても、その分が失われないことを確認する."""
+    db_todo_list = list_model.ListModel(title="reconcile_test", description="A test record for reconcile.", item_count=5)
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+    db_session.add(item_model.ItemModel(todo_list_id=todo_list_id, title="reconcile_test", status_code=TodoItemStatusCode.NOT_COMPLETED.value))
+    db_session.commit()
+    written = []
+
+    def _write_before_fix(conn, cursor, statement, *_) -> None:
+        # 修正のUPDATE文の直前に、別のリクエストでTODO項目を登録する(そのリクエスト自身のUPDATE文では何もしない)
+        if statement.startswith("UPDATE todo_lists") and not written:
+            written.append(None)
+            written[0] = client.post(f"/lists/{todo_list_id}/items", json={"title": "concurrent"}).status_code
+
+    # ******************
+    # テスト実行
+    # ******************
+    event.listen(engine, "before_cursor_execute", _write_before_fix)
+    try:
+        reconcile_counters.main(["--fix"])
+    finally:
+        event.remove(engine, "before_cursor_execute", _write_before_fix)
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert written == [status.HTTP_200_OK]
+    db_session.refresh(db_todo_list)
+    assert (db_todo_list.item_count, db_todo_list.completed_count) == (2, 0)
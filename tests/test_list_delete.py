@@ -0,0 +1,83 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app import const, database
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def _create_list_with_items(db_session, count: int) -> list_model.ListModel:
+    db_todo_list = list_model.ListModel(title="list_delete_test", item_count=count)
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.add_all([item_model.ItemModel(todo_list_id=db_todo_list.id, title=f"item{n}", status_code=1) for n in range(count)])
+    db_session.commit()
+    return db_todo_list
+
+
+def _item_count(db_session, todo_list_id: int) -> int:
+    return db_session.scalar(select(func.count()).select_from(item_model.ItemModel).where(item_model.ItemModel.todo_list_id == todo_list_id))
+
+
+def test_orm_delete_does_not_load_items(db_session) -> None:
+    """ORMでTODOリストを削除してもTODO項目は読み込まれず、DBのON DELETE CASCADEで削除されることを確認する."""
+    db_todo_list = _create_list_with_items(db_session, 3)
+    todo_list_id = db_todo_list.id
+    statements = []
+
+    def _record(conn, cursor, statement, *_) -> None:
+        statements.append(statement)
+
+    # ******************
+    # テスト実行
+    # ******************
+    event.listen(database.engine, "before_cursor_execute", _record)
+    try:
+        db_session.delete(db_todo_list)
+        db_session.commit()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _record)
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert not [x for x in statements if "todo_items" in x]
+    assert _item_count(db_session, todo_list_id) == 0
+
+
+def test_delete_list_in_background(db_session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """background=trueの場合は202を返し、TODO項目を一定件数ずつ削除してからTODOリストを削除することを確認する."""
+    db_todo_list = _create_list_with_items(db_session, 5)
+    todo_list_id = db_todo_list.id
+    monkeypatch.setattr(const, "LIST_DELETE_BATCH_SIZE", 2)
+    monkeypatch.setattr(const, "LIST_DELETE_BATCH_PAUSE", 0)
+    deletes = []
+
+    def _record(conn, cursor, statement, *_) -> None:
+        if statement.startswith("DELETE FROM todo_items"):
+            deletes.append(statement)
+
+    # ******************
+    # テスト実行
+    # ******************
+    # TestClientはバックグラウンド処理の完了後にレスポンスを返す
+    event.listen(database.engine, "before_cursor_execute", _record)
+    try:
+        response = client.delete(f"/lists/{todo_list_id}?background=true")
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _record)
+    not_found = client.delete("/lists/-1?background=true")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert not_found.status_code == status.HTTP_404_NOT_FOUND
+    # 5件を2件ずつ削除する
+    assert len(deletes) == 3
+    assert _item_count(db_session, todo_list_id) == 0
+    assert client.get(f"/lists/{todo_list_id}").status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app import const, metrics, pool_stats
+from app.main import app
+from app.models import list_model
+
+client = TestClient(app)
+
+
+def test_metrics_exposition(db_session, tmp_path) -> None:
+    """/metricsにルートのテンプレート毎のレイテンシ・SQL・コネクションプール・スレッドプールの値が出力されることを確認する."""
+    db_todo_list = list_model.ListModel(title="metrics_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=pool_stats.instrumented_pool_class("metrics_test", QueuePool))
+    pool_stats.bind_engine("metrics_test", engine)
+    with engine.connect():
+        pass
+
+    # ******************
+    # テスト実行
+    # ******************
+    client.get(f"/lists/{db_todo_list.id}")
+    client.get("/not-found")
+    response = client.get("/metrics")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/lists/{todo_list_id}"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/lists/{todo_list_id}",le="+Inf"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="<unmatched>"}' in body
+    # /metricsのリクエスト自身が処理中
+    assert "http_requests_in_flight 1\n" in body
+    assert "# TYPE db_query_duration_seconds histogram" in body
+    assert 'db_pool_checkouts_total{engine="metrics_test"} 1\n' in body
+    assert 'db_pool_checked_out{engine="metrics_test"} 0\n' in body
+    assert "threadpool_queue_depth" in body
+
+
+def test_metrics_are_merged_across_workers(tmp_path, monkeypatch) -> None:
+    """METRICS_DIR指定時は他のワーカーの値を合計し、終了したワーカーのゲージは除くことを確認する."""
+    monkeypatch.setattr(const, "METRICS_DIR", str(tmp_path))
+    # 終了済みのプロセスのpid
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, check=True, text=True)
+
+    def worker_snapshot(pid: int) -> dict:
+        return {
+            "pid": pid,
+            "histogram": {"http_request_duration_seconds": ("latency", [
+                {"labels": {"method": "GET", "route": "/merge-test"}, "buckets": {"0.005": 1, "+Inf": 2}, "sum": 0.5, "count": 2},
+            ])},
+            "counter": {},
+            "gauge": {"merge_test_gauge": ("gauge", [{"labels": {}, "value": 3}])},
+        }
+
+    for pid in (os.getppid(), int(exited.stdout)):
+        (tmp_path / f"{pid}.json").write_text(json.dumps(worker_snapshot(pid)))
+
+    # ******************
+    # テスト実行
+    # ******************
+    body = metrics.exposition()
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert 'http_request_duration_seconds_count{method="GET",route="/merge-test"} 4' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/merge-test",le="+Inf"} 4' in body
+    assert "merge_test_gauge 3\n" in body
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+from app import pool_stats
+
+
+def test_pool_stats_counts_checkouts_and_timeouts(tmp_path) -> None:
+    """プールイベントからチェックアウト数・待ち時間・タイムアウトが集計されることを確認する."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=pool_stats.instrumented_pool_class("test_pool", QueuePool),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    pool_stats.bind_engine("test_pool", engine)
+
+    # ******************
+    # テスト実行
+    # ******************
+    with engine.connect():
+        in_use = pool_stats.POOL_STATS["test_pool"].snapshot()
+        with pytest.raises(exc.TimeoutError), engine.connect():
+            pass
+    released = pool_stats.POOL_STATS["test_pool"].snapshot()
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert in_use["checked_out"] == 1
+    assert in_use["size"] == 1
+    assert released["checked_out"] == 0
+    assert released["checkouts_total"] == 1
+    assert released["timeouts_total"] == 1
+    assert released["checkout_latency_seconds"]["count"] == 2
+    assert released["checkout_wait_seconds_total"] >= 0.01
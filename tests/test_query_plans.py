@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from app.const import TodoItemStatusCode
+from app.crud import item_crud, list_crud
+from app.database import engine
+from app.models import item_model, list_model
+from app.schemas.item_schema import BulkUpdateTodoItem, NewTodoItem, TodoItemFilter, TodoItemSelector, UpdateTodoItem
+from tests.query_plan import assert_indexed, capture_statements
+
+
+def test_item_queries_use_indexes(db_session) -> None:
+    """TODO項目のCRUDのSQLがインデックスを使い、フルスキャン・ソートにならないことを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    db_todo_lists = [list_model.ListModel(title=f"plan_test_{i}", description="A test record for query plans.") for i in range(2)]
+    db_session.add_all(db_todo_lists)
+    db_session.commit()
+    todo_list_ids = [x.id for x in db_todo_lists]
+    db_session.add_all([
+        item_model.ItemModel(todo_list_id=todo_list_id, title=f"plan_test_{i}", status_code=TodoItemStatusCode.NOT_COMPLETED.value, due_at=datetime(2024, 1, 1))  # noqa: DTZ001
+        for todo_list_id in todo_list_ids for i in range(5)
+    ])
+    db_session.commit()
+    todo_list_id = todo_list_ids[0]
+    todo_item_id = db_session.query(item_model.ItemModel.id).filter(item_model.ItemModel.todo_list_id == todo_list_id).first().id
+
+    # ******************
+    # テスト実行
+    # ******************
+    with capture_statements(engine) as statements:
+        list_crud.get_todo_list(db_session, todo_list_id)
+        item_crud.get_todo_item(db_session, todo_list_id, todo_item_id)
+        item_crud.get_todo_items_page(db_session, todo_list_id, page=2, per_page=2)
+        item_crud.get_todo_items_page(db_session, todo_list_id, per_page=2, after={"id": todo_item_id})
+        item_crud.get_todo_items_page(db_session, todo_list_id, per_page=2, versions_only=True)
+        for order in ("-id", "due_at", "-created_at"):
+            item_crud.get_todo_items_page(db_session, todo_list_id, per_page=2, filters=TodoItemFilter(order=order))
+        item_crud.get_todo_items_page(db_session, todo_list_id, per_page=2, after={"id": todo_item_id, "due_at": None}, filters=TodoItemFilter(order="due_at"))
+        item_crud.get_todo_items_page(db_session, todo_list_id, per_page=2, filters=TodoItemFilter(
+            status=TodoItemStatusCode.NOT_COMPLETED, due_before=datetime(2025, 1, 1), order="due_at"))  # noqa: DTZ001
+        item_crud.get_todo_items_for_lists(db_session, todo_list_ids, per_list=3)
+        item_crud.get_overdue_counts(db_session, todo_list_ids)
+        item_crud.post_todo_item(db_session, todo_list_id, NewTodoItem(title="plan_test"))
+        item_crud.put_todo_item(db_session, todo_list_id, todo_item_id, UpdateTodoItem(complete=True))
+        item_crud.put_todo_items_status(db_session, todo_list_id, BulkUpdateTodoItem(status=TodoItemStatusCode.COMPLETED, complete=False))
+        item_crud.delete_todo_items(db_session, todo_list_id, TodoItemSelector(ids=[todo_item_id]))
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert statements
+    assert_indexed(engine, statements)
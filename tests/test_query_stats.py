@@ -0,0 +1,82 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.database import engine
+from app.main import app
+from app.models import item_model, list_model
+from app.query_stats import QueryBudgetExceeded, query_budget
+
+client = TestClient(app)
+
+
+def test_query_count_headers(db_session) -> None:
+    """レスポンスにリクエスト中のSQL実行回数と時間のヘッダーが付くことを確認する."""
+    db_todo_list = list_model.ListModel(title="query_stats_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.get("/lists")
+    no_db = client.get("/health")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    # TODOリストの1ページ分と、期限切れ件数の集計
+    assert response.headers["X-DB-Queries"] == "2"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+    assert no_db.headers["X-DB-Queries"] == "0"
+
+
+def test_query_budget(db_session) -> None:
+    """query_budgetの上限を超えてSQLを実行したリクエストがエラーになることを確認する."""
+    db_todo_list = list_model.ListModel(title="query_stats_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.add(item_model.ItemModel(todo_list_id=db_todo_list.id, title="query_stats_test", status_code=1))
+    db_session.commit()
+
+    # ******************
+    # テスト実行・実行結果の検証開始
+    # ******************
+    with query_budget(2):
+        assert client.get("/lists").status_code == status.HTTP_200_OK
+        # TODO項目の埋め込みで1クエリ増える
+        with pytest.raises(QueryBudgetExceeded, match="executed 3 queries"):
+            client.get("/lists", params={"include": "items"})
+    assert client.get("/lists", params={"include": "items"}).status_code == status.HTTP_200_OK
+
+
+def test_put_item_status_queries(db_session) -> None:
+    """TODO項目の完了では、TODO項目のUPDATE(と再SELECT)とTODOリストの完了数のUPDATEだけを実行することを確認する."""
+    db_todo_list = list_model.ListModel(title="query_stats_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_todo_item = item_model.ItemModel(todo_list_id=db_todo_list.id, title="query_stats_test", status_code=1)
+    db_session.add(db_todo_item)
+    db_session.commit()
+
+    # ******************
+    # テスト実行
+    # ******************
+    url = f"/lists/{db_todo_list.id}/items/{db_todo_item.id}"
+    completed = client.put(url, json={"complete": True, "title": "completed"})
+    unchanged = client.put(url, json={"complete": True})
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    # RETURNINGが使えないDB(MySQL)ではUPDATE後の再SELECTが1回増える
+    select_after_update = 0 if engine.dialect.update_returning else 1
+    assert (completed.json()["status_code"], completed.json()["title"]) == (2, "completed")
+    assert completed.headers["X-DB-Queries"] == str(2 + select_after_update)
+    # ステータスが変わらない場合は完了数を更新せず、TODO項目を読み直すだけ
+    assert unchanged.json()["status_code"] == 2
+    assert unchanged.headers["X-DB-Queries"] == "2"
+    db_session.refresh(db_todo_list)
+    assert db_todo_list.completed_count == 1
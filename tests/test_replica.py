@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import database, replica
+from app.cache import todo_cache, todo_list_key
+from app.main import app
+from app.models import list_model
+
+
+@pytest.fixture
+def replica_db(tmp_path, monkeypatch):
+    """2つ目のSQLiteファイルをレプリカとして設定する(レプリケーションはしないため、内容はプライマリと別)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    database.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(list_model.ListModel.__table__).values(id=1, title="from_replica"))
+    monkeypatch.setattr(database, "replica_engine", engine)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=engine, info={"replica": True}))
+    # asyncモード(conftestのapp_mode)のレプリカのセッション
+    async_engine = create_async_engine(database.to_async_url(str(engine.url)), poolclass=NullPool)
+    monkeypatch.setattr(database, "AsyncReplicaSessionLocal", database.async_session_local(async_engine, replica=True))
+    monkeypatch.setattr(replica, "lag_monitor", replica.ReplicaLagMonitor(max_lag=5, interval=0))
+    yield engine
+    engine.dispose()
+
+
+def _titles(client: TestClient) -> list[str]:
+    return [x["title"] for x in client.get("/lists").json()]
+
+
+def test_reads_use_replica_until_client_writes(db_session, replica_db) -> None:
+    """読み込みはレプリカから行い、書き込んだクライアントの直後の読み込みはプライマリから行うことを確認する."""
+    db_session.add(list_model.ListModel(title="from_primary"))
+    db_session.commit()
+    writer, other = TestClient(app), TestClient(app)
+
+    # ******************
+    # テスト実行
+    # ******************
+    before_write = _titles(writer)
+    response = writer.post("/lists", json={"title": "written"})
+    after_write = _titles(writer)
+    other_client = _titles(other)
+    writer.cookies.set(replica.STICKY_COOKIE, "0")
+    after_expiry = _titles(writer)
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert before_write == ["from_replica"]
+    assert replica.STICKY_COOKIE in response.cookies
+    assert after_write == ["from_primary", "written"]
+    assert other_client == ["from_replica"]
+    assert after_expiry == ["from_replica"]
+
+
+@pytest.mark.parametrize("lag", [30.0, None])
+def test_lagging_replica_falls_back_to_primary(db_session, replica_db, monkeypatch, lag) -> None:
+    """レプリカの遅延が上限を超えている、または遅延が分からない場合はプライマリから読み込むことを確認する."""
+    db_session.add(list_model.ListModel(title="from_primary"))
+    db_session.commit()
+    monkeypatch.setattr(replica.lag_monitor, "measure", lambda _: lag)
+
+    # ******************
+    # テスト実行・実行結果の検証開始
+    # ******************
+    assert _titles(TestClient(app)) == ["from_primary"]
+
+
+def test_replica_reads_are_not_cached(replica_db) -> None:
+    """レプリカから読み込んだ値は(遅延している可能性があるため)キャッシュしないことを確認する."""
+    todo_cache.delete(todo_list_key(1))
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = TestClient(app).get("/lists/1")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.json()["title"] == "from_replica"
+    assert todo_cache.get(todo_list_key(1)) is None
+
+
+def test_export_uses_replica_until_client_writes(db_session, replica_db) -> None:
+    """エクスポートも他の読み込みと同じくレプリカから行い、書き込んだクライアントはプライマリから行うことを確認する."""
+    db_session.add(list_model.ListModel(title="from_primary"))
+    db_session.commit()
+    client = TestClient(app)
+
+    # ******************
+    # テスト実行
+    # ******************
+    before_write = client.get("/export/lists").text
+    client.post("/lists", json={"title": "written"})
+    after_write = client.get("/export/lists").text
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert "from_replica" in before_write
+    assert "from_primary" not in before_write
+    assert "from_primary" in after_write
+    assert "written" in after_write
@@ -0,0 +1,68 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.cli import rebuild_search_index
+from app.main import app
+from app.models import list_model
+
+client = TestClient(app)
+
+
+def test_search_lists_and_items(db_session) -> None:
+    """TODOリストとTODO項目がまとめて関連度順に検索されることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    db_todo_list = list_model.ListModel(title="買い物リスト", description="週末の買い物")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+    assert rebuild_search_index.main([]) == 0
+
+    # インデックス作成後の登録・更新・削除も検索に反映される
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "牛乳を買う", "description": "低脂肪の牛乳"})
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "パンを買う"})
+    other = client.post(f"/lists/{todo_list_id}/items", json={"title": "卵を買う"}).json()
+    client.put(f"/lists/{todo_list_id}/items/{other['id']}", json={"title": "牛乳を捨てる"})
+    deleted = client.post(f"/lists/{todo_list_id}/items", json={"title": "牛乳を冷やす"}).json()
+    client.delete(f"/lists/{todo_list_id}/items/{deleted['id']}")
+
+    # ******************
+    # テスト実行
+    # ******************
+    milk = client.get("/search", params={"q": "牛乳を"})
+    short = client.get("/search", params={"q": "牛乳"})
+    shopping = client.get("/search", params={"q": "買い物", "per_page": 1})
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert milk.status_code == status.HTTP_200_OK
+    assert sorted(x["title"] for x in milk.json()) == ["牛乳を捨てる", "牛乳を買う"]
+    assert sorted(x["title"] for x in short.json()) == ["牛乳を捨てる", "牛乳を買う"]
+    assert all(x["kind"] == "item" and x["todo_list_id"] == todo_list_id for x in milk.json())
+    assert [(x["kind"], x["id"]) for x in shopping.json()] == [("list", todo_list_id)]
+    assert shopping.headers["X-Has-More"] == "false"
+
+
+def test_search_short_query_escapes_wildcards(db_session) -> None:
+    """インデックスを使わない短い検索語でも、%・_ がワイルドカードではなく文字として検索されることを確認する."""
+    db_todo_list = list_model.ListModel(title="セール")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+    assert rebuild_search_index.main([]) == 0
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "5%オフ"})
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "50円引き"})
+
+    # ******************
+    # テスト実行
+    # ******************
+    percent = client.get("/search", params={"q": "5%"})
+    underscore = client.get("/search", params={"q": "5_"})
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert [x["title"] for x in percent.json()] == ["5%オフ"]
+    assert underscore.json() == []
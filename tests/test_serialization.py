@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+
+from pydantic import TypeAdapter
+
+from app import serialization
+from app.crud import item_crud, list_crud
+from app.models.item_model import ItemModel
+from app.models.list_model import ListModel
+from app.schemas.item_schema import ResponseTodoItem
+from app.schemas.list_schema import ResponseTodoList
+
+
+def test_fast_serialization_matches_response_model() -> None:
+    """検証なしのシリアライズ結果がresponse_modelを通した結果と同じJSONになることを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    now = datetime(2024, 1, 1, 12, 0, 0, 123456)  # noqa: DTZ001
+    items = [
+        ItemModel(id=1, todo_list_id=1, title="serialize_test", description=None, status_code=2, due_at=None, created_at=now, updated_at=now),
+        ItemModel(id=2, todo_list_id=1, title="シリアライズ", description="説明", status_code=1, due_at=now, created_at=now, updated_at=now),
+    ]
+    todo_list = ListModel(id=1, title="serialize_test", item_count=2, completed_count=1, created_at=now, updated_at=now)
+
+    # ******************
+    # テスト実行
+    # ******************
+    fast_items = serialization.dumps(serialization.trusted_dicts(items, ResponseTodoItem))
+    fast_lists = serialization.dumps(serialization.trusted_dicts([todo_list], ResponseTodoList))
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    expected_items = TypeAdapter(list[ResponseTodoItem]).validate_python(items, from_attributes=True)
+    expected_lists = TypeAdapter(list[ResponseTodoList]).validate_python([todo_list], from_attributes=True)
+    assert json.loads(fast_items) == [x.model_dump(mode="json") for x in expected_items]
+    assert json.loads(fast_lists) == [x.model_dump(mode="json") for x in expected_lists]
+
+
+def test_collection_rows_are_not_tracked_by_session(db_session) -> None:  # noqa: ANN001
+    """一覧の取得がORMオブジェクトを作らず(identity mapに登録せず)、レスポンスのカラムだけを読み込むことを確認する."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list = ListModel(title="projection_test")
+    db_session.add(todo_list)
+    db_session.flush()
+    db_session.add(ItemModel(todo_list_id=todo_list.id, title="projection_test", status_code=1))
+    db_session.commit()
+    todo_list_id = todo_list.id
+    db_session.expunge_all()
+
+    # ******************
+    # テスト実行
+    # ******************
+    lists, _ = list_crud.get_todo_lists_page(db_session)
+    items, _ = item_crud.get_todo_items_page(db_session, todo_list_id)
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert len(db_session.identity_map) == 0
+    assert list(lists[0]._fields) == [x for x in ResponseTodoList.model_fields if x in ListModel.__table__.c]
+    assert list(items[0]._fields) == [x for x in ResponseTodoItem.model_fields if x in ItemModel.__table__.c]
+    assert serialization.trusted_dicts(lists, ResponseTodoList)[0]["id"] == todo_list_id
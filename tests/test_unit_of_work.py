@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response, status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.cache import todo_cache, todo_list_key
+from app.crud.list_crud import put_todo_list
+from app.dependencies import get_db
+from app.main import app
+from app.models import list_model
+from app.schemas.list_schema import UpdateTodoList
+
+client = TestClient(app)
+
+
+def test_write_request_commits_once(db_session) -> None:
+    """更新系のリクエストではCRUDが複数の文を実行しても、コミットは1回だけであることを確認する."""
+    db_todo_list = list_model.ListModel(title="unit_of_work_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    commits = []
+
+    def _count(session) -> None:
+        commits.append(session)
+
+    # ******************
+    # テスト実行
+    # ******************
+    event.listen(Session, "after_commit", _count)
+    try:
+        response = client.post(f"/lists/{db_todo_list.id}/items", json={"title": "item", "due_at": "2024-09-08T12:47:23"})
+    finally:
+        event.remove(Session, "after_commit", _count)
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    assert len(commits) == 1
+    db_session.refresh(db_todo_list)
+    assert db_todo_list.item_count == 1
+
+
+def test_error_rolls_back_request(db_session) -> None:
+    """エンドポイントで例外が起きた場合は書き込みがロールバックされ、キャッシュも無効化されないことを確認する."""
+    db_todo_list = list_model.ListModel(title="unit_of_work_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_cache.set(todo_list_key(db_todo_list.id), {"id": db_todo_list.id, "title": "unit_of_work_test"})
+
+    # ******************
+    # テスト実行
+    # ******************
+    dependency = get_db(SimpleNamespace(method="PUT"), Response())
+    db = next(dependency)
+    put_todo_list(db, db_todo_list.id, UpdateTodoList(title="rolled_back"))
+    with pytest.raises(RuntimeError):
+        dependency.throw(RuntimeError("error after the write"))
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    db_session.refresh(db_todo_list)
+    assert db_todo_list.title == "unit_of_work_test"
+    assert todo_cache.get(todo_list_key(db_todo_list.id)) is not None
+    todo_cache.delete(todo_list_key(db_todo_list.id))